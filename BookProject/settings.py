@@ -41,6 +41,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'bookApp.middleware.ProfilingMiddleware',
+    'bookApp.middleware.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -82,6 +84,41 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# 'shared' holds the versions that bookApp.signals and the bulk commands bump
+# (catalog, permissions, autocomplete names) and must be seen by every web
+# worker and management command, so it can't be LocMemCache: the file cache
+# works on one host, use Redis or Memcached, whose incr is atomic, across
+# hosts. Without an atomic incr, each change to a title or author name makes
+# the autocomplete lists rebuild instead of updating in place. 'default' holds
+# the cached pages, facets and book rows, which are keyed on those versions, so
+# it may stay local to each process. Book table rows are cached one entry per
+# row, hence the raised MAX_ENTRIES (the default of 300 is smaller than a few
+# pages).
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'OPTIONS': {
+            'MAX_ENTRIES': 100000,
+        },
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+    },
+}
+
+
+# Authentication
+# Same as ModelBackend, with the permissions cached across requests.
+
+AUTHENTICATION_BACKENDS = [
+    'bookApp.backends.CachedPermissionBackend',
+]
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -123,5 +160,43 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Logging
+# One line per request from bookApp.middleware.ServerTimingMiddleware.
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'bookApp.request': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+    },
+}
+
+# Profiling
+# bookApp.middleware.ProfilingMiddleware is off unless one of these is set:
+# the share of requests to run under cProfile (0 to 1) and the duration
+# from which a request's sampled stacks are always written.
+
+BOOKAPP_PROFILE_SAMPLE_RATE = 0
+BOOKAPP_PROFILE_SLOW_MS = None
+BOOKAPP_PROFILE_INTERVAL_MS = 5
+BOOKAPP_PROFILE_DIR = BASE_DIR / 'profiles'
+BOOKAPP_PROFILE_KEEP = 100
+
+# Autocomplete
+# When the in-memory title and author index of a process is missing or out of
+# date: 'background' rebuilds it in a thread and answers from the database
+# meanwhile, 'request' rebuilds it before answering, 'off' always uses the
+# database.
+
+BOOKAPP_AUTOCOMPLETE_BUILD = 'background'
+
 LOGIN_REDIRECT_URL = '/bookApp'
 LOGOUT_REDIRECT_URL = '/accounts/login/'
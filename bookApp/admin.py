@@ -1,22 +1,169 @@
-from django.contrib import admin
-from .models import Book, Author, Genre, Profile
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.core.exceptions import ValidationError
+from .cache import bump_catalog_version
+from .fields import normalize_key, prefix_range
+from .models import Book, Author, DiscountCampaign, Genre, Profile
+from .pagination import CappedCountPaginator
+from .search import filter_books
+
+
+class NameKeySearchMixin:
+    """Search names by prefix on the indexed name_key column, also used by the autocomplete widgets."""
+    ordering = ('name_key',)
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return super().get_search_results(request, queryset, search_term)
+        return queryset.filter(prefix_range('name_key', normalize_key(search_term))), False
+
+
+class LimitedChoicesFilter(admin.SimpleListFilter):
+    """
+    Sidebar filter on a related model that lists only its first `limit`
+    objects by name, plus the selected one, instead of every row.
+    """
+    model = None
+    lookup = None
+    limit = 20
+
+    def lookups(self, request, model_admin):
+        choices = list(self.model.objects.order_by('name_key').values_list('id', 'name')[:self.limit])
+        value = self.value()
+        if value and value.isdigit() and int(value) not in {pk for pk, _ in choices}:
+            choices += self.model.objects.filter(pk=value).values_list('id', 'name')
+        return choices
+
+    def queryset(self, request, queryset):
+        value = self.value()
+        if not value:
+            return queryset
+        if not value.isdigit():
+            raise IncorrectLookupParameters(f"Invalid {self.parameter_name}.")
+        return queryset.filter(**{self.lookup: int(value)})
+
+
+class AuthorFilter(LimitedChoicesFilter):
+    title = 'author'
+    parameter_name = 'author'
+    model = Author
+    lookup = 'author_id'
+
+
+class GenreFilter(LimitedChoicesFilter):
+    title = 'genre'
+    parameter_name = 'genre'
+    model = Genre
+    lookup = 'genres'
+
+
+# Inputs of the bulk actions and how their values are checked.
+ACTION_INPUTS = {
+    'percentage': forms.DecimalField(min_value=0, max_value=100, decimal_places=2),
+    'price': forms.DecimalField(min_value=0, max_digits=10, decimal_places=2),
+    'genre': forms.CharField(max_length=100),
+}
+
+
+class BookActionForm(ActionForm):
+    """
+    The action bar of the Book changelist, with the inputs the bulk actions need.
+
+    They are plain text here: an invalid value in the action form makes the
+    admin skip the action with "No action selected", so the actions check
+    their own input against ACTION_INPUTS and report what is wrong.
+    """
+    percentage = forms.CharField(required=False, widget=forms.TextInput(attrs={'placeholder': 'Discount %'}))
+    price = forms.CharField(required=False, widget=forms.TextInput(attrs={'placeholder': 'Price'}))
+    genre = forms.CharField(required=False, widget=forms.TextInput(attrs={'placeholder': 'Genre name'}))
+
+
+def _action_input(modeladmin, request, name):
+    """The checked value of an action bar input, or None after telling the user it is invalid."""
+    try:
+        return ACTION_INPUTS[name].clean(request.POST.get(name))
+    except ValidationError:
+        modeladmin.message_user(request, f"Enter a valid {name} for this action.", messages.ERROR)
+        return None
+
+
+def _action_genre(modeladmin, request):
+    name = _action_input(modeladmin, request, 'genre')
+    if name is None:
+        return None
+    genre = Genre.objects.filter(name=name).first()
+    if genre is None:
+        modeladmin.message_user(request, f"There is no genre named {name}.", messages.ERROR)
+    return genre
+
+
+# The actions below each run one statement for the whole selection, including
+# "select all", without loading the books. Bulk statements send no signals, so
+# they invalidate the catalog cache themselves.
+
+@admin.action(description="Apply discount %% to selected books")
+def apply_discount(modeladmin, request, queryset):
+    percentage = _action_input(modeladmin, request, 'percentage')
+    if percentage is None:
+        return
+    updated = queryset.apply_discount(percentage)
+    bump_catalog_version()
+    modeladmin.message_user(request, f"Discounted {updated} books by {percentage}%.")
+
+
+@admin.action(description="Set price of selected books")
+def set_price(modeladmin, request, queryset):
+    price = _action_input(modeladmin, request, 'price')
+    if price is None:
+        return
+    updated = queryset.set_price(price)
+    bump_catalog_version()
+    modeladmin.message_user(request, f"Set the price of {updated} books to {price}.")
+
+
+@admin.action(description="Add genre to selected books")
+def add_genre(modeladmin, request, queryset):
+    genre = _action_genre(modeladmin, request)
+    if genre is None:
+        return
+    added = queryset.add_genre(genre)
+    bump_catalog_version()
+    modeladmin.message_user(request, f"Added {genre} to {added} books.")
+
+
+@admin.action(description="Remove genre from selected books")
+def remove_genre(modeladmin, request, queryset):
+    genre = _action_genre(modeladmin, request)
+    if genre is None:
+        return
+    removed = queryset.remove_genre(genre)
+    bump_catalog_version()
+    modeladmin.message_user(request, f"Removed {genre} from {removed} books.")
+
 
 # Custom admin for Author model
-class AuthorAdmin(admin.ModelAdmin):
+class AuthorAdmin(NameKeySearchMixin, admin.ModelAdmin):
     list_display = ('name',)  # Display the name field in the list view
     search_fields = ('name',)  # Add a search box for the name field
 
 # Custom admin for Genre model
-class GenreAdmin(admin.ModelAdmin):
+class GenreAdmin(NameKeySearchMixin, admin.ModelAdmin):
     list_display = ('name',)  # Display the name field in the list view
     search_fields = ('name',)  # Add a search box for the name field
 
 # Custom admin for Book model
 class BookAdmin(admin.ModelAdmin):
     list_display = ('title', 'author', 'publication_year', 'price', 'discounted_price')  # Display fields in list view
-    list_filter = ('author', 'genres', 'publication_year')  # Add filter options
+    list_select_related = ('author',)  # Load authors with the books instead of a query per row
+    list_filter = (AuthorFilter, GenreFilter, 'publication_year')  # Add filter options
     search_fields = ('title', 'author__name')  # Add a search box for title and author
-    filter_horizontal = ('genres',)  # Display genres with horizontal filter for M2M relation
+    autocomplete_fields = ('author', 'genres')  # Search authors and genres instead of listing them all
+    show_full_result_count = False  # Skip the COUNT(*) of the whole table
+    paginator = CappedCountPaginator  # and count the filtered rows only up to a limit
+    action_form = BookActionForm
+    actions = (apply_discount, set_price, add_genre, remove_genre)
     fieldsets = (
         (None, {
             'fields': ('title', 'author', 'publication_year', 'price', 'discounted_price')
@@ -26,9 +173,22 @@ class BookAdmin(admin.ModelAdmin):
         }),
     )  # Organize fields into sections
 
+    def get_search_results(self, request, queryset, search_term):
+        # Use the full-text index instead of LIKE '%term%' over title and author name
+        if not search_term:
+            return super().get_search_results(request, queryset, search_term)
+        return filter_books(queryset, search_term), False
+
+# Custom admin for DiscountCampaign model
+class DiscountCampaignAdmin(admin.ModelAdmin):
+    list_display = ('name', 'percentage', 'scope', 'starts_at', 'ends_at')
+    list_filter = ('scope',)
+    autocomplete_fields = ('genre', 'author')  # Search instead of listing every genre and author
+
 # Register the custom admin forms
 admin.site.register(Book, BookAdmin)
 admin.site.register(Author, AuthorAdmin)
 admin.site.register(Genre, GenreAdmin)
+admin.site.register(DiscountCampaign, DiscountCampaignAdmin)
 
 admin.site.register(Profile)
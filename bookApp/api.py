@@ -0,0 +1,172 @@
+import hashlib
+
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.http import condition
+from bookApp.models import Book, Author, Genre, format_price, parse_price
+from .autocomplete import SOURCES, autocomplete
+from .cache import get_campaign_epoch, get_catalog_last_modified, get_catalog_state, get_catalog_version, is_process_local
+from .pagination import PastFirstPage, paginate_keyset
+
+
+def catalog_etag(request, *args, **kwargs):
+    # Every catalog change bumps the version and every campaign start or end
+    # moves the epoch, so together they identify the content of any API
+    # response without looking at the data. The version is in the shared
+    # cache so every worker gives the same ETag; a process-local cache would
+    # miss the other workers' changes, so then the rows themselves are used.
+    if is_process_local():
+        state = hashlib.md5(repr(get_catalog_state()).encode()).hexdigest()
+        return f'{state}.{get_campaign_epoch()}'
+    return f'{get_catalog_version()}.{get_campaign_epoch()}'
+
+
+def catalog_last_modified(request, *args, **kwargs):
+    return get_catalog_last_modified()
+
+
+@method_decorator(condition(etag_func=catalog_etag, last_modified_func=catalog_last_modified), name='get')
+class CatalogApiView(LoginRequiredMixin, View):
+    """
+    Read-only JSON list of one catalog model.
+
+    `?fields=a,b` selects the fields of each result, `?cursor=` walks the keyset
+    pages and `?page_size=` sets their size. Each query parameter in `filters`
+    filters the results on its lookup. Unchanged resources are answered
+    with a 304 from the ETag / Last-Modified headers before any query runs.
+    """
+    raise_exception = True
+    model = None
+    fields = {}
+    default_fields = ()
+    filters = {}  # query parameter: (lookup, conversion of its value)
+    keyset_ordering = ('id',)
+    page_size = 50
+    max_page_size = 500
+
+    def get_queryset(self, fields, lookups):
+        return self.model.objects.filter(**lookups)
+
+    def get(self, request):
+        fields = request.GET.get('fields')
+        fields = fields.split(',') if fields else list(self.default_fields)
+        unknown = [field for field in fields if field not in self.fields]
+        if unknown:
+            return JsonResponse({'error': f"Unknown fields: {', '.join(unknown)}."}, status=400)
+        try:
+            page_size = min(int(request.GET.get('page_size', self.page_size)), self.max_page_size)
+        except ValueError:
+            page_size = 0
+        if page_size < 1:
+            return JsonResponse({'error': "page_size must be a positive number."}, status=400)
+        lookups = {}
+        for parameter, (lookup, convert) in self.filters.items():
+            if parameter in request.GET:
+                try:
+                    lookups[lookup] = convert(request.GET[parameter])
+                except (ValueError, ArithmeticError):
+                    return JsonResponse({'error': f"Invalid value for {parameter}."}, status=400)
+
+        queryset = self.get_queryset(fields, lookups)
+        try:
+            page = paginate_keyset(queryset, self.keyset_ordering, page_size, request.GET.get('cursor'))
+        except PastFirstPage:
+            # Nothing before the cursor (e.g. its row is now first): give the first page.
+            page = paginate_keyset(queryset, self.keyset_ordering, page_size)
+        return JsonResponse({
+            'results': [{field: self.fields[field](obj) for field in fields} for obj in page],
+            'next': page.next_cursor,
+            'previous': page.previous_cursor,
+        })
+
+
+class BookApiView(CatalogApiView):
+    """
+    Books, with `effective_discounted_price` -- the price after the running
+    discount campaigns -- among the default fields. `discounted_price` is the
+    stored price only and has to be asked for. `?max_price=` keeps the books
+    whose effective price is at most that amount.
+    """
+    model = Book
+    fields = {
+        'id': lambda book: book.id,
+        'title': lambda book: book.title,
+        'author': lambda book: book.author_id,
+        'author_name': lambda book: book.author.name,
+        'publication_year': lambda book: book.publication_year,
+        'genres': lambda book: [genre.name for genre in book.genres.all()],
+        'price': lambda book: format_price(book.price),
+        'discounted_price': lambda book: format_price(book.discounted_price),
+        'effective_discounted_price': lambda book: format_price(book.effective_discounted_price),
+        'updated_at': lambda book: book.updated_at,
+    }
+    default_fields = (
+        'id', 'title', 'author', 'author_name', 'publication_year', 'genres', 'price', 'effective_discounted_price',
+    )
+    filters = {
+        'max_price': ('effective_discounted_price__lte', parse_price),
+    }
+
+    def get_queryset(self, fields, lookups):
+        books = Book.objects.all()
+        if 'author_name' in fields:
+            books = books.select_related('author')
+        if 'genres' in fields:
+            books = books.prefetch_related('genres')
+        if 'effective_discounted_price' in fields or lookups:
+            books = books.with_effective_price()
+        return books.filter(**lookups)
+
+
+class AuthorApiView(CatalogApiView):
+    model = Author
+    fields = {
+        'id': lambda author: author.id,
+        'name': lambda author: author.name,
+        'updated_at': lambda author: author.updated_at,
+    }
+    default_fields = ('id', 'name')
+
+
+class GenreApiView(CatalogApiView):
+    model = Genre
+    fields = {
+        'id': lambda genre: genre.id,
+        'name': lambda genre: genre.name,
+        'updated_at': lambda genre: genre.updated_at,
+    }
+    default_fields = ('id', 'name')
+
+
+class AutocompleteView(LoginRequiredMixin, View):
+    """
+    Titles and author names starting with `?q=`, ignoring case and accents.
+
+    `?type=title` or `?type=author` limits the results to one kind and
+    `?limit=` sets how many of each kind are returned.
+    """
+    raise_exception = True
+    limit = 10
+    max_limit = 50
+
+    def get(self, request):
+        kinds = request.GET.get('type')
+        kinds = [kinds] if kinds else list(SOURCES)
+        if any(kind not in SOURCES for kind in kinds):
+            return JsonResponse({'error': f"type must be one of {', '.join(SOURCES)}."}, status=400)
+        try:
+            limit = min(int(request.GET.get('limit', self.limit)), self.max_limit)
+        except ValueError:
+            limit = 0
+        if limit < 1:
+            return JsonResponse({'error': "limit must be a positive number."}, status=400)
+
+        text = request.GET.get('q', '')
+        return JsonResponse({
+            'results': [
+                {'type': kind, 'id': pk, 'label': label}
+                for kind in kinds for pk, label in autocomplete(kind, text, limit)
+            ],
+        })
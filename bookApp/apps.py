@@ -1,4 +1,5 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate, pre_migrate
 
 
 class BookappConfig(AppConfig):
@@ -7,4 +8,9 @@ class BookappConfig(AppConfig):
 
 
     def ready(self):
+        import bookApp.checks
         import bookApp.signals
+        from bookApp.search import create_search_triggers, drop_search_triggers
+
+        pre_migrate.connect(drop_search_triggers, sender=self)
+        post_migrate.connect(create_search_triggers, sender=self)
@@ -0,0 +1,101 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth.views import redirect_to_login
+from django.shortcuts import render, resolve_url
+from django.urls import reverse_lazy
+from django.views import View
+from bookApp.models import Book, Genre
+from .cache import render_book_rows
+from .facets import apply_facets, get_facets, selected_facets
+from .pagination import PastFirstPage, build_page, first_page_redirect, keyset_slice
+
+
+class AsyncLoginRequiredMixin:
+    """LoginRequiredMixin for async views: the user is loaded with request.auser()."""
+    login_url = reverse_lazy('login')
+
+    async def dispatch(self, request, *args, **kwargs):
+        user = await request.auser()
+        # Templates read request.user, which would otherwise load the user again, synchronously.
+        request.user = user
+        if not user.is_authenticated:
+            return redirect_to_login(request.get_full_path(), resolve_url(self.login_url))
+        return await super().dispatch(request, *args, **kwargs)
+
+
+class AsyncBookListBase(AsyncLoginRequiredMixin, View):
+    """
+    Keyset-paginated book list served without holding a thread while the database works.
+
+    Subclasses return the page's books from `get_queryset`, which may await
+    lookups it depends on, and name the template to render.
+    """
+    template_name = None
+    keyset_ordering = ('id',)
+    paginate_by = 50
+
+    async def get_queryset(self):
+        return Book.objects.select_related('author')
+
+    async def get_context_data(self, page):
+        return {'books': page.object_list, 'page_obj': page, 'is_paginated': page.has_other_pages(), 'view': self}
+
+    async def get_page(self, queryset, cursor):
+        page_queryset, direction = keyset_slice(queryset, self.keyset_ordering, self.paginate_by, cursor)
+        rows = [book async for book in page_queryset.aiterator(chunk_size=self.paginate_by + 1)]
+        if not rows and direction == 'prev':
+            raise PastFirstPage
+        return build_page(rows, self.keyset_ordering, self.paginate_by, cursor, direction)
+
+    async def get(self, request, *args, **kwargs):
+        queryset = await self.get_queryset()
+        if queryset is None:
+            page = build_page([], self.keyset_ordering, self.paginate_by)
+        else:
+            try:
+                page = await self.get_page(queryset, request.GET.get('cursor'))
+            except PastFirstPage:
+                # Nothing before the cursor (e.g. its row is now first).
+                return first_page_redirect(request)
+        # Everything the template needs is loaded, rendering runs no queries.
+        return render(request, self.template_name, await self.get_context_data(page))
+
+
+class AsyncBookListView(AsyncBookListBase):
+    template_name = 'bookApp/book_list.html'
+
+    async def get_queryset(self):
+        self.selected_facets = selected_facets(self.request.GET)
+        books = Book.objects.with_effective_price().select_related('author').prefetch_related('genres')
+        return apply_facets(books, self.selected_facets)
+
+    async def get_context_data(self, page):
+        context = await super().get_context_data(page)
+        context['book_rows'] = await sync_to_async(render_book_rows)(page.object_list)
+        context['facets'] = await sync_to_async(get_facets)(self.selected_facets)
+        return context
+
+
+class AsyncBookByAuthorListView(AsyncBookListBase):
+    template_name = 'bookApp/list_of_book_by_author.html'
+
+    async def get_queryset(self):
+        return Book.objects.filter(author_id=self.kwargs['author_id']).select_related('author')
+
+
+class AsyncBookByGenreListView(AsyncBookListBase):
+    template_name = 'bookApp/books_by_genre.html'
+
+    async def get_queryset(self):
+        genre = await Genre.objects.filter(name=self.kwargs['genre_name']).afirst()
+        if genre is None:
+            return None
+        # Filtering on the genre id skips the join on Genre the name filter needs.
+        return Book.objects.filter(genres=genre).select_related('author')
+
+
+class AsyncBookByPublicationYearView(AsyncBookListBase):
+    template_name = 'bookApp/list_of_book_by_year.html'
+    keyset_ordering = ('publication_year', 'id')
+
+    async def get_queryset(self):
+        return Book.objects.filter(publication_year=self.kwargs['year']).select_related('author')
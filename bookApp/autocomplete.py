@@ -0,0 +1,181 @@
+"""
+Type-ahead for book titles and author names.
+
+Each process keeps every title and author name, normalized with
+normalize_key(), in sorted lists searched by prefix with bisect, so a lookup
+costs O(log n) plus the matches returned. The lists are built on first use,
+in a background thread by default, and kept up to date by the Book and Author
+signals once a change commits.
+
+A names version in the shared cache says which state of the names the lists
+hold. Every change bumps it, including those made by other processes or
+without signals (bulk_create), and a process whose lists are behind answers
+from the title_key / name_key indexes in the database until it has rebuilt
+them. A process applies its own changes to the lists in place only when the
+shared cache's incr is atomic; otherwise two bumps may return the same
+version, so every change marks the lists out of date instead.
+"""
+import bisect
+import itertools
+import threading
+
+from django.conf import settings
+from django.db import connection, transaction
+from .cache import _initial_version, has_atomic_incr, shared_cache
+from .fields import normalize_key, prefix_range
+from .models import Author, Book
+
+NAMES_VERSION_KEY = 'bookApp:names_version'
+BUILD_CHUNK_SIZE = 10000
+
+
+def get_names_version():
+    version = shared_cache.get(NAMES_VERSION_KEY)
+    if version is None:
+        shared_cache.add(NAMES_VERSION_KEY, _initial_version(), timeout=None)
+        version = shared_cache.get(NAMES_VERSION_KEY)
+    return version
+
+
+def bump_names_version():
+    """Mark every process's names as out of date, and return the new version."""
+    try:
+        return shared_cache.incr(NAMES_VERSION_KEY)
+    except ValueError:
+        return get_names_version()
+
+
+class PrefixIndex:
+    """
+    Names of one model as a sorted list of "key NUL zero-padded pk NUL name" strings,
+    with the entry of each pk to find it again on change.
+    """
+
+    def __init__(self, names=()):
+        self.entries_by_pk = {pk: self.entry(pk, name) for pk, name in names}
+        self.entries = sorted(self.entries_by_pk.values())
+
+    @staticmethod
+    def entry(pk, name):
+        return f"{normalize_key(name)}\0{pk:010d}\0{name}"
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, pk, name):
+        self.remove(pk)
+        entry = self.entries_by_pk[pk] = self.entry(pk, name)
+        bisect.insort(self.entries, entry)
+
+    def remove(self, pk):
+        entry = self.entries_by_pk.pop(pk, None)
+        if entry is not None:
+            del self.entries[bisect.bisect_left(self.entries, entry)]
+
+    def search(self, prefix, limit):
+        """(pk, name) of the first `limit` names whose key starts with `prefix`, in key order."""
+        start = bisect.bisect_left(self.entries, prefix)
+        results = []
+        for entry in self.entries[start:start + limit]:
+            if not entry.startswith(prefix):
+                break
+            _, pk, name = entry.split('\0', 2)
+            results.append((int(pk), name))
+        return results
+
+
+# What the index holds: model, the field shown, and its normalized column.
+SOURCES = {
+    'title': (Book, 'title', 'title_key'),
+    'author': (Author, 'name', 'name_key'),
+}
+
+
+class NameIndex:
+    """The prefix indexes of this process, and the names version they reflect."""
+
+    def __init__(self):
+        self.indexes = {}
+        self.version = None
+        self.lock = threading.Lock()
+        self.building = False
+
+    def build(self):
+        """Read every name from the database and swap the new indexes in."""
+        # Read first: a change committed while building leaves the indexes behind, to be rebuilt.
+        version = get_names_version()
+        indexes = {
+            kind: PrefixIndex(model.objects.values_list('pk', field).iterator(chunk_size=BUILD_CHUNK_SIZE))
+            for kind, (model, field, _) in SOURCES.items()
+        }
+        with self.lock:
+            self.indexes, self.version = indexes, version
+
+    def _build_in_background(self):
+        try:
+            self.build()
+        finally:
+            self.building = False
+            connection.close()
+
+    def is_current(self):
+        return self.version is not None and self.version == get_names_version()
+
+    def search(self, kind, prefix, limit):
+        """Matches from memory, or None when the indexes are not current, after starting a rebuild."""
+        mode = settings.BOOKAPP_AUTOCOMPLETE_BUILD
+        if mode == 'background' and getattr(connection, 'is_in_memory_db', lambda: False)():
+            # A thread can't open the same in-memory database (e.g. under tests).
+            mode = 'request'
+        if mode == 'request' and not self.is_current():
+            self.build()
+        elif not self.is_current():
+            if mode == 'background' and not self.building:
+                self.building = True
+                threading.Thread(target=self._build_in_background, name='autocomplete-index', daemon=True).start()
+            return None
+        with self.lock:
+            return self.indexes[kind].search(prefix, limit)
+
+    def changed(self, kind, pk, name=None):
+        """Apply a committed change, or a deletion when `name` is None, and move the names version."""
+        with self.lock:
+            version = bump_names_version()
+            # Only our own bump since the indexes were current: any other
+            # writer's bump in between leaves them behind, to be rebuilt.
+            # A non-atomic incr may have returned another writer's number too.
+            if not has_atomic_incr():
+                self.version = None
+            elif self.version is not None and version == self.version + 1:
+                if name is None:
+                    self.indexes[kind].remove(pk)
+                else:
+                    self.indexes[kind].add(pk, name)
+                self.version = version
+
+
+names = NameIndex()
+
+
+def name_changed(kind, pk, name=None):
+    """Update the names when the surrounding transaction commits."""
+    transaction.on_commit(lambda: names.changed(kind, pk, name))
+
+
+def search_database(kind, prefix, limit):
+    model, field, key = SOURCES[kind]
+    length = model._meta.get_field(key).max_length
+    rows = model.objects.filter(prefix_range(key, prefix[:length])).order_by(key, 'pk').values_list('pk', field)
+    if len(prefix) <= length:
+        return list(rows[:limit])
+    # Keys are truncated, so the rest of a longer prefix is checked here.
+    return list(itertools.islice((row for row in rows.iterator() if normalize_key(row[1]).startswith(prefix)), limit))
+
+
+def autocomplete(kind, text, limit):
+    """(pk, name) of the titles or author names starting with `text`, ignoring case and accents."""
+    prefix = normalize_key(text)
+    if not prefix:
+        return []
+    results = names.search(kind, prefix, limit)
+    return search_database(kind, prefix, limit) if results is None else results
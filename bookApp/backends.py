@@ -0,0 +1,54 @@
+from django.contrib.auth.backends import ModelBackend
+from django.db import connection, transaction
+from .cache import _initial_version, is_process_local, shared_cache
+
+PERMISSIONS_VERSION_KEY = 'bookApp:permissions_version'
+# Also bounds how long a revoked permission survives a lost version bump.
+PERMISSIONS_TIMEOUT = 60 * 5
+
+
+def get_permissions_version():
+    version = shared_cache.get(PERMISSIONS_VERSION_KEY)
+    if version is None:
+        shared_cache.add(PERMISSIONS_VERSION_KEY, _initial_version(), timeout=None)
+        version = shared_cache.get(PERMISSIONS_VERSION_KEY)
+    return version
+
+
+def _increment_permissions_version():
+    try:
+        shared_cache.incr(PERMISSIONS_VERSION_KEY)
+    except ValueError:
+        shared_cache.add(PERMISSIONS_VERSION_KEY, _initial_version(), timeout=None)
+
+
+def bump_permissions_version():
+    """Invalidate every user's cached permissions, now and again when the transaction commits."""
+    _increment_permissions_version()
+    if connection.in_atomic_block:
+        transaction.on_commit(_increment_permissions_version)
+
+
+class CachedPermissionBackend(ModelBackend):
+    """
+    ModelBackend that keeps each user's permissions in the cache across requests.
+
+    ModelBackend only caches them on the user object, which is loaded again
+    for every request. Entries are keyed on the user and a permissions version
+    that bookApp.signals bumps whenever user, group or permission assignments
+    change. Without a shared cache a revocation in one worker wouldn't reach
+    the others, so then nothing is cached beyond the request.
+    """
+
+    def get_all_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None or is_process_local():
+            return super().get_all_permissions(user_obj, obj)
+        if not hasattr(user_obj, '_perm_cache'):
+            # Superusers get every permission, so the flag is part of the key.
+            key = f'bookApp:permissions:{get_permissions_version()}:{user_obj.pk}:{int(user_obj.is_superuser)}'
+            permissions = shared_cache.get(key)
+            if permissions is None:
+                permissions = super().get_all_permissions(user_obj)
+                shared_cache.set(key, permissions, PERMISSIONS_TIMEOUT)
+            user_obj._perm_cache = permissions
+        return user_obj._perm_cache
@@ -0,0 +1,156 @@
+"""
+Partitioned batch commands.
+
+A PartitionedCommand splits the rows of its queryset into primary-key ranges
+and processes them, one transaction per range, in a pool of worker processes
+that each open their own database connection. A range is marked finished in
+the transaction that processed it, so a run that is interrupted resumes with
+the ranges it had not finished, without repeating any of the others.
+"""
+import importlib
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import timedelta
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+from .models import BatchJob, BatchRange
+
+
+def plan_ranges(queryset, size):
+    """(start, end) primary-key ranges of `size` ids each, inclusive, covering `queryset`."""
+    bounds = queryset.aggregate(low=Min('pk'), high=Max('pk'))
+    if bounds['low'] is None:
+        return []
+    return [(start, min(start + size - 1, bounds['high'])) for start in range(bounds['low'], bounds['high'] + 1, size)]
+
+
+def _init_worker():
+    # Spawned workers start without Django; forked ones get the parent's
+    # connections, closed before the fork, and open their own on first use.
+    django.setup()
+
+
+def run_range(command_module, range_id):
+    """Process one BatchRange of a job and mark it finished, in one transaction. Runs in the workers."""
+    command = importlib.import_module(command_module).Command()
+    with transaction.atomic():
+        # Claiming the range writes first, which locks its row and, on SQLite,
+        # takes the write lock before reading, so workers queue on the busy
+        # timeout instead of failing to upgrade a read lock.
+        if not BatchRange.objects.filter(pk=range_id, finished_at__isnull=True).update(finished_at=timezone.now()):
+            return range_id, 0
+        batch_range = BatchRange.objects.select_related('job').get(pk=range_id)
+        queryset = command.get_queryset(batch_range.job.params).filter(
+            pk__gte=batch_range.start, pk__lte=batch_range.end,
+        )
+        processed = command.process_range(queryset, batch_range.job.params)
+        BatchRange.objects.filter(pk=range_id).update(processed=processed)
+    return range_id, processed
+
+
+class PartitionedCommand(BaseCommand):
+    """
+    Base class of batch commands run over primary-key ranges.
+
+    Subclasses implement get_queryset(params) and process_range(queryset,
+    params), which returns how many rows it processed, and may override
+    get_params(options) and finish(job, processed). `params` is the JSON the
+    job was started with; a run with the same params continues the last
+    unfinished job instead of starting a new one.
+
+    Ranges are planned when a job starts, so rows added later with higher ids
+    are left to the next job. Progress, throughput and the estimated time left
+    go to stderr, one line per finished range.
+    """
+    chunk_size = 10000
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=1,
+                            help="Worker processes; 1 runs every range in this process")
+        parser.add_argument('--chunk-size', type=int, default=None,
+                            help=f"Ids per range, committed one range at a time (default {self.chunk_size})")
+        parser.add_argument('--restart', action='store_true',
+                            help="Abandon an unfinished job with the same options instead of resuming it")
+
+    def get_queryset(self, params):
+        raise NotImplementedError('subclasses of PartitionedCommand must provide a get_queryset() method')
+
+    def process_range(self, queryset, params):
+        raise NotImplementedError('subclasses of PartitionedCommand must provide a process_range() method')
+
+    def get_params(self, options):
+        return {}
+
+    def finish(self, job, processed):
+        """Called once every range of the job is finished, with the rows processed over all runs."""
+
+    @property
+    def command_name(self):
+        return type(self).__module__.rsplit('.', 1)[-1]
+
+    def run_job(self, options):
+        """Start or resume the job for `options`, run its unfinished ranges and return the job."""
+        workers = options['workers']
+        if workers < 1:
+            raise CommandError("--workers must be at least 1.")
+        if workers > 1 and any(self.is_in_memory(alias) for alias in connections):
+            raise CommandError("An in-memory database can't be shared with worker processes; use --workers 1.")
+        job = self.get_job(self.get_params(options), options['chunk_size'] or self.chunk_size, options['restart'])
+        pending = list(job.ranges.filter(finished_at__isnull=True).values_list('pk', flat=True))
+        total = job.ranges.count()
+        if len(pending) < total:
+            self.stderr.write(f"Resuming {job}: {total - len(pending)} of {total} ranges already done.")
+
+        if workers == 1:
+            results = (run_range(type(self).__module__, range_id) for range_id in pending)
+            self.report(results, len(pending), total)
+        else:
+            # Connections must not be shared with forked workers; this process reopens its own later.
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+                futures = [executor.submit(run_range, type(self).__module__, range_id) for range_id in pending]
+                self.report((future.result() for future in as_completed(futures)), len(pending), total)
+
+        processed = sum(job.ranges.values_list('processed', flat=True))
+        BatchJob.objects.filter(pk=job.pk).update(status=BatchJob.STATUS_DONE, finished_at=timezone.now())
+        job.refresh_from_db()
+        self.finish(job, processed)
+        return job
+
+    def get_job(self, params, chunk_size, restart):
+        running = BatchJob.objects.filter(
+            command=self.command_name, params=params, status=BatchJob.STATUS_RUNNING,
+        ).order_by('-pk').first()
+        if running is not None and not restart:
+            return running
+        if running is not None:
+            BatchJob.objects.filter(pk=running.pk).update(status=BatchJob.STATUS_ABANDONED)
+        with transaction.atomic():
+            job = BatchJob.objects.create(command=self.command_name, params=params)
+            BatchRange.objects.bulk_create([
+                BatchRange(job=job, start=start, end=end)
+                for start, end in plan_ranges(self.get_queryset(params), chunk_size)
+            ])
+        return job
+
+    def report(self, results, pending, total):
+        started = time.monotonic()
+        processed = 0
+        for done, (_, rows) in enumerate(results, 1):
+            processed += rows
+            elapsed = time.monotonic() - started
+            rate = processed / elapsed if elapsed else 0
+            eta = timedelta(seconds=round(elapsed / done * (pending - done)))
+            self.stderr.write(
+                f"{total - pending + done}/{total} ranges, {processed} rows in {elapsed:.1f}s "
+                f"({rate:.0f} rows/s), ETA {eta}"
+            )
+
+    @staticmethod
+    def is_in_memory(alias):
+        connection = connections[alias]
+        return getattr(connection, 'is_in_memory_db', lambda: False)()
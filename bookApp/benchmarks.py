@@ -0,0 +1,16 @@
+import math
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile of a non-empty list of numbers."""
+    values = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(values)), 1)
+    return values[rank - 1]
+
+
+def latency_summary(latencies):
+    """p50/p95/p99 in milliseconds of latencies given in seconds."""
+    return {
+        f'p{percent}_ms': round(percentile(latencies, percent) * 1000, 3)
+        for percent in (50, 95, 99)
+    }
@@ -0,0 +1,198 @@
+import bisect
+import hashlib
+import json
+import time
+import uuid
+from datetime import datetime, timezone
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.memcached import BaseMemcachedCache
+from django.core.cache.backends.redis import RedisCache
+from django.db import connection, transaction
+from django.db.models import Count, Max
+from django.template.loader import get_template
+from django.utils.connection import ConnectionProxy
+from django.utils.safestring import mark_safe
+from django.views.generic.base import ContextMixin
+from bookApp.models import Author, Book, DiscountCampaign, Genre
+
+CATALOG_VERSION_KEY = 'bookApp:catalog_version'
+CATALOG_MODIFIED_KEY = 'bookApp:catalog_modified'
+CAMPAIGN_BOUNDARIES_KEY = 'bookApp:campaign_boundaries'
+BOOK_ROW_TEMPLATE = 'bookApp/_book_row.html'
+BOOK_ROW_TIMEOUT = 60 * 60 * 24
+
+# Versions every process must agree on, see CACHES in the settings.
+SHARED_CACHE_ALIAS = 'shared'
+shared_cache = ConnectionProxy(caches, SHARED_CACHE_ALIAS)
+
+
+def is_process_local(alias=SHARED_CACHE_ALIAS):
+    """Whether the cache is only seen by this process, so a bump there can't reach the others."""
+    return isinstance(caches[alias], (LocMemCache, DummyCache))
+
+
+def has_atomic_incr(alias=SHARED_CACHE_ALIAS):
+    """
+    Whether incr() on the cache is atomic, so two concurrent bumps never
+    return the same number. The file and database caches get then set.
+    """
+    return isinstance(caches[alias], (LocMemCache, BaseMemcachedCache, RedisCache))
+
+
+def _initial_version():
+    # Start from the clock so a version key evicted from the cache never
+    # comes back with a number that old pages were cached under.
+    return time.time_ns() // 1000
+
+
+def _new_catalog_version():
+    # A fresh random value instead of incr(), which the file cache runs as a
+    # get then a set: two bumps at once could end on the same number, and a
+    # page cached between them would outlive the second change.
+    return uuid.uuid4().hex
+
+
+def get_catalog_version():
+    version = shared_cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        shared_cache.add(CATALOG_VERSION_KEY, _new_catalog_version(), timeout=None)
+        version = shared_cache.get(CATALOG_VERSION_KEY)
+    return version
+
+
+def get_campaign_boundaries():
+    """Sorted start and end times of every discount campaign."""
+    boundaries = shared_cache.get(CAMPAIGN_BOUNDARIES_KEY)
+    if boundaries is None:
+        windows = DiscountCampaign.objects.values_list('starts_at', 'ends_at')
+        boundaries = sorted({moment for window in windows for moment in window if moment is not None})
+        shared_cache.set(CAMPAIGN_BOUNDARIES_KEY, boundaries, timeout=None)
+    return boundaries
+
+
+def _delete_campaign_boundaries():
+    shared_cache.delete(CAMPAIGN_BOUNDARIES_KEY)
+
+
+def forget_campaign_boundaries():
+    """Drop the cached campaign windows, now and again when the transaction commits."""
+    _delete_campaign_boundaries()
+    if connection.in_atomic_block:
+        transaction.on_commit(_delete_campaign_boundaries)
+
+
+def get_campaign_epoch(now=None):
+    """
+    Number of campaign starts and ends already passed.
+
+    Effective prices change when a campaign starts or ends without anything
+    being written, so pages showing them are also keyed on this.
+    """
+    return bisect.bisect_right(get_campaign_boundaries(), now or datetime.now(timezone.utc))
+
+
+def get_catalog_state():
+    """Row count and newest updated_at of each catalog model, read from the database."""
+    return [model.objects.aggregate(count=Count('pk'), latest=Max('updated_at')) for model in (Book, Author, Genre)]
+
+
+def get_catalog_last_modified():
+    """When the catalog last changed, from the shared cache or else from the newest updated_at."""
+    modified = None if is_process_local() else shared_cache.get(CATALOG_MODIFIED_KEY)
+    if modified is None:
+        timestamps = [state['latest'] for state in get_catalog_state() if state['latest'] is not None]
+        modified = max(timestamps, default=datetime(1970, 1, 1, tzinfo=timezone.utc))
+        shared_cache.add(CATALOG_MODIFIED_KEY, modified, timeout=None)
+    # A campaign starting or ending changes prices too.
+    epoch = get_campaign_epoch()
+    if epoch:
+        modified = max(modified, get_campaign_boundaries()[epoch - 1])
+    return modified
+
+
+def _replace_catalog_version():
+    shared_cache.set(CATALOG_VERSION_KEY, _new_catalog_version(), timeout=None)
+    # Deletes leave no updated_at behind, so the change time is kept here too.
+    shared_cache.set(CATALOG_MODIFIED_KEY, datetime.now(timezone.utc), timeout=None)
+
+
+def bump_catalog_version():
+    """
+    Invalidate every page cached under the current catalog version.
+
+    The version is bumped again when the surrounding transaction commits, so
+    a page read and cached before the commit can't outlive the change.
+    """
+    _replace_catalog_version()
+    if connection.in_atomic_block:
+        transaction.on_commit(_replace_catalog_version)
+
+
+class CatalogCacheMixin:
+    """
+    Cache the page of objects a ListView shows, keyed on the catalog version.
+
+    Only the data is cached, the template is still rendered per request since
+    the page includes the user's name and CSRF token.
+    """
+    cache_timeout = 60 * 15
+    cached_context = ('object_list', 'page_obj', 'paginator', 'is_paginated')
+    # Views showing effective prices are also keyed on the campaign epoch.
+    shows_prices = False
+
+    def get_catalog_cache_key(self):
+        request = json.dumps(
+            [type(self).__name__, self.kwargs, sorted(self.request.GET.lists())], default=str
+        )
+        digest = hashlib.md5(request.encode()).hexdigest()
+        version = get_catalog_version()
+        if self.shows_prices:
+            version = f'{version}.{get_campaign_epoch()}'
+        return f'bookApp:page:{version}:{digest}'
+
+    def get_context_data(self, **kwargs):
+        key = self.get_catalog_cache_key()
+        page = cache.get(key)
+        if page is None:
+            context = super().get_context_data(**kwargs)
+            cache.set(key, {name: context[name] for name in self.cached_context}, self.cache_timeout)
+            return context
+
+        context = ContextMixin.get_context_data(self, **kwargs)
+        context.update(page)
+        context[self.get_context_object_name(page['object_list'])] = page['object_list']
+        return context
+
+
+def book_row_version(book):
+    """
+    Fingerprint of everything the book row template shows.
+
+    Any edit to the book, its author or its genres changes the fingerprint, so
+    a cached row is never served after it changed, while rows of untouched
+    books survive catalog version bumps.
+    """
+    genres = [(genre.id, genre.name) for genre in book.genres.all()]
+    shown = (book.title, book.author_id, book.author.name, book.publication_year, genres,
+             book.price, getattr(book, 'effective_discounted_price', book.discounted_price))
+    return hashlib.md5(repr(shown).encode()).hexdigest()
+
+
+def render_book_rows(books, store=True):
+    """
+    Render the table row of every book, reusing cached rows and rendering only
+    the misses, which are cached too unless `store` is off.
+    """
+    keys = [f'bookApp:row:{book.id}:{book_row_version(book)}' for book in books]
+    rows = cache.get_many(keys)
+    missing = {}
+    template = get_template(BOOK_ROW_TEMPLATE)
+    for book, key in zip(books, keys):
+        if key not in rows:
+            rows[key] = missing[key] = template.render({'book': book})
+    if missing and store:
+        cache.set_many(missing, BOOK_ROW_TIMEOUT)
+    return [mark_safe(rows[key]) for key in keys]
@@ -0,0 +1,15 @@
+from django.core.checks import Warning, register
+from .cache import SHARED_CACHE_ALIAS, is_process_local
+
+
+@register()
+def check_shared_cache(app_configs, **kwargs):
+    # Each process would keep its own versions, and serve stale pages and
+    # permissions after changes made by the others.
+    if is_process_local():
+        return [Warning(
+            f"The '{SHARED_CACHE_ALIAS}' cache is local to each process.",
+            hint="Use a cache every worker and management command sees, such as FileBasedCache or Redis.",
+            id='bookApp.W001',
+        )]
+    return []
@@ -0,0 +1,72 @@
+import csv
+import json
+
+from bookApp.models import Book, format_price
+
+EXPORT_FIELDS = (
+    'id', 'title', 'author', 'publication_year', 'genres', 'price', 'discounted_price', 'effective_discounted_price',
+)
+EXPORT_FORMATS = ('csv', 'jsonl')
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+GENRE_SEPARATOR = '|'
+
+
+class _Echo:
+    """File-like object whose write() hands the line back to csv.writer's caller."""
+
+    def write(self, value):
+        return value
+
+
+def export_queryset(since=None):
+    books = Book.objects.with_effective_price().select_related('author').prefetch_related('genres').order_by('id')
+    if since is not None:
+        books = books.filter(id__gt=since)
+    return books
+
+
+def book_record(book):
+    return {
+        'id': book.id,
+        'title': book.title,
+        'author': book.author.name,
+        'publication_year': book.publication_year,
+        'genres': [genre.name for genre in book.genres.all()],
+        'price': format_price(book.price),
+        'discounted_price': format_price(book.discounted_price),
+        # The price charged now, see Book.objects.with_effective_price().
+        'effective_discounted_price': format_price(book.effective_discounted_price),
+    }
+
+
+def _release_record(book):
+    record = book_record(book)
+    # A prefetched queryset refers back to its book, and such cycles wait for
+    # the garbage collector. Breaking them frees each chunk once it's written.
+    book._prefetched_objects_cache.clear()
+    return record
+
+
+def export_lines(format='csv', since=None, chunk_size=2000):
+    """
+    Yield the catalog one line at a time in `format`.
+
+    Books are read with iterator(chunk_size=...), which also runs the genres
+    prefetch once per chunk, so memory use depends on the chunk size only.
+    """
+    books = export_queryset(since).iterator(chunk_size=chunk_size)
+    records = map(_release_record, books)
+
+    if format == 'jsonl':
+        for record in records:
+            yield json.dumps(record) + '\n'
+        return
+
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for record in records:
+        record['genres'] = GENRE_SEPARATOR.join(record['genres'])
+        yield writer.writerow(['' if record[field] is None else record[field] for field in EXPORT_FIELDS])
@@ -0,0 +1,105 @@
+from django.core.cache import cache
+from django.db.models import Case, Count, F, IntegerField, Value, When
+from django.http import Http404
+from bookApp.models import Author, Book, Genre
+from .cache import get_catalog_version
+
+FACET_TIMEOUT = 60 * 15
+TOP_AUTHORS = 10
+
+# Query string parameter -> Book lookup it filters on.
+FACET_FILTERS = {
+    'genre': 'genres',
+    'year': 'publication_year',
+    'author': 'author_id',
+}
+
+
+def selected_facets(params):
+    """The facet values chosen in the query string, as {parameter: int}."""
+    selected = {}
+    for name in FACET_FILTERS:
+        value = params.get(name)
+        if value:
+            try:
+                selected[name] = int(value)
+            except ValueError:
+                raise Http404(f"Invalid {name}.")
+    return selected
+
+
+def apply_facets(queryset, selected, exclude=None):
+    """Apply the selected facets, except `exclude`, to a Book queryset."""
+    # One value per facet, so the genre join can't duplicate books.
+    return queryset.filter(**{
+        FACET_FILTERS[name]: value for name, value in selected.items() if name != exclude
+    })
+
+
+def _entries(rows, value_field, label_field, selected):
+    return [
+        {'value': row[value_field], 'label': row[label_field], 'count': row['count'],
+         'selected': row[value_field] == selected}
+        for row in rows
+    ]
+
+
+def _first(field, value):
+    """Ordering that puts the row whose `field` is `value` first."""
+    return Case(When(**{field: value}, then=Value(0)), default=Value(1), output_field=IntegerField())
+
+
+def compute_facets(selected):
+    """
+    Book counts per genre, per year and for the top authors, one query each.
+
+    Each facet counts the books matching the other facets' selections, so
+    picking a genre narrows the year and author counts but still lists every
+    genre to switch to.
+    """
+    books = Book.objects.all()
+    Through = Book.genres.through
+
+    # Facets that no other selection narrows read the stored book counts instead of grouping books.
+    if set(selected) - {'genre'}:
+        genres = (
+            Through.objects.filter(book__in=apply_facets(books, selected, exclude='genre').values('id'))
+            .values('genre_id', 'genre__name').annotate(count=Count('book_id')).order_by('genre__name')
+        )
+        genre_fields = ('genre_id', 'genre__name')
+    else:
+        genres = Genre.objects.filter(book_count__gt=0).values('id', 'name', count=F('book_count')).order_by('name')
+        genre_fields = ('id', 'name')
+    years = (
+        apply_facets(books, selected, exclude='year')
+        .values('publication_year').annotate(count=Count('id')).order_by('-publication_year')
+    )
+    # The selected author is listed first, even when it isn't among the top ones.
+    if set(selected) - {'author'}:
+        authors = (
+            apply_facets(books, selected, exclude='author')
+            .values('author_id', 'author__name').annotate(count=Count('id'))
+            .order_by(_first('author_id', selected.get('author')), '-count', 'author__name')[:TOP_AUTHORS]
+        )
+        author_fields = ('author_id', 'author__name')
+    else:
+        authors = (
+            Author.objects.filter(book_count__gt=0).values('id', 'name', count=F('book_count'))
+            .order_by(_first('id', selected.get('author')), '-book_count', 'name')[:TOP_AUTHORS]
+        )
+        author_fields = ('id', 'name')
+    return {
+        'genre': _entries(genres, *genre_fields, selected.get('genre')),
+        'year': _entries(years, 'publication_year', 'publication_year', selected.get('year')),
+        'author': _entries(authors, *author_fields, selected.get('author')),
+    }
+
+
+def get_facets(selected):
+    """compute_facets(), cached under the catalog version."""
+    key = f'bookApp:facets:{get_catalog_version()}:' + ','.join(f'{name}={selected[name]}' for name in sorted(selected))
+    facets = cache.get(key)
+    if facets is None:
+        facets = compute_facets(selected)
+        cache.set(key, facets, FACET_TIMEOUT)
+    return facets
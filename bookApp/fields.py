@@ -0,0 +1,48 @@
+import unicodedata
+
+from django.db import models
+from django.db.models import Q
+
+
+def normalize_key(value):
+    """Case- and accent-insensitive form of a name, with runs of whitespace collapsed."""
+    decomposed = unicodedata.normalize('NFKD', value or '')
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(stripped.casefold().split())
+
+
+def prefix_range(field_name, prefix):
+    """
+    Q for values of `field_name` starting with `prefix`, as a gte/lt range.
+
+    A range is answered from an index on every backend, unlike istartswith,
+    which SQLite runs as a LIKE ... ESCAPE over every row.
+    """
+    if not prefix:
+        return Q()
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return Q(**{f'{field_name}__gte': prefix, f'{field_name}__lt': upper})
+
+
+class NormalizedField(models.CharField):
+    """
+    Read-only copy of another field run through normalize_key(), kept up to
+    date on every save and bulk_create. QuerySet.update() bypasses it.
+    """
+
+    def __init__(self, *args, source=None, **kwargs):
+        self.source = source
+        kwargs.setdefault('editable', False)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs['source'] = self.source
+        if kwargs.get('editable') is False:
+            del kwargs['editable']
+        return name, path, args, kwargs
+
+    def pre_save(self, model_instance, add):
+        value = normalize_key(getattr(model_instance, self.source))[:self.max_length]
+        setattr(model_instance, self.attname, value)
+        return value
@@ -1,14 +1,47 @@
 from django import forms
+from django.urls import reverse_lazy
 from .models import Book
 from .models import Author
 from .models import Genre
 
 
 
+class AutocompleteSelect(forms.Select):
+    """
+    Select that renders only its selected option, for models with too many
+    rows to list; _autocomplete.html fills in the rest as the user types.
+    """
+
+    def __init__(self, kind, attrs=None):
+        super().__init__(attrs)
+        self.kind = kind
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context['widget']['attrs']['data-autocomplete-url'] = reverse_lazy('books:api_autocomplete')
+        context['widget']['attrs']['data-autocomplete-type'] = self.kind
+        return context
+
+    def optgroups(self, name, value, attrs=None):
+        field = self.choices.field
+        selected = {str(v) for v in value if str(v) not in field.empty_values}
+        options = [] if field.empty_label is None else [(field.empty_label, '')]
+        try:
+            options += [(str(obj), obj.pk) for obj in self.choices.queryset.filter(pk__in=selected)]
+        except (TypeError, ValueError):
+            # An invalid submitted value, reported by the field's validation.
+            pass
+        return [
+            (None, [self.create_option(name, pk, label, str(pk) in selected, index)], index)
+            for index, (label, pk) in enumerate(options)
+        ]
+
+
 class BooksForm(forms.ModelForm):
     class Meta:
         model = Book
         fields = ['id', 'title', 'author', 'publication_year', 'genres', 'price', 'discounted_price']
+        widgets = {'author': AutocompleteSelect('author')}
 
 
 
@@ -0,0 +1,92 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import AsyncClient, Client
+from django.urls import reverse
+from bookApp.benchmarks import latency_summary
+from bookApp.models import Book
+
+# (sync route, async route, kwargs taken from a sample book)
+ROUTES = [
+    ('books:book_list', 'books:async_book_list', lambda book: {}),
+    ('books:books_by_author', 'books:async_books_by_author', lambda book: {'author_id': book.author_id}),
+    ('books:books_by_genre', 'books:async_books_by_genre', lambda book: {'genre_name': book.genres.first().name}),
+    ('books:books_by_year', 'books:async_books_by_year', lambda book: {'year': book.publication_year}),
+]
+
+
+def run_sync(url, cookies, requests, concurrency):
+    def one(_):
+        client = Client()
+        client.cookies = cookies
+        try:
+            started = time.perf_counter()
+            response = client.get(url)
+            return time.perf_counter() - started, response.status_code
+        finally:
+            connections.close_all()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(one, range(requests)))
+    return results, time.perf_counter() - started
+
+
+async def run_async(url, cookies, requests, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        client = AsyncClient()
+        client.cookies = cookies
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.get(url)
+            return time.perf_counter() - started, response.status_code
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(one() for _ in range(requests)))
+    return results, time.perf_counter() - started
+
+
+class Command(BaseCommand):
+    help = "Compare concurrent-request throughput of the sync and async book list views"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', required=True, help="Existing user the requests are made as")
+        parser.add_argument('--requests', type=int, default=200, help="Requests per route and variant")
+        parser.add_argument('--concurrency', type=int, default=20, help="Requests in flight at once")
+
+    def handle(self, *args, **kwargs):
+        try:
+            user = User.objects.get(username=kwargs['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"No user named {kwargs['username']}.")
+        book = Book.objects.filter(genres__isnull=False).first()
+        if book is None:
+            raise CommandError("The catalog has no book with a genre to benchmark with, run seed_catalog first.")
+
+        client = Client()
+        client.force_login(user)
+        cookies = client.cookies
+        requests, concurrency = kwargs['requests'], kwargs['concurrency']
+
+        self.stdout.write(f"{'route':<32} {'variant':<6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8}")
+        for sync_name, async_name, route_kwargs in ROUTES:
+            route_kwargs = route_kwargs(book)
+            for variant, url_name in (('sync', sync_name), ('async', async_name)):
+                url = reverse(url_name, kwargs=route_kwargs)
+                if variant == 'sync':
+                    results, elapsed = run_sync(url, cookies, requests, concurrency)
+                else:
+                    results, elapsed = asyncio.run(run_async(url, cookies, requests, concurrency))
+                failed = sum(status != 200 for _, status in results)
+                if failed:
+                    raise CommandError(f"{failed} requests to {url} did not return 200.")
+                summary = latency_summary([latency for latency, _ in results])
+                self.stdout.write(
+                    f"{sync_name:<32} {variant:<6} {len(results) / elapsed:>8.1f} "
+                    f"{summary['p50_ms']:>8.1f} {summary['p95_ms']:>8.1f}"
+                )
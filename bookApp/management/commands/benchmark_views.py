@@ -0,0 +1,155 @@
+import json
+import platform
+import subprocess
+import time
+import tracemalloc
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Count
+from django.test import Client, override_settings
+from django.urls import reverse
+from bookApp import urls as book_urls
+from bookApp.benchmarks import latency_summary
+from bookApp.models import Book, Author, Genre
+from bookApp.query_budget import QueryCounter
+
+# Query strings for routes that need one to do real work.
+ROUTE_PARAMS = {
+    'search': lambda sample: {'q': sample['word']},
+    'api_autocomplete': lambda sample: {'q': sample['word'][:3]},
+}
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, cwd=settings.BASE_DIR, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = "Seed catalogs of growing size and report latency, query count and peak memory of every bookApp route"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1000,10000,100000', help="Comma separated catalog sizes, in books")
+        parser.add_argument('--repeat', type=int, default=20, help="Timed requests per route and size")
+        parser.add_argument('--warm', action='store_true', help="Keep the cache between requests instead of clearing it")
+        parser.add_argument('--output', default=None, help="File to write the JSON report to, defaults to stdout")
+        parser.add_argument('--in-place', action='store_true',
+                            help="Seed and benchmark the configured database instead of a throwaway test database")
+
+    def handle(self, *args, **kwargs):
+        sizes = sorted(int(size) for size in kwargs['sizes'].split(','))
+        old_name = None
+        if not kwargs['in_place']:
+            old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            with override_settings(DEBUG=False, ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                results = self.run(sizes, kwargs['repeat'], kwargs['warm'])
+        finally:
+            if old_name is not None:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        report = json.dumps({
+            'meta': {
+                'git_commit': _git_commit(),
+                'django': django.get_version(),
+                'python': platform.python_version(),
+                'database': connection.vendor,
+                'repeat': kwargs['repeat'],
+                'warm_cache': kwargs['warm'],
+            },
+            'results': results,
+        }, indent=2)
+        if kwargs['output']:
+            with open(kwargs['output'], 'w', encoding='utf-8') as output:
+                output.write(report + '\n')
+        else:
+            self.stdout.write(report)
+
+    def run(self, sizes, repeat, warm):
+        user, _ = User.objects.get_or_create(username='benchmark', defaults={'is_staff': True, 'is_superuser': True})
+        client = Client()
+        client.force_login(user)
+
+        results = []
+        for size in sizes:
+            # Sizes are ascending, so each catalog only adds the missing books to the previous one.
+            missing = size - Book.objects.count()
+            if missing > 0:
+                call_command(
+                    'seed_catalog', books=missing, authors=max(size // 10 - Author.objects.count(), 1),
+                    seed=size, verbosity=0, stdout=self.stderr,
+                )
+            sample = self.sample()
+            for name, path, params in self.routes(sample):
+                results.append({'books': size, 'route': name, 'path': path,
+                                **self.measure(client, path, params, repeat, warm)})
+                self.stderr.write(f"{size:>8} books  {name}")
+        return results
+
+    def sample(self):
+        """Values to fill the routes' URL parameters with, taken from the busiest rows."""
+        author = Author.objects.annotate(books=Count('book')).order_by('-books').first()
+        genre = Genre.objects.annotate(books=Count('book')).order_by('-books').first()
+        book = Book.objects.filter(author=author).first()
+        return {
+            'author_id': author.id,
+            'genre_name': genre.name,
+            'year': book.publication_year,
+            'pk': book.id,
+            'word': book.title.split()[0],
+        }
+
+    def routes(self, sample):
+        for pattern in book_urls.urlpatterns:
+            kwargs = {name: sample[name] for name in pattern.pattern.converters}
+            name = f'{book_urls.app_name}:{pattern.name}'
+            params = ROUTE_PARAMS.get(pattern.name, lambda sample: {})(sample)
+            yield name, reverse(name, kwargs=kwargs), params
+
+    def request(self, client, path, params):
+        response = client.get(path, params)
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        return response
+
+    def measure(self, client, path, params, repeat, warm):
+        latencies = []
+        queries = 0
+        status = None
+        # The first request warms up imports and template loading and isn't timed.
+        for i in range(repeat + 1):
+            if not warm:
+                cache.clear()
+            with QueryCounter() as counter:
+                started = time.perf_counter()
+                status = self.request(client, path, params).status_code
+                elapsed = time.perf_counter() - started
+            if i:
+                latencies.append(elapsed)
+                queries = max(queries, counter.count)
+
+        if not warm:
+            cache.clear()
+        tracemalloc.start()
+        try:
+            self.request(client, path, params)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        return {
+            'status': status,
+            **latency_summary(latencies),
+            'queries': queries,
+            'peak_memory_kb': round(peak / 1024, 1),
+        }
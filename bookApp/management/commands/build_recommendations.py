@@ -0,0 +1,55 @@
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from bookApp.recommendations import (
+    AUTHOR_WEIGHT,
+    TOP_K,
+    CatalogFeatures,
+    affected_rows,
+    changed_rows,
+    store_neighbours,
+    store_signatures,
+)
+
+
+class Command(BaseCommand):
+    help = "Precompute the most similar books of every book, from the genres and author they share"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--k', type=int, default=TOP_K, help="Neighbours kept per book")
+        parser.add_argument('--author-weight', type=float, default=AUTHOR_WEIGHT,
+                            help="Share of the score given to having the same author, between 0 and 1")
+        parser.add_argument('--block-size', type=int, default=None,
+                            help="Books scored against the catalog at once, sized to the catalog by default")
+        parser.add_argument('--incremental', action='store_true',
+                            help="Only recompute the books whose genres or author changed since the last run, "
+                                 "and the books their change affects; keep --k the same between runs")
+
+    def handle(self, *args, **kwargs):
+        k = kwargs['k']
+        if k < 1 or not 0 <= kwargs['author_weight'] <= 1:
+            raise CommandError("--k must be positive and --author-weight between 0 and 1.")
+        started = time.monotonic()
+
+        features = CatalogFeatures.load(kwargs['author_weight'])
+        if kwargs['verbosity'] > 1:
+            self.stdout.write(f"Loaded {len(features)} books and {features.genre_count} genres "
+                              f"in {time.monotonic() - started:.1f}s")
+        if kwargs['incremental']:
+            changed = changed_rows(features)
+            rows = affected_rows(features, changed, k, kwargs['block_size'])
+        else:
+            changed = rows = np.arange(len(features))
+
+        for done in store_neighbours(features, rows, k, kwargs['block_size']):
+            if kwargs['verbosity'] > 1:
+                self.stdout.write(f"Computed neighbours of {done}/{len(rows)} books")
+        # Recorded last, so an interrupted run sees the same books as changed next time.
+        store_signatures(features, changed)
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Computed neighbours of {len(rows)} books ({len(changed)} changed) in {elapsed:.1f}s "
+            f"({len(rows) / max(elapsed, 1e-9):.0f} books/s)."
+        ))
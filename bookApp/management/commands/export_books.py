@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from bookApp.export import EXPORT_FORMATS, export_lines
+
+class Command(BaseCommand):
+    help = "Export the book catalog as CSV or JSON Lines"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=EXPORT_FORMATS, default='csv', help="Output format")
+        parser.add_argument('--since', type=int, default=None, help="Only export books with an id greater than this")
+        parser.add_argument('--output', default=None, help="File to write to, defaults to stdout")
+        parser.add_argument('--chunk-size', type=int, default=2000, help="Number of books fetched per query")
+
+    def handle(self, *args, **kwargs):
+        lines = export_lines(kwargs['format'], kwargs['since'], kwargs['chunk_size'])
+
+        if kwargs['output'] is None:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+
+        count = 0
+        with open(kwargs['output'], 'w', newline='', encoding='utf-8') as output:
+            for line in lines:
+                output.write(line)
+                count += 1
+        if kwargs['format'] == 'csv':
+            count -= 1  # header row
+        self.stdout.write(self.style.SUCCESS(f"Exported {count} books to {kwargs['output']}."))
@@ -0,0 +1,167 @@
+import csv
+import itertools
+import json
+import time
+from collections import Counter
+from decimal import Decimal, InvalidOperation
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from bookApp.autocomplete import bump_names_version
+from bookApp.cache import bump_catalog_version
+from bookApp.export import EXPORT_FORMATS, GENRE_SEPARATOR
+from bookApp.models import Book, Author, Genre
+
+
+TITLE_MAX_LENGTH = Book._meta.get_field('title').max_length
+
+
+class NameCache:
+    """In-memory name -> id map for a model with a `name` field."""
+
+    def __init__(self, model):
+        self.model = model
+        self.ids = dict(model.objects.values_list('name', 'id'))
+        self.created = 0
+
+    def resolve(self, names):
+        missing = sorted({name for name in names if name not in self.ids})
+        if missing:
+            objs = self.model.objects.bulk_create([self.model(name=name) for name in missing])
+            if any(obj.pk is None for obj in objs):
+                # The backend can't return ids from a bulk insert, look them up instead.
+                objs = self.model.objects.filter(name__in=missing)
+            self.ids.update((obj.name, obj.pk) for obj in objs)
+            self.created += len(missing)
+        return self.ids
+
+
+def split_genres(value):
+    """Genre names from a list, or from a string joined with GENRE_SEPARATOR as in the CSV export."""
+    if isinstance(value, str):
+        value = value.split(GENRE_SEPARATOR)
+    if not isinstance(value, list) or not all(isinstance(name, str) for name in value):
+        raise ValueError(f"genres must be a list of names or a {GENRE_SEPARATOR}-separated string")
+    return [name.strip() for name in value if name.strip()]
+
+
+def read_csv(path):
+    """(line number, record) of every row."""
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            yield reader.line_num, row
+
+
+def read_jsonl(path):
+    """(line number, record) of every non-blank line, the record being the error for malformed ones."""
+    with open(path, encoding='utf-8') as f:
+        for number, line in enumerate(f, start=1):
+            if line.strip():
+                try:
+                    yield number, json.loads(line)
+                except ValueError as e:
+                    yield number, ValueError(f"malformed JSON, {e}")
+
+
+def _decimal(value, field):
+    """`value` rounded to the places of the DecimalField `field`, rejecting what the field can't store."""
+    if value in (None, ''):
+        return None
+    number = Decimal(str(value))
+    if not number.is_finite():
+        raise ValueError(f"{field.name} must be a finite number, not {value!r}")
+    try:
+        number = number.quantize(Decimal(1).scaleb(-field.decimal_places))
+    except InvalidOperation:
+        number = None
+    if number is None or len(number.as_tuple().digits) > field.max_digits:
+        raise ValueError(f"{field.name} {value!r} has more than {field.max_digits} digits")
+    return number
+
+
+class Command(BaseCommand):
+    help = "Import books, authors and genres from a CSV or JSON Lines file"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV or JSON Lines file, in the format written by export_books")
+        parser.add_argument('--format', choices=EXPORT_FORMATS, default=None,
+                            help="Input format, guessed from the file extension by default")
+        parser.add_argument('--chunk-size', type=int, default=5000,
+                            help="Number of rows inserted per transaction")
+
+    def handle(self, *args, **kwargs):
+        path = kwargs['path']
+        format = kwargs['format'] or ('jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv')
+        records = read_jsonl(path) if format == 'jsonl' else read_csv(path)
+
+        self.authors = NameCache(Author)
+        self.genres = NameCache(Genre)
+        self.imported = self.skipped = 0
+        started = time.monotonic()
+
+        try:
+            while True:
+                chunk = list(itertools.islice(records, kwargs['chunk_size']))
+                if not chunk:
+                    break
+                with transaction.atomic():
+                    self.import_chunk(chunk)
+                # bulk_create sends no signals, so invalidate the cached pages and autocomplete names here.
+                bump_catalog_version()
+                bump_names_version()
+                elapsed = time.monotonic() - started
+                self.stdout.write(f"Imported {self.imported} books ({self.imported / elapsed:.0f} rows/s)")
+        except (OSError, ValueError, csv.Error) as e:
+            raise CommandError(f"Could not read {path}: {e}")
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {self.imported} books in {elapsed:.1f}s ({self.imported / max(elapsed, 1e-9):.0f} rows/s), "
+            f"created {self.authors.created} authors and {self.genres.created} genres, skipped {self.skipped} rows."
+        ))
+
+    def import_chunk(self, chunk):
+        rows = []
+        for line, record in chunk:
+            try:
+                if isinstance(record, Exception):
+                    raise record
+                if not isinstance(record, dict):
+                    raise ValueError("not a JSON object")
+                title = (record.get('title') or '').strip()
+                author = (record.get('author') or '').strip()
+                if not title or not author:
+                    raise ValueError("title and author are required")
+                if len(title) > TITLE_MAX_LENGTH:
+                    raise ValueError(f"title is longer than {TITLE_MAX_LENGTH} characters")
+                rows.append((
+                    title,
+                    author,
+                    int(record['publication_year']),
+                    split_genres(record.get('genres') or []),
+                    _decimal(record.get('price'), Book._meta.get_field('price')),
+                    _decimal(record.get('discounted_price'), Book._meta.get_field('discounted_price')),
+                ))
+            except (KeyError, TypeError, ValueError, InvalidOperation) as e:
+                self.skipped += 1
+                self.stdout.write(self.style.ERROR(f"Line {line}: skipped, {e}"))
+
+        author_ids = self.authors.resolve(row[1] for row in rows)
+        genre_ids = self.genres.resolve(name for row in rows for name in row[3])
+
+        books = Book.objects.bulk_create([
+            Book(title=title, author_id=author_ids[author], publication_year=year,
+                 price=price, discounted_price=discounted_price)
+            for title, author, year, genres, price, discounted_price in rows
+        ])
+
+        Through = Book.genres.through
+        links = Through.objects.bulk_create([
+            Through(book_id=book.pk, genre_id=genre_ids[name])
+            for book, row in zip(books, rows)
+            for name in dict.fromkeys(row[3])
+        ])
+        # bulk_create sends no signals, so count the new books here.
+        Author.objects.add_book_counts(Counter(book.author_id for book in books))
+        Genre.objects.add_book_counts(Counter(link.genre_id for link in links))
+        self.imported += len(books)
@@ -1,14 +1,35 @@
 import decimal
-from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.db import transaction
+from bookApp.batch import PartitionedCommand
+from bookApp.cache import bump_catalog_version
 from bookApp.models import Book
 
-class Command(BaseCommand):
+class Command(PartitionedCommand):
     help = "Apply a discount to all books"
 
     def add_arguments(self, parser):
         parser.add_argument('discount_percentage', type=int, help="Discount percentage")
+        mode = parser.add_mutually_exclusive_group()
+        mode.add_argument('--bulk', action='store_true',
+                          help="Update all books with one set-based UPDATE in one transaction, all or nothing, "
+                               "instead of saving them one by one")
+        mode.add_argument('--partitioned', action='store_true',
+                          help="Update the books with set-based SQL over ranges of book ids, one transaction per "
+                               "range: an interrupted run leaves the finished ranges discounted and resumes from "
+                               "the others; see --workers, --chunk-size and --restart")
+        super().add_arguments(parser)
 
     def handle(self, *args, **kwargs):
+        if kwargs['partitioned']:
+            self.skipped = Book.objects.filter(price__isnull=True).count()
+            self.run_job(kwargs)
+            return
+        if kwargs['chunk_size'] is not None or kwargs['workers'] != 1 or kwargs['restart']:
+            raise CommandError("--workers, --chunk-size and --restart only apply with --partitioned.")
+        if kwargs['bulk']:
+            return self.handle_bulk(kwargs['discount_percentage'])
+
         discount_percentage = kwargs['discount_percentage'] / 100
         books = Book.objects.all()
 
@@ -35,3 +56,30 @@ class Command(BaseCommand):
             except Exception as e:
                 # Catch any other exceptions
                 self.stdout.write(self.style.ERROR(f"An unexpected error occurred for book '{book.title}': {e}"))
+
+    def handle_bulk(self, discount_percentage):
+        with transaction.atomic():
+            skipped = Book.objects.filter(price__isnull=True).count()
+            updated = Book.objects.apply_discount(discount_percentage)
+        self.report_discount(updated, skipped)
+
+    # Partitioned run, see bookApp.batch.
+
+    def get_params(self, options):
+        return {'discount_percentage': options['discount_percentage']}
+
+    def get_queryset(self, params):
+        return Book.objects.filter(price__isnull=False)
+
+    def process_range(self, queryset, params):
+        return queryset.apply_discount(params['discount_percentage'])
+
+    def finish(self, job, processed):
+        self.report_discount(processed, self.skipped)
+
+    def report_discount(self, updated, skipped):
+        # update() sends no signals, so invalidate the cached pages here.
+        bump_catalog_version()
+        self.stdout.write(self.style.SUCCESS(
+            f"Discounted {updated} books, skipped {skipped} without a price."
+        ))
@@ -0,0 +1,90 @@
+import csv
+import itertools
+import time
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group, User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from bookApp.models import Profile
+
+GROUP_SEPARATOR = '|'
+
+
+def read_users(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            groups = row.get('groups') or ''
+            row['groups'] = [name.strip() for name in groups.split(GROUP_SEPARATOR) if name.strip()]
+            yield row
+
+
+class Command(BaseCommand):
+    help = "Create users, their profiles and group memberships in bulk from a CSV file"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV file with username, email, first_name, last_name, groups and biodata columns")
+        parser.add_argument('--password', default=None,
+                            help="Initial password of every user. Hashed once and shared; without it the "
+                                 "users get unusable passwords and have to reset them")
+        parser.add_argument('--chunk-size', type=int, default=1000, help="Number of users created per transaction")
+
+    def handle(self, *args, **kwargs):
+        # Hashing is deliberately slow, so do it once rather than per user.
+        password = make_password(kwargs['password'])
+        groups = dict(Group.objects.values_list('name', 'id'))
+        existing = set(User.objects.values_list('username', flat=True))
+        self.created = self.skipped = 0
+        started = time.monotonic()
+
+        records = read_users(kwargs['path'])
+        try:
+            while True:
+                chunk = list(itertools.islice(records, kwargs['chunk_size']))
+                if not chunk:
+                    break
+                with transaction.atomic():
+                    self.provision_chunk(chunk, password, groups, existing)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Could not read {kwargs['path']}: {e}")
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {self.created} users in {elapsed:.1f}s ({self.created / max(elapsed, 1e-9):.0f} users/s), "
+            f"skipped {self.skipped} rows."
+        ))
+
+    def provision_chunk(self, chunk, password, groups, existing):
+        rows = []
+        for record in chunk:
+            username = (record.get('username') or '').strip()
+            unknown = [name for name in record['groups'] if name not in groups]
+            if not username or username in existing or unknown:
+                reason = "unknown groups " + ', '.join(unknown) if unknown else "missing or existing username"
+                self.skipped += 1
+                self.stdout.write(self.style.ERROR(f"{username or 'Row'}: skipped, {reason}"))
+                continue
+            existing.add(username)
+            rows.append(record)
+
+        # bulk_create sends no post_save signals, and returns the ids on PostgreSQL and SQLite 3.35+.
+        users = User.objects.bulk_create([
+            User(username=record['username'].strip(), email=record.get('email') or '',
+                 first_name=record.get('first_name') or '', last_name=record.get('last_name') or '',
+                 password=password)
+            for record in rows
+        ])
+        if any(user.pk is None for user in users):
+            ids = dict(User.objects.filter(username__in=[user.username for user in users]).values_list('username', 'id'))
+            for user in users:
+                user.pk = ids[user.username]
+
+        Profile.objects.bulk_create([
+            Profile(user_id=user.pk, biodata=record.get('biodata') or '') for user, record in zip(users, rows)
+        ])
+        Through = User.groups.through
+        Through.objects.bulk_create([
+            Through(user_id=user.pk, group_id=groups[name])
+            for user, record in zip(users, rows)
+            for name in dict.fromkeys(record['groups'])
+        ])
+        self.created += len(users)
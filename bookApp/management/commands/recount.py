@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+from bookApp.cache import bump_catalog_version
+from bookApp.models import Author, Genre
+
+class Command(BaseCommand):
+    help = "Check the book_count of authors and genres against the books, and repair it with --repair"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repair', action='store_true', help="Recount the authors and genres that are wrong")
+        parser.add_argument('--limit', type=int, default=20, help="Wrong counts listed per model")
+
+    def handle(self, *args, **kwargs):
+        wrong = 0
+        for model in (Author, Genre):
+            drifted = model.objects.drifted().order_by('pk')
+            count = drifted.count()
+            if not count:
+                continue
+            wrong += count
+            self.stdout.write(f"{count} {model._meta.verbose_name_plural} with a wrong book_count:")
+            for obj in drifted[:kwargs['limit']]:
+                self.stdout.write(f"  {obj}: {obj.book_count} stored, {obj.actual_book_count} books")
+            if kwargs['repair']:
+                model.objects.filter(pk__in=model.objects.drifted().values('pk')).recount()
+
+        if not wrong:
+            self.stdout.write(self.style.SUCCESS("All book counts are correct."))
+        elif kwargs['repair']:
+            bump_catalog_version()
+            self.stdout.write(self.style.SUCCESS(f"Repaired {wrong} book counts."))
+        else:
+            raise CommandError(f"{wrong} book counts are wrong, run with --repair to fix them.")
@@ -0,0 +1,112 @@
+import itertools
+import random
+import time
+from collections import Counter
+from decimal import Decimal
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from bookApp.autocomplete import bump_names_version
+from bookApp.cache import bump_catalog_version
+from bookApp.models import Book, Author, Genre
+
+FIRST_NAMES = ['Kalki', 'Jeyamohan', 'Sujatha', 'Ambai', 'Perumal', 'Indira', 'Ashok', 'Bama', 'Imayam', 'Salma']
+LAST_NAMES = ['Krishnamurthy', 'Rangarajan', 'Murugan', 'Parthasarathy', 'Mitran', 'Raman', 'Kumar', 'Devi']
+GENRES = ['Fiction', 'Adventure', 'History', 'Poetry', 'Science', 'Biography', 'Mystery', 'Romance', 'Fantasy',
+          'Travel', 'Drama', 'Philosophy', 'Children', 'Humour', 'Politics', 'Religion', 'Art', 'Cookery']
+WORDS = ['River', 'Night', 'Stone', 'Crown', 'Forest', 'Song', 'Storm', 'Garden', 'Shadow', 'Temple', 'Sea',
+         'Fire', 'Letter', 'Journey', 'Moon', 'City']
+
+
+def zipf_weights(n, exponent):
+    """Cumulative Zipf weights: item k is picked in proportion to 1 / k**exponent."""
+    return list(itertools.accumulate(1 / (rank ** exponent) for rank in range(1, n + 1)))
+
+
+class Command(BaseCommand):
+    help = "Seed a synthetic book catalog with Zipf-distributed authors and genres"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--books', type=int, default=10000, help="Number of books to add")
+        parser.add_argument('--authors', type=int, default=None, help="Number of authors to add, books / 10 by default")
+        parser.add_argument('--genres', type=int, default=len(GENRES), help="Number of genres the catalog should have")
+        parser.add_argument('--zipf', type=float, default=1.1, help="Skew of books per author and per genre")
+        parser.add_argument('--max-genres', type=int, default=3, help="Most genres a single book gets")
+        parser.add_argument('--no-price-ratio', type=float, default=0.1, help="Share of books without a price")
+        parser.add_argument('--seed', type=int, default=None, help="Random seed, for reproducible catalogs")
+        parser.add_argument('--chunk-size', type=int, default=10000, help="Books inserted per transaction")
+
+    def handle(self, *args, **kwargs):
+        books = kwargs['books']
+        author_count = kwargs['authors'] or max(books // 10, 1)
+        if books < 0 or author_count < 1 or kwargs['genres'] < 1 or kwargs['max_genres'] < 1:
+            raise CommandError("Counts must be positive.")
+        rng = random.Random(kwargs['seed'])
+        started = time.monotonic()
+
+        genre_ids = self.seed_genres(kwargs['genres'])
+        author_ids = self.seed_authors(author_count, rng)
+        author_weights = zipf_weights(len(author_ids), kwargs['zipf'])
+        genre_weights = zipf_weights(len(genre_ids), kwargs['zipf'])
+        # Most books have one genre, fewer have two, and so on.
+        genre_count_weights = zipf_weights(min(kwargs['max_genres'], len(genre_ids)), 2)
+
+        Through = Book.genres.through
+        created = 0
+        while created < books:
+            size = min(kwargs['chunk_size'], books - created)
+            with transaction.atomic():
+                chunk = Book.objects.bulk_create([
+                    Book(
+                        title=self.title(rng),
+                        author_id=rng.choices(author_ids, cum_weights=author_weights)[0],
+                        publication_year=max(2024 - int(rng.expovariate(1 / 15)), 1900),
+                        price=self.price(rng, kwargs['no_price_ratio']),
+                    )
+                    for _ in range(size)
+                ])
+                links = Through.objects.bulk_create([
+                    Through(book_id=book.pk, genre_id=genre_id)
+                    for book in chunk
+                    for genre_id in set(rng.choices(
+                        genre_ids,
+                        cum_weights=genre_weights,
+                        k=rng.choices(range(1, len(genre_count_weights) + 1), cum_weights=genre_count_weights)[0],
+                    ))
+                ])
+                # bulk_create sends no signals, so count the new books here.
+                Author.objects.add_book_counts(Counter(book.author_id for book in chunk))
+                Genre.objects.add_book_counts(Counter(link.genre_id for link in links))
+            created += size
+            if kwargs['verbosity'] > 1:
+                self.stdout.write(f"Seeded {created}/{books} books")
+
+        # bulk_create sends no signals, so invalidate the cached pages and autocomplete names here.
+        bump_catalog_version()
+        bump_names_version()
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {books} books and {author_count} authors, {len(genre_ids)} genres "
+            f"in {time.monotonic() - started:.1f}s."
+        ))
+
+    def seed_genres(self, count):
+        names = GENRES[:count] + [f"Genre {i}" for i in range(len(GENRES), count)]
+        Genre.objects.bulk_create([Genre(name=name) for name in names], ignore_conflicts=True)
+        return list(Genre.objects.filter(name__in=names).order_by('id').values_list('id', flat=True))
+
+    def seed_authors(self, count, rng):
+        authors = Author.objects.bulk_create([
+            Author(name=f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {i}") for i in range(count)
+        ])
+        # Shuffle so the most prolific authors aren't always the oldest rows.
+        author_ids = [author.pk for author in authors]
+        rng.shuffle(author_ids)
+        return author_ids
+
+    def title(self, rng):
+        return f"{rng.choice(WORDS)} {rng.choice(WORDS)} {rng.randrange(1000)}"[:20]
+
+    def price(self, rng, no_price_ratio):
+        if rng.random() < no_price_ratio:
+            return None
+        # Log-normal around 15, like most catalogs: many cheap books, a long tail of expensive ones.
+        return Decimal(f"{max(rng.lognormvariate(2.7, 0.6), 1):.0f}") - Decimal('0.01')
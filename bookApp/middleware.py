@@ -0,0 +1,252 @@
+import cProfile
+import collections
+import logging
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .query_budget import QueryCounter
+
+logger = logging.getLogger('bookApp.request')
+
+
+class RequestTiming:
+    """Where the time of one request went, in seconds. Set on the request as `request.timing`."""
+    __slots__ = ('started', 'total', 'queries', 'db', 'template', '_template_started')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.total = 0.0
+        self.queries = 0
+        self.db = 0.0
+        self.template = 0.0
+        self._template_started = None
+
+    def server_timing(self):
+        return (
+            f'db;dur={self.db * 1000:.1f};desc="{self.queries} queries", '
+            f'tpl;dur={self.template * 1000:.1f}, '
+            f'total;dur={self.total * 1000:.1f}'
+        )
+
+
+class ServerTimingMiddleware:
+    """
+    Measure the queries, database time and template rendering time of every
+    request and report them in a `Server-Timing` header and a log line on the
+    `bookApp.request` logger.
+
+    Put it first in MIDDLEWARE so the session and user lookups are counted.
+    Database time spent by lazy querysets while the template renders is part
+    of both `db` and `tpl`. Only TemplateResponse rendering is timed as `tpl`,
+    the body of streaming responses is produced after the timings are sent.
+
+    Under ASGI the counter is installed on the connections of the request's
+    sync thread, where the async ORM and sync_to_async run the queries.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timing = request.timing = RequestTiming()
+        with QueryCounter() as counter:
+            response = self.get_response(request)
+        return self.report(request, response, timing, counter)
+
+    async def __acall__(self, request):
+        timing = request.timing = RequestTiming()
+        counter = QueryCounter()
+        await sync_to_async(counter.__enter__)()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(counter.__exit__)(None, None, None)
+        return self.report(request, response, timing, counter)
+
+    def report(self, request, response, timing, counter):
+        timing.total = time.perf_counter() - timing.started
+        timing.queries = counter.count
+        timing.db = counter.duration
+
+        response['Server-Timing'] = timing.server_timing()
+        if logger.isEnabledFor(logging.INFO):
+            match = request.resolver_match
+            logger.info(
+                'method=%s path=%s view=%s status=%s total_ms=%.1f db_ms=%.1f queries=%d template_ms=%.1f',
+                request.method, request.path, match.view_name if match else '-', response.status_code,
+                timing.total * 1000, timing.db * 1000, timing.queries, timing.template * 1000,
+                extra={'timing': timing},
+            )
+        return response
+
+    def process_template_response(self, request, response):
+        if response.is_rendered:
+            # Rendered by the view (QueryBudgetMixin under DEBUG), which timed it.
+            return response
+        # Called last of all middleware, so rendering starts right after this.
+        timing = request.timing
+        timing._template_started = time.perf_counter()
+
+        def rendered(response):
+            timing.template = time.perf_counter() - timing._template_started
+
+        response.add_post_render_callback(rendered)
+        return response
+
+
+def collapse_stack(frame):
+    """One line of the collapsed stack format flame graph tools read, outermost call first."""
+    calls = []
+    while frame is not None:
+        code = frame.f_code
+        calls.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ';'.join(reversed(calls))
+
+
+class StackSampler:
+    """
+    Background thread sampling the stacks of the threads that are serving a
+    request. Starting and stopping a thread's sampling only touches a dict,
+    so every request can be watched and the samples of the fast ones dropped.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._samples = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self, thread_id):
+        with self._lock:
+            self._samples[thread_id] = collections.Counter()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='bookApp-stack-sampler', daemon=True)
+                self._thread.start()
+
+    def stop(self, thread_id):
+        with self._lock:
+            return self._samples.pop(thread_id, collections.Counter())
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            if not self._samples:
+                continue
+            frames = sys._current_frames()
+            with self._lock:
+                for thread_id, samples in self._samples.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        samples[collapse_stack(frame)] += 1
+
+
+# cProfile can't run twice at once (Python 3.12 raises), so one request at a time.
+_cprofile_lock = threading.Lock()
+
+
+class ProfilingMiddleware:
+    """
+    Opt-in profiling of the `books` views.
+
+    BOOKAPP_PROFILE_SAMPLE_RATE of the requests run under cProfile and are
+    written as .prof files, one request at a time: a sampled request that
+    overlaps a profiled one is treated as unsampled. Other requests that take
+    BOOKAPP_PROFILE_SLOW_MS or longer are written as collapsed stacks (.folded)
+    from a stack sampler polling every BOOKAPP_PROFILE_INTERVAL_MS. File names
+    carry the URL name, query count and duration, and only the newest
+    BOOKAPP_PROFILE_KEEP files are kept in BOOKAPP_PROFILE_DIR.
+
+    Put it before ServerTimingMiddleware, which counts the queries. Under ASGI
+    the request's sync thread is profiled, where the ORM, sync views and
+    templates run, not the event loop shared with other requests.
+    """
+    namespace = 'books'
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+        self.sample_rate = getattr(settings, 'BOOKAPP_PROFILE_SAMPLE_RATE', 0)
+        self.slow_ms = getattr(settings, 'BOOKAPP_PROFILE_SLOW_MS', None)
+        if not self.sample_rate and self.slow_ms is None:
+            raise MiddlewareNotUsed
+        self.directory = Path(getattr(settings, 'BOOKAPP_PROFILE_DIR', settings.BASE_DIR / 'profiles'))
+        self.keep = getattr(settings, 'BOOKAPP_PROFILE_KEEP', 100)
+        self.sampler = StackSampler(getattr(settings, 'BOOKAPP_PROFILE_INTERVAL_MS', 5) / 1000)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        if getattr(request, '_profile_started', None) is not None:
+            self.write_profile(request)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if getattr(request, '_profile_started', None) is not None:
+            # Stopped on the thread it was started on, and the files written off the event loop.
+            await sync_to_async(self.write_profile)(request)
+        return response
+
+    def write_profile(self, request):
+        started = request._profile_started
+        elapsed = time.perf_counter() - started
+        profiler = request._profiler
+        if profiler is not None:
+            profiler.disable()
+            _cprofile_lock.release()
+        else:
+            samples = self.sampler.stop(request._profile_thread)
+
+        if profiler is not None or elapsed * 1000 >= self.slow_ms:
+            timing = getattr(request, 'timing', None)
+            queries = timing.queries if timing is not None else 'unknown'
+            url_name = request.resolver_match.view_name.replace(':', '.')
+            name = f"{time.time_ns()}-{url_name}-{queries}q-{elapsed * 1000:.0f}ms"
+            self.directory.mkdir(parents=True, exist_ok=True)
+            if profiler is not None:
+                profiler.dump_stats(self.directory / f"{name}.prof")
+            else:
+                (self.directory / f"{name}.folded").write_text(
+                    ''.join(f"{stack} {count}\n" for stack, count in samples.items())
+                )
+            self.rotate()
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # Started here rather than in __call__ so only the books views are profiled.
+        if request.resolver_match.namespace != self.namespace:
+            return None
+        request._profiler = None
+        request._profile_thread = threading.get_ident()
+        if self.sample_rate and random.random() < self.sample_rate and _cprofile_lock.acquire(blocking=False):
+            request._profiler = cProfile.Profile()
+            request._profiler.enable()
+        elif self.slow_ms is not None:
+            self.sampler.start(request._profile_thread)
+        else:
+            return None
+        request._profile_started = time.perf_counter()
+        return None
+
+    def rotate(self):
+        # Names start with the time, so they sort oldest first.
+        profiles = sorted([*self.directory.glob('*.prof'), *self.directory.glob('*.folded')], key=lambda path: path.name)
+        for path in profiles[:-self.keep]:
+            path.unlink(missing_ok=True)
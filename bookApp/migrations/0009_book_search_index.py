@@ -0,0 +1,73 @@
+from django.db import migrations
+
+
+CREATE_SEARCH_INDEX = [
+    """
+    CREATE VIRTUAL TABLE bookApp_book_fts USING fts5(
+        title, author_name, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER bookApp_book_fts_insert AFTER INSERT ON bookApp_book BEGIN
+        INSERT INTO bookApp_book_fts (rowid, title, author_name)
+        SELECT new.id, new.title, name FROM bookApp_author WHERE id = new.author_id;
+    END
+    """,
+    """
+    CREATE TRIGGER bookApp_book_fts_update AFTER UPDATE OF title, author_id ON bookApp_book BEGIN
+        DELETE FROM bookApp_book_fts WHERE rowid = old.id;
+        INSERT INTO bookApp_book_fts (rowid, title, author_name)
+        SELECT new.id, new.title, name FROM bookApp_author WHERE id = new.author_id;
+    END
+    """,
+    """
+    CREATE TRIGGER bookApp_book_fts_delete AFTER DELETE ON bookApp_book BEGIN
+        DELETE FROM bookApp_book_fts WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER bookApp_author_fts_update AFTER UPDATE OF name ON bookApp_author BEGIN
+        UPDATE bookApp_book_fts SET author_name = new.name
+        WHERE rowid IN (SELECT id FROM bookApp_book WHERE author_id = new.id);
+    END
+    """,
+    """
+    INSERT INTO bookApp_book_fts (rowid, title, author_name)
+    SELECT book.id, book.title, author.name
+    FROM bookApp_book book JOIN bookApp_author author ON author.id = book.author_id
+    """,
+]
+
+DROP_SEARCH_INDEX = [
+    "DROP TRIGGER IF EXISTS bookApp_author_fts_update",
+    "DROP TRIGGER IF EXISTS bookApp_book_fts_delete",
+    "DROP TRIGGER IF EXISTS bookApp_book_fts_update",
+    "DROP TRIGGER IF EXISTS bookApp_book_fts_insert",
+    "DROP TABLE IF EXISTS bookApp_book_fts",
+]
+
+
+def create_search_index(apps, schema_editor):
+    # FTS5 is SQLite only, other databases fall back to LIKE searches.
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in CREATE_SEARCH_INDEX:
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in DROP_SEARCH_INDEX:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookApp', '0008_book_discounted_price_book_price'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
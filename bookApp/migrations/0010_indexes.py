@@ -0,0 +1,61 @@
+# Generated by Django 5.1 on 2026-10-18 13:56
+
+from django.db import migrations, models
+from bookApp.search import SEARCH_TRIGGERS
+
+
+def drop_search_triggers(apps, schema_editor):
+    # SQLite rebuilds a table to alter it, which fails while the triggers from
+    # 0009 reference it by name. They are recreated after migrate, see
+    # bookApp.search.create_search_triggers.
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for name in SEARCH_TRIGGERS:
+        schema_editor.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+
+def merge_duplicate_genres(apps, schema_editor):
+    # Genre.name becomes unique: move books of duplicate genres onto the oldest one.
+    Genre = apps.get_model('bookApp', 'Genre')
+    Through = apps.get_model('bookApp', 'Book').genres.through
+    duplicates = (
+        Genre.objects.values('name')
+        .annotate(keep_id=models.Min('id'), count=models.Count('id'))
+        .filter(count__gt=1)
+    )
+    for duplicate in duplicates:
+        others = Genre.objects.filter(name=duplicate['name']).exclude(id=duplicate['keep_id'])
+        tagged = Through.objects.filter(genre_id=duplicate['keep_id']).values('book_id')
+        Through.objects.filter(genre__in=others, book_id__in=tagged).delete()
+        Through.objects.filter(genre__in=others).update(genre_id=duplicate['keep_id'])
+        others.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookApp', '0009_book_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_search_triggers, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='author',
+            name='name',
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+        migrations.RunPython(merge_duplicate_genres, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='genre',
+            name='name',
+            field=models.CharField(max_length=100, unique=True),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['publication_year'], name='book_year_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['author', 'publication_year'], name='book_author_year_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.1 on 2026-10-18 16:20
+
+import bookApp.fields
+from django.db import migrations
+
+
+def fill_name_keys(apps, schema_editor):
+    for model_name in ('Author', 'Genre'):
+        model = apps.get_model('bookApp', model_name)
+        max_length = model._meta.get_field('name_key').max_length
+        objs = list(model.objects.only('id', 'name'))
+        for obj in objs:
+            obj.name_key = bookApp.fields.normalize_key(obj.name)[:max_length]
+        model.objects.bulk_update(objs, ['name_key'], batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookApp', '0011_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='author',
+            name='name_key',
+            field=bookApp.fields.NormalizedField(db_index=True, default='', max_length=255, source='name'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='genre',
+            name='name_key',
+            field=bookApp.fields.NormalizedField(db_index=True, default='', max_length=100, source='name'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_name_keys, migrations.RunPython.noop),
+    ]
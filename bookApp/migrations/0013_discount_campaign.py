@@ -0,0 +1,34 @@
+# Generated by Django 5.1 on 2026-10-18 14:29
+
+import django.core.validators
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookApp', '0012_name_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DiscountCampaign',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('percentage', models.DecimalField(decimal_places=2, max_digits=5, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(100)])),
+                ('scope', models.CharField(choices=[('all', 'All books'), ('genre', 'Books of a genre'), ('author', 'Books of an author'), ('years', 'Books published in a range of years')], default='all', max_length=10)),
+                ('year_from', models.IntegerField(blank=True, null=True)),
+                ('year_to', models.IntegerField(blank=True, null=True)),
+                ('starts_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('ends_at', models.DateTimeField(blank=True, null=True)),
+                ('author', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='bookApp.author')),
+                ('genre', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='bookApp.genre')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['starts_at', 'ends_at'], name='campaign_window_idx')],
+            },
+        ),
+    ]
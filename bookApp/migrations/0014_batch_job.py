@@ -0,0 +1,42 @@
+# Generated by Django 5.1 on 2026-10-18 14:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookApp', '0013_discount_campaign'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BatchJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('command', models.CharField(max_length=100)),
+                ('params', models.JSONField(default=dict)),
+                ('status', models.CharField(choices=[('running', 'Running'), ('done', 'Done'), ('abandoned', 'Abandoned')], default='running', max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['command', 'status'], name='batchjob_command_status_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='BatchRange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start', models.BigIntegerField()),
+                ('end', models.BigIntegerField()),
+                ('processed', models.IntegerField(default=0)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ranges', to='bookApp.batchjob')),
+            ],
+            options={
+                'ordering': ['start'],
+            },
+        ),
+    ]
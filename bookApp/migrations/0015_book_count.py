@@ -0,0 +1,40 @@
+# Generated by Django 5.1 on 2026-10-18 14:44
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+
+
+def count_books(apps, schema_editor):
+    for model_name in ('Author', 'Genre'):
+        model = apps.get_model('bookApp', model_name)
+        actual = model.objects.filter(pk=OuterRef('pk')).annotate(count=Count('book')).values('count')
+        model.objects.update(book_count=Subquery(actual))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookApp', '0014_batch_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='author',
+            name='book_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='genre',
+            name='book_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='author',
+            index=models.Index(fields=['book_count', 'id'], name='author_book_count_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='genre',
+            index=models.Index(fields=['book_count', 'id'], name='genre_book_count_idx'),
+        ),
+        migrations.RunPython(count_books, migrations.RunPython.noop),
+    ]
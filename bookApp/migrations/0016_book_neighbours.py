@@ -0,0 +1,35 @@
+# Generated by Django 5.1 on 2026-10-18 14:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookApp', '0015_book_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookFeatures',
+            fields=[
+                ('book', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to='bookApp.book')),
+                ('signature', models.BigIntegerField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='BookNeighbour',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('score', models.FloatField()),
+                ('book', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='neighbours', to='bookApp.book')),
+                ('neighbour', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='bookApp.book')),
+            ],
+            options={
+                'ordering': ['book', 'rank'],
+                'constraints': [models.UniqueConstraint(fields=('book', 'rank'), name='book_neighbour_rank_unique')],
+            },
+        ),
+    ]
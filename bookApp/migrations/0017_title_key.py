@@ -0,0 +1,30 @@
+# Generated by Django 5.1 on 2026-10-18 15:20
+
+import bookApp.fields
+from django.db import migrations
+
+
+def fill_title_keys(apps, schema_editor):
+    Book = apps.get_model('bookApp', 'Book')
+    max_length = Book._meta.get_field('title_key').max_length
+    books = list(Book.objects.only('id', 'title'))
+    for book in books:
+        book.title_key = bookApp.fields.normalize_key(book.title)[:max_length]
+    Book.objects.bulk_update(books, ['title_key'], batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookApp', '0016_book_neighbours'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='title_key',
+            field=bookApp.fields.NormalizedField(db_index=True, default='', max_length=20, source='title'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_title_keys, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.1 on 2026-10-18 18:10
+
+from django.db import migrations, models
+
+TITLE_MAX_LENGTH = 20
+
+
+def check_title_lengths(apps, schema_editor):
+    # Shortening the column would cut or reject longer titles depending on
+    # the database, so they are left for someone to shorten by hand first.
+    Book = apps.get_model('bookApp', 'Book')
+    too_long = list(
+        Book.objects.annotate(length=models.functions.Length('title'))
+        .filter(length__gt=TITLE_MAX_LENGTH).values_list('id', flat=True)[:20]
+    )
+    if too_long:
+        raise ValueError(
+            f"Books with titles longer than {TITLE_MAX_LENGTH} characters must be shortened before "
+            f"this migration, e.g. ids {', '.join(map(str, too_long))}."
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookApp', '0017_title_key'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_title_lengths, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='book',
+            name='title',
+            field=models.CharField(max_length=TITLE_MAX_LENGTH),
+        ),
+    ]
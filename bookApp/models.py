@@ -1,28 +1,206 @@
-from django.db import models
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db import connections, models
+from django.db.models import Count, Exists, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest, Now, Round
+from django.utils import timezone
 from django.contrib.auth.models import User
+from .fields import NormalizedField
+
+
+class BookCountQuerySet(models.QuerySet):
+    """
+    Queries on the denormalized `book_count` of authors and genres.
+
+    The signals in bookApp.signals keep it up to date for saves, deletes and
+    genres changed through Book.genres; code writing books or genre links in
+    bulk calls add_book_counts() or recount() itself.
+    """
+    # Ids per UPDATE in add_book_counts(), below SQLite's limit on query parameters.
+    batch_size = 500
+
+    def add_book_counts(self, deltas):
+        """Add deltas[pk] to the book_count of each object, with one UPDATE per distinct delta, stopping at zero."""
+        by_delta = {}
+        for pk, delta in deltas.items():
+            if delta:
+                by_delta.setdefault(delta, []).append(pk)
+        for delta, pks in by_delta.items():
+            for start in range(0, len(pks), self.batch_size):
+                self.filter(pk__in=pks[start:start + self.batch_size]).update(
+                    book_count=Greatest(F('book_count') + delta, 0)
+                )
+
+    def subtract_book(self):
+        """Take one from the book_count of every object of the queryset, stopping at zero."""
+        # A count can be low after writes that skipped the signals; recount() repairs it.
+        return self.update(book_count=Greatest(F('book_count') - 1, 0))
+
+    def with_actual_book_count(self):
+        return self.annotate(actual_book_count=Count('book'))
+
+    def drifted(self):
+        """Objects whose book_count differs from their number of books, annotated with actual_book_count."""
+        return self.with_actual_book_count().exclude(book_count=F('actual_book_count'))
+
+    def recount(self):
+        """Set book_count from the books table in one UPDATE, and return the number of objects."""
+        actual = self.model.objects.filter(pk=OuterRef('pk')).annotate(count=Count('book')).values('count')
+        return self.update(book_count=Subquery(actual))
 
 
 class Author(models.Model):
     id = models.AutoField(primary_key=True)
-    name = models.CharField(max_length=255)
+    name = models.CharField(max_length=255, db_index=True)
+    name_key = NormalizedField(source='name', max_length=255, db_index=True)
+    book_count = models.PositiveIntegerField(default=0, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = BookCountQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Authors by number of books, paged by keyset on (book_count, id) in either direction.
+            models.Index(fields=['book_count', 'id'], name='author_book_count_idx'),
+        ]
 
     def __str__(self):
         return self.name
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # The name the row had, so saves that keep it leave the autocomplete index alone.
+        if 'name' in field_names:
+            instance._loaded_name = values[field_names.index('name')]
+        return instance
     
 class Genre(models.Model):
-    name = models.CharField(max_length=100)
+    name = models.CharField(max_length=100, unique=True)
+    name_key = NormalizedField(source='name', max_length=100, db_index=True)
+    book_count = models.PositiveIntegerField(default=0, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = BookCountQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['book_count', 'id'], name='genre_book_count_idx'),
+        ]
 
     def __str__(self):
         return (f"{self.name}")
     
+CENTS = Decimal('0.01')
+
+
+def format_price(value):
+    """A price as a string in cents, or None, for the API and the export."""
+    # Annotations such as effective_discounted_price come back from SQLite unrounded.
+    return None if value is None else str(value.quantize(CENTS))
+
+
+def parse_price(value):
+    """A price given in a query string; ValueError or InvalidOperation unless it is a finite number."""
+    price = Decimal(value)
+    if not price.is_finite():
+        raise ValueError(value)
+    return price
+
+
+class BookQuerySet(models.QuerySet):
+
+    def apply_discount(self, discount_percentage):
+        # One UPDATE for the whole queryset; books without a price are left alone.
+        factor = 1 - Decimal(discount_percentage) / 100
+        return self.filter(price__isnull=False).update(
+            discounted_price=Round(F('price') * factor, 2), updated_at=Now()
+        )
+
+    def with_effective_price(self):
+        """
+        Annotate `effective_discounted_price`: the price after the largest
+        discount campaign running now that covers the book, or else the stored
+        discounted_price.
+
+        It is computed by the database on every query, so starting or editing
+        a campaign writes one row instead of every book. Being an annotation
+        over other tables and the clock, it can be filtered and sorted on but
+        not indexed.
+        """
+        through = self.model.genres.through
+        campaigns = DiscountCampaign.objects.running().filter(
+            Q(scope=DiscountCampaign.SCOPE_ALL)
+            | Q(scope=DiscountCampaign.SCOPE_AUTHOR, author_id=OuterRef('author_id'))
+            | Q(scope=DiscountCampaign.SCOPE_YEARS, year_from__lte=OuterRef('publication_year'),
+                year_to__gte=OuterRef('publication_year'))
+            | Q(Exists(through.objects.filter(book_id=OuterRef(OuterRef('pk')), genre_id=OuterRef('genre_id'))),
+                scope=DiscountCampaign.SCOPE_GENRE)
+        )
+        percentage = Subquery(campaigns.order_by('-percentage').values('percentage')[:1])
+        price_field = models.DecimalField(max_digits=10, decimal_places=2)
+        # Multiplied by 0.01 rather than divided by 100, which SQLite would do as integer division.
+        campaign_price = Round(
+            F('price') * (Value(Decimal(1)) - percentage * Value(Decimal('0.01'))), 2, output_field=price_field
+        )
+        return self.annotate(
+            effective_discounted_price=Coalesce(campaign_price, F('discounted_price'), output_field=price_field)
+        )
+
+    def set_price(self, price):
+        # The discounted price was computed from the old price, so it is cleared.
+        return self.update(price=price, discounted_price=None, updated_at=Now())
+
+    def add_genre(self, genre):
+        """Tag every book of the queryset with `genre` in one INSERT ... SELECT, skipping books that have it."""
+        Through = self.model.genres.through
+        connection = connections[self.db]
+        quote = connection.ops.quote_name
+        table = quote(Through._meta.db_table)
+        book_column = quote(Through._meta.get_field('book').column)
+        genre_column = quote(Through._meta.get_field('genre').column)
+        books_sql, params = self.order_by().values('pk').query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} ({book_column}, {genre_column}) "
+                f"SELECT books.id, %s FROM ({books_sql}) books "
+                f"WHERE NOT EXISTS (SELECT 1 FROM {table} tagged "
+                f"WHERE tagged.{book_column} = books.id AND tagged.{genre_column} = %s)",
+                [genre.pk, *params, genre.pk],
+            )
+            added = cursor.rowcount
+        Genre.objects.add_book_counts({genre.pk: added})
+        return added
+
+    def remove_genre(self, genre):
+        """Untag every book of the queryset in one DELETE on the through table."""
+        deleted, _ = self.model.genres.through.objects.filter(
+            genre=genre, book__in=self.order_by().values('pk')
+        ).delete()
+        Genre.objects.add_book_counts({genre.pk: -deleted})
+        return deleted
+
+
 class Book(models.Model):
     id = models.AutoField(primary_key=True)
     title = models.CharField(max_length=20)
+    title_key = NormalizedField(source='title', max_length=20, db_index=True)
     author = models.ForeignKey(Author, on_delete=models.CASCADE)
     publication_year = models.IntegerField()
     genres = models.ManyToManyField(Genre)
     price = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
     discounted_price = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = BookQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['publication_year'], name='book_year_idx'),
+            models.Index(fields=['author', 'publication_year'], name='book_author_year_idx'),
+        ]
 
     def __str__(self):
         return f"ID: {self.id}, Title: {self.title}, Author ID: {self.author}, Publication Year: {self.publication_year}, Genres:{self.genres}, price:{self.price}"
@@ -30,12 +208,158 @@ class Book(models.Model):
 
     def book_details(self):
         return (f"title{self.title,self.author.name}")
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # The author the row had, so moving the book can update both authors' book_count.
+        if 'author_id' in field_names:
+            instance._loaded_author_id = values[field_names.index('author_id')]
+        # The title the row had, so saves that keep it leave the autocomplete index alone.
+        if 'title' in field_names:
+            instance._loaded_title = values[field_names.index('title')]
+        return instance
     
 
+class BookNeighbour(models.Model):
+    """
+    One of a book's most similar books, precomputed by the
+    build_recommendations command; rank 0 is the closest.
+    """
+    book = models.ForeignKey(Book, on_delete=models.CASCADE, related_name='neighbours')
+    neighbour = models.ForeignKey(Book, on_delete=models.CASCADE, related_name='+')
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        ordering = ['book', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['book', 'rank'], name='book_neighbour_rank_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.book_id} -> {self.neighbour_id} ({self.score:.3f})"
+
+
+class BookFeatures(models.Model):
+    """Hash of the author and genres a book's neighbours were last computed from."""
+    book = models.OneToOneField(Book, on_delete=models.CASCADE, primary_key=True, related_name='+')
+    signature = models.BigIntegerField()
+
+
+class DiscountCampaignQuerySet(models.QuerySet):
+
+    def running(self, at=None):
+        """Campaigns whose validity window contains `at`, the database's current time by default."""
+        at = Now() if at is None else at
+        return self.filter(Q(ends_at__isnull=True) | Q(ends_at__gt=at), starts_at__lte=at)
+
+
+class DiscountCampaign(models.Model):
+    SCOPE_ALL = 'all'
+    SCOPE_GENRE = 'genre'
+    SCOPE_AUTHOR = 'author'
+    SCOPE_YEARS = 'years'
+    SCOPES = [
+        (SCOPE_ALL, 'All books'),
+        (SCOPE_GENRE, 'Books of a genre'),
+        (SCOPE_AUTHOR, 'Books of an author'),
+        (SCOPE_YEARS, 'Books published in a range of years'),
+    ]
+
+    name = models.CharField(max_length=100)
+    percentage = models.DecimalField(max_digits=5, decimal_places=2,
+                                     validators=[MinValueValidator(0), MaxValueValidator(100)])
+    scope = models.CharField(max_length=10, choices=SCOPES, default=SCOPE_ALL)
+    genre = models.ForeignKey(Genre, on_delete=models.CASCADE, blank=True, null=True)
+    author = models.ForeignKey(Author, on_delete=models.CASCADE, blank=True, null=True)
+    year_from = models.IntegerField(blank=True, null=True)
+    year_to = models.IntegerField(blank=True, null=True)
+    starts_at = models.DateTimeField(default=timezone.now)
+    ends_at = models.DateTimeField(blank=True, null=True)
+
+    objects = DiscountCampaignQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['starts_at', 'ends_at'], name='campaign_window_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.percentage}%)"
+
+    def clean(self):
+        required = {
+            self.SCOPE_GENRE: ['genre'],
+            self.SCOPE_AUTHOR: ['author'],
+            self.SCOPE_YEARS: ['year_from', 'year_to'],
+        }.get(self.scope, [])
+        missing = {name: "Required for this scope." for name in required if getattr(self, name) is None}
+        if missing:
+            raise ValidationError(missing)
+        if self.ends_at is not None and self.ends_at <= self.starts_at:
+            raise ValidationError({'ends_at': "Must be after the start."})
+
+
+class BatchJob(models.Model):
+    """One run of a partitioned batch command, see bookApp.batch."""
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_ABANDONED = 'abandoned'
+    STATUSES = [
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_ABANDONED, 'Abandoned'),
+    ]
+
+    command = models.CharField(max_length=100)
+    params = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUSES, default=STATUS_RUNNING)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['command', 'status'], name='batchjob_command_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.command} #{self.pk} ({self.status})"
+
+
+class BatchRange(models.Model):
+    """A primary-key range of a batch job; finished_at is set in the transaction that processed it."""
+    job = models.ForeignKey(BatchJob, on_delete=models.CASCADE, related_name='ranges')
+    start = models.BigIntegerField()
+    end = models.BigIntegerField()
+    processed = models.IntegerField(default=0)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['start']
+
+    def __str__(self):
+        return f"{self.start}-{self.end}"
+
+
+class ProfileManager(models.Manager):
+
+    def for_user(self, user):
+        """The user's profile, created on first access instead of at signup."""
+        try:
+            return user.profile
+        except Profile.DoesNotExist:
+            profile, _ = self.get_or_create(user=user, defaults={'biodata': ''})
+            # Also caches the profile on the user, so user.profile works from here on.
+            profile.user = user
+            return profile
+
+
 class Profile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     biodata = models.TextField()
 
+    objects = ProfileManager()
+
     def __str__(self):
         return self.user.username
-    
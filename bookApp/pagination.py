@@ -0,0 +1,214 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db.models import Q, QuerySet
+from django.http import Http404
+from django.shortcuts import redirect
+from django.utils.functional import cached_property
+
+
+class PastFirstPage(Exception):
+    """A previous-page cursor with no rows before it, e.g. after they were deleted."""
+
+
+class KeysetPage:
+    """One page of a keyset-paginated queryset, with opaque cursors to its neighbours."""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+def encode_cursor(values, direction):
+    payload = json.dumps({'k': list(values), 'd': direction}, separators=(',', ':'), default=str)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def _ordering_field(queryset, name):
+    """The model field or annotation a queryset is ordered on."""
+    annotation = queryset.query.annotations.get(name)
+    return annotation.output_field if annotation is not None else queryset.model._meta.get_field(name)
+
+
+def decode_cursor(cursor, ordering, queryset=None):
+    """
+    Values and direction of a cursor, each value converted by its ordering
+    field (or annotation) of `queryset` so a tampered cursor can't reach the query.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values, direction = payload['k'], payload['d']
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise Http404("Invalid cursor.")
+    if direction not in ('next', 'prev') or not isinstance(values, list) or len(values) != len(ordering):
+        raise Http404("Invalid cursor.")
+    if queryset is not None:
+        try:
+            values = [
+                _ordering_field(queryset, _field_and_descending(field)[0]).to_python(value)
+                for field, value in zip(ordering, values)
+            ]
+        except (ValidationError, TypeError, ValueError):
+            raise Http404("Invalid cursor.")
+    if None in values:
+        raise Http404("Invalid cursor.")
+    return values, direction
+
+
+def _field_and_descending(field):
+    return field.lstrip('-'), field.startswith('-')
+
+
+def reverse_ordering(ordering):
+    return tuple(field[1:] if field.startswith('-') else f'-{field}' for field in ordering)
+
+
+def keyset_filter(ordering, values):
+    """
+    Build the filter selecting the rows that come after `values` in `ordering`.
+
+    For an ordering (a, b) this is `a >= x AND (a > x OR (a = x AND b > y))`,
+    with `<` for descending fields, so the database can seek straight to the
+    page through an index on the ordering columns instead of counting past an
+    OFFSET. The redundant `a >= x` is the bound the seek starts from; SQLite
+    can't derive one from the OR alone.
+    """
+    condition = Q()
+    equal = {}
+    for field, value in zip(ordering, values):
+        name, descending = _field_and_descending(field)
+        lookup = f'{name}__lt' if descending else f'{name}__gt'
+        condition |= Q(**equal, **{lookup: value})
+        equal[name] = value
+    if len(ordering) > 1:
+        name, descending = _field_and_descending(ordering[0])
+        condition &= Q(**{f'{name}__lte' if descending else f'{name}__gte': values[0]})
+    return condition
+
+
+def keyset_slice(queryset, ordering, page_size, cursor=None):
+    """
+    Return the queryset for the page selected by `cursor` and the cursor's direction.
+
+    One row more than `page_size` is fetched so `build_page` can tell whether
+    another page follows without a COUNT query.
+    """
+    direction = 'next'
+    if cursor:
+        values, direction = decode_cursor(cursor, ordering, queryset)
+        seek_ordering = ordering if direction == 'next' else reverse_ordering(ordering)
+        queryset = queryset.filter(keyset_filter(seek_ordering, values)).order_by(*seek_ordering)
+    else:
+        queryset = queryset.order_by(*ordering)
+    return queryset[:page_size + 1], direction
+
+
+def _key(obj, ordering):
+    return [getattr(obj, _field_and_descending(field)[0]) for field in ordering]
+
+
+def build_page(rows, ordering, page_size, cursor=None, direction='next'):
+    rows = list(rows)
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if direction == 'prev':
+        rows.reverse()
+    if not rows:
+        return KeysetPage(rows)
+
+    if direction == 'next':
+        has_next, has_previous = has_more, bool(cursor)
+    else:
+        has_next, has_previous = True, has_more
+    next_cursor = encode_cursor(_key(rows[-1], ordering), 'next') if has_next else None
+    previous_cursor = encode_cursor(_key(rows[0], ordering), 'prev') if has_previous else None
+    return KeysetPage(rows, next_cursor, previous_cursor)
+
+
+def paginate_keyset(queryset, ordering, page_size, cursor=None):
+    """The page selected by `cursor`; raise PastFirstPage when a previous-page cursor finds no rows."""
+    page_queryset, direction = keyset_slice(queryset, ordering, page_size, cursor)
+    page = build_page(page_queryset, ordering, page_size, cursor, direction)
+    if not page and direction == 'prev':
+        raise PastFirstPage
+    return page
+
+
+def first_page_redirect(request, cursor_kwarg='cursor'):
+    """Redirect to the same list without the cursor, keeping the other parameters."""
+    query = request.GET.copy()
+    query.pop(cursor_kwarg, None)
+    return redirect(f'{request.path}?{query.urlencode()}' if query else request.path)
+
+
+class KeysetPaginationMixin:
+    """
+    Paginate a ListView by keyset instead of OFFSET.
+
+    Opt in by setting `paginate_by`; `keyset_ordering` must end with a unique
+    column so every row has a distinct position. The template gets `page_obj`
+    with `next_cursor` / `previous_cursor` instead of page numbers. A
+    previous-page cursor with nothing before it redirects to the first page,
+    rather than querying it again within the view's query budget.
+    """
+    keyset_ordering = ('id',)
+    cursor_kwarg = 'cursor'
+
+    def get(self, request, *args, **kwargs):
+        try:
+            return super().get(request, *args, **kwargs)
+        except PastFirstPage:
+            return first_page_redirect(request, self.cursor_kwarg)
+
+    def get_keyset_ordering(self):
+        return self.keyset_ordering
+
+    def paginate_queryset(self, queryset, page_size):
+        cursor = self.request.GET.get(self.cursor_kwarg)
+        page = paginate_keyset(queryset, self.get_keyset_ordering(), page_size, cursor)
+        return (None, page, page.object_list, page.has_other_pages())
+
+
+class CappedCountPaginator(Paginator):
+    """
+    Page-number paginator that counts at most `count_limit` rows.
+
+    COUNT(*) reads every row that matches, so on a large table it costs more
+    than the page itself. The count is taken over the first count_limit + 1
+    rows instead, and `capped` tells when there are more: pages past the
+    limit are reached by narrowing the list rather than by page number.
+    """
+    count_limit = 10000
+
+    @cached_property
+    def _limited_count(self):
+        limited = self.object_list[:self.count_limit + 1]
+        return limited.count() if isinstance(limited, QuerySet) else len(limited)
+
+    @cached_property
+    def count(self):
+        return min(self._limited_count, self.count_limit)
+
+    @property
+    def capped(self):
+        return self._limited_count > self.count_limit
@@ -0,0 +1,82 @@
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryCounter:
+    """Count the queries run on every database connection while active, and the time spent in them."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self._stack = None
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stack.close()
+
+
+class QueryBudgetMixin:
+    """
+    Declare the maximum number of queries a view may run with `query_budget`.
+
+    The budget covers the whole request handled by the view, including the
+    session/user lookups done by the auth mixins and the queries run while the
+    template is rendered. It is only enforced when DEBUG is on.
+    """
+    query_budget = None
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.query_budget is None or not settings.DEBUG:
+            return super().dispatch(request, *args, **kwargs)
+
+        with QueryCounter() as counter:
+            response = super().dispatch(request, *args, **kwargs)
+            # Querysets are lazy, so render here to count the template's queries too.
+            if hasattr(response, 'render') and not response.is_rendered:
+                started = time.perf_counter()
+                response.render()
+                # ServerTimingMiddleware would only see the response already rendered.
+                if hasattr(request, 'timing'):
+                    request.timing.template = time.perf_counter() - started
+
+        if counter.count > self.query_budget:
+            raise QueryBudgetExceeded(
+                f"{type(self).__name__} ran {counter.count} queries, "
+                f"its budget is {self.query_budget}."
+            )
+        return response
+
+
+@contextmanager
+def assert_query_budget(view_class, using='default'):
+    """Test helper: fail if the wrapped block goes over the view's query budget."""
+    budget = view_class.query_budget
+    with CaptureQueriesContext(connections[using]) as context:
+        yield context
+    if len(context) > budget:
+        queries = '\n'.join(query['sql'] for query in context.captured_queries)
+        raise QueryBudgetExceeded(
+            f"{view_class.__name__} ran {len(context)} queries, "
+            f"its budget is {budget}:\n{queries}"
+        )
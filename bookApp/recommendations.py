@@ -0,0 +1,261 @@
+"""
+"Readers also browse": each book's most similar books, precomputed.
+
+A book is described by its genres and its author. Two books score the cosine
+of their genre vectors, weighted by 1 - author_weight, plus author_weight when
+they share the author, so the score runs from 0 (nothing in common) to 1.
+
+Scores are computed with NumPy for a block of books against the whole catalog
+at a time, never as an N x N matrix, and only the top K of each row are kept.
+The genre vectors are kept sparse, as lists of genres: a book has a genre or
+two, so a dense N x G matrix would be mostly zeros. Every genre of a book
+weighs the same, so the cosine of two books is the number of genres they
+share over the product of their vector norms. It depends on the two genre
+sets only, and catalogs have far fewer distinct sets than books, so it is
+computed once per pair of sets and looked up for each pair of books. The
+author part is an equality test on author ids rather than a column per
+author.
+"""
+import hashlib
+import itertools
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Count, F, Max
+from .models import Book, BookFeatures, BookNeighbour
+
+TOP_K = 10
+AUTHOR_WEIGHT = 0.3
+# Scores held in memory at once, block rows x catalog size (4 bytes each).
+BLOCK_SCORES = 4_000_000
+# Rows fetched per query while loading the catalog.
+LOAD_CHUNK_SIZE = 10000
+# Books whose neighbours are replaced per transaction.
+WRITE_BATCH = 5000
+# Ids per IN (...) list, below SQLite's limit on query parameters.
+IDS_PER_QUERY = 500
+
+
+def _pairs(queryset):
+    values = itertools.chain.from_iterable(queryset.iterator(chunk_size=LOAD_CHUNK_SIZE))
+    return np.fromiter(values, dtype=np.int64).reshape(-1, 2)
+
+
+def _signature(author_id, genre_ids):
+    digest = hashlib.blake2b(f"{author_id}:{genre_ids}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big', signed=True)
+
+
+def _lookup(sorted_ids, ids):
+    """Positions of `ids` in the sorted array `sorted_ids`, and which of them are there."""
+    rows = np.searchsorted(sorted_ids, ids)
+    found = rows < len(sorted_ids)
+    found[found] = sorted_ids[rows[found]] == ids[found]
+    return rows, found
+
+
+def _ranges(starts, ends):
+    """The concatenated np.arange(start, end) of each start and end."""
+    lengths = ends - starts
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return offsets + np.arange(len(offsets))
+
+
+def _batches(ids):
+    for start in range(0, len(ids), IDS_PER_QUERY):
+        yield [int(pk) for pk in ids[start:start + IDS_PER_QUERY]]
+
+
+class CatalogFeatures:
+    """
+    The feature vectors of every book. Row i of each array is the book ids[i],
+    ids being sorted.
+
+    The genres are given as `links`, (row, genre column) pairs. Each distinct
+    set of genres is a profile, the books' profiles are in `profiles`, and
+    the profiles are kept as two index lists: the genre columns of profile p
+    are profile_genres[genre_bounds[p]:genre_bounds[p + 1]] and the profiles
+    with genre column g are genre_profiles[profile_bounds[g]:profile_bounds[g + 1]].
+    """
+
+    def __init__(self, ids, authors, links, signatures, author_weight=AUTHOR_WEIGHT):
+        self.ids = ids
+        # Small dense author codes make the broadcast comparison over the catalog cheaper.
+        self.authors = np.unique(authors, return_inverse=True)[1].astype(np.int32)
+        rows, columns = links[:, 0], links[:, 1]
+        order = np.lexsort((columns, rows))
+        bounds = np.searchsorted(rows[order], np.arange(len(ids) + 1))
+        linked = columns[order]
+        book_genres = [linked[bounds[i]:bounds[i + 1]] for i in range(len(ids))]
+        sets = {}
+        self.profiles = np.array([sets.setdefault(genres.tobytes(), len(sets)) for genres in book_genres],
+                                 dtype=np.int64)
+        # Profiles are numbered in order of first appearance, so their first books come in profile order.
+        profile_genres = [book_genres[row] for row in np.unique(self.profiles, return_index=True)[1]]
+        lengths = np.array([len(genres) for genres in profile_genres], dtype=np.int64)
+        self.profile_genres = np.concatenate(profile_genres or [columns[:0]]).astype(np.int64)
+        self.genre_bounds = np.concatenate(([0], np.cumsum(lengths)))
+        profile_rows = np.repeat(np.arange(len(lengths)), lengths)
+        order = np.lexsort((profile_rows, self.profile_genres))
+        self.genre_count = int(columns.max()) + 1 if len(columns) else 0
+        self.genre_profiles = profile_rows[order]
+        self.profile_bounds = np.searchsorted(self.profile_genres[order], np.arange(self.genre_count + 1))
+        lengths = lengths.astype(np.float32)
+        self.inverse_norms = np.divide(1, np.sqrt(lengths), out=np.zeros_like(lengths), where=lengths > 0)
+        self.signatures = signatures
+        self.author_weight = author_weight
+
+    @classmethod
+    def load(cls, author_weight=AUTHOR_WEIGHT):
+        books = _pairs(Book.objects.order_by('id').values_list('id', 'author_id'))
+        ids, authors = books[:, 0], books[:, 1]
+        links = _pairs(Book.genres.through.objects.values_list('book_id', 'genre_id'))
+        rows, known = _lookup(ids, links[:, 0])
+        # Skip the links of books added after the books were read.
+        links, rows = links[known], rows[known]
+        columns = np.unique(links[:, 1], return_inverse=True)[1]
+
+        order = np.lexsort((links[:, 1], rows))
+        bounds = np.searchsorted(rows[order], np.arange(len(ids) + 1))
+        linked = links[order, 1]
+        signatures = np.array([
+            _signature(author, linked[bounds[i]:bounds[i + 1]].tolist()) for i, author in enumerate(authors.tolist())
+        ], dtype=np.int64)
+        return cls(ids, authors, np.column_stack((rows, columns)), signatures, author_weight)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def profile_scores(self, profiles):
+        """Genre cosine of the `profiles` to every profile, as a len(profiles) x P array."""
+        # Genres shared, counted one genre at a time: its profiles among
+        # `profiles` against all of its profiles.
+        shared = np.zeros((len(profiles), len(self.inverse_norms)), dtype=np.float32)
+        starts, ends = self.genre_bounds[profiles], self.genre_bounds[profiles + 1]
+        positions = np.repeat(np.arange(len(profiles)), ends - starts)
+        columns = self.profile_genres[_ranges(starts, ends)]
+        order = np.argsort(columns, kind='stable')
+        positions, columns = positions[order], columns[order]
+        genres, firsts, counts = np.unique(columns, return_index=True, return_counts=True)
+        for genre, first, count in zip(genres.tolist(), firsts.tolist(), counts.tolist()):
+            with_genre = self.genre_profiles[self.profile_bounds[genre]:self.profile_bounds[genre + 1]]
+            shared[np.ix_(positions[first:first + count], with_genre)] += 1
+        shared *= self.inverse_norms
+        shared *= self.inverse_norms[profiles, None]
+        return shared
+
+    def scores(self, rows):
+        """Similarity of the books at `rows` to every book, as a len(rows) x N array; a book scores -1 to itself."""
+        profiles, inverse = np.unique(self.profiles[rows], return_inverse=True)
+        # The genre weight is applied to the small profile array, and the
+        # author part is added in place, so the block's scores are the only
+        # array of its size.
+        genre_scores = self.profile_scores(profiles) * (1 - self.author_weight)
+        scores = np.take(genre_scores[inverse], self.profiles, axis=1)
+        np.add(scores, self.author_weight, out=scores, where=self.authors[rows, None] == self.authors[None, :])
+        scores[np.arange(len(rows)), rows] = -1
+        return scores
+
+    def blocks(self, rows, block_size=None):
+        """Split `rows` into blocks whose scores fit in BLOCK_SCORES."""
+        block_size = block_size or max(BLOCK_SCORES // max(len(self), 1), 1)
+        for start in range(0, len(rows), block_size):
+            yield rows[start:start + block_size]
+
+    def rows_of(self, ids):
+        """Rows of the books in `ids` that are in the catalog."""
+        rows, found = _lookup(self.ids, np.fromiter(ids, dtype=np.int64))
+        return rows[found]
+
+
+def top_k(scores, k):
+    """Column indices and scores of the k highest positive scores of each row, best first."""
+    k = min(k, scores.shape[1])
+    if k == 0:
+        empty = np.empty((len(scores), 0))
+        return empty.astype(np.int64), empty
+    # Selecting the k smallest of the negated scores is several times faster
+    # than the k largest, with the many ties of discrete scores.
+    candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+    order = np.argsort(-candidate_scores, axis=1, kind='stable')
+    return np.take_along_axis(candidates, order, axis=1), np.take_along_axis(candidate_scores, order, axis=1)
+
+
+def changed_rows(features):
+    """Rows of the books whose author or genres differ from the last run, or that are new."""
+    stored = _pairs(BookFeatures.objects.order_by('book_id').values_list('book_id', 'signature'))
+    rows, same = _lookup(features.ids, stored[:, 0])
+    same[same] = features.signatures[rows[same]] == stored[same, 1]
+    unchanged = np.zeros(len(features), dtype=bool)
+    unchanged[rows[same]] = True
+    return np.flatnonzero(~unchanged)
+
+
+def affected_rows(features, changed, k, block_size=None):
+    """
+    The books whose neighbours must be recomputed after the books at
+    `changed` changed: those books, the books that had one of them as a
+    neighbour, the books one of them now beats the last neighbour of, and the
+    books that lost a neighbour that was deleted.
+    """
+    affected = np.zeros(len(features), dtype=bool)
+    affected[changed] = True
+    changed_ids = features.ids[changed]
+    for ids in _batches(changed_ids):
+        had = BookNeighbour.objects.filter(neighbour_id__in=ids).values_list('book_id', flat=True)
+        affected[features.rows_of(had)] = True
+    lost = (
+        BookNeighbour.objects.values('book_id').annotate(kept=Count('id'), last=Max('rank'))
+        .filter(kept__lte=F('last')).values_list('book_id', flat=True)
+    )
+    affected[features.rows_of(lost)] = True
+
+    # Scores are symmetric, so the changed books' rows also give what every
+    # other book now scores against them.
+    last = np.zeros(len(features), dtype=np.float32)
+    stored = list(BookNeighbour.objects.filter(rank=k - 1).values_list('book_id', 'score'))
+    rows, found = _lookup(features.ids, np.array([book_id for book_id, _ in stored], dtype=np.int64))
+    last[rows[found]] = np.array([score for _, score in stored], dtype=np.float32)[found]
+    for block in features.blocks(changed, block_size):
+        best = features.scores(block).max(axis=0)
+        affected |= (best > last) & (best > 0)
+    return np.flatnonzero(affected)
+
+
+def store_neighbours(features, rows, k, block_size=None):
+    """
+    Compute and replace the neighbours of the books at `rows`, committing
+    every WRITE_BATCH books. Yields how many books are done after each commit.
+    """
+    for start in range(0, len(rows), WRITE_BATCH):
+        batch = rows[start:start + WRITE_BATCH]
+        neighbours = []
+        for block in features.blocks(batch, block_size):
+            columns, scores = top_k(features.scores(block), k)
+            # Rows are sorted best first, so the positive scores are a prefix and their positions are the ranks.
+            block_rows, ranks = np.nonzero(scores > 0)
+            neighbours += [
+                BookNeighbour(book_id=book_id, neighbour_id=neighbour_id, rank=rank, score=score)
+                for book_id, neighbour_id, rank, score in zip(
+                    features.ids[block[block_rows]].tolist(),
+                    features.ids[columns[block_rows, ranks]].tolist(),
+                    ranks.tolist(),
+                    scores[block_rows, ranks].tolist(),
+                )
+            ]
+        with transaction.atomic():
+            for ids in _batches(features.ids[batch]):
+                BookNeighbour.objects.filter(book_id__in=ids).delete()
+            BookNeighbour.objects.bulk_create(neighbours, batch_size=LOAD_CHUNK_SIZE)
+        yield start + len(batch)
+
+
+def store_signatures(features, rows):
+    """Record the features the books at `rows` were computed from, for the next incremental run."""
+    with transaction.atomic():
+        for ids in _batches(features.ids[rows]):
+            BookFeatures.objects.filter(book_id__in=ids).delete()
+        BookFeatures.objects.bulk_create([
+            BookFeatures(book_id=int(features.ids[row]), signature=int(features.signatures[row])) for row in rows
+        ], batch_size=LOAD_CHUNK_SIZE)
@@ -0,0 +1,141 @@
+import re
+
+from django.db import connection, connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+SEARCH_TABLE = 'bookApp_book_fts'
+# bm25 column weights: a match in the title counts more than one in the author name.
+RANK = f'bm25({SEARCH_TABLE}, 10.0, 1.0)'
+
+SEARCH_TRIGGERS = {
+    'bookApp_book_fts_insert': f"""
+        CREATE TRIGGER IF NOT EXISTS bookApp_book_fts_insert AFTER INSERT ON bookApp_book BEGIN
+            INSERT INTO {SEARCH_TABLE} (rowid, title, author_name)
+            SELECT new.id, new.title, name FROM bookApp_author WHERE id = new.author_id;
+        END
+    """,
+    'bookApp_book_fts_update': f"""
+        CREATE TRIGGER IF NOT EXISTS bookApp_book_fts_update AFTER UPDATE OF title, author_id ON bookApp_book BEGIN
+            DELETE FROM {SEARCH_TABLE} WHERE rowid = old.id;
+            INSERT INTO {SEARCH_TABLE} (rowid, title, author_name)
+            SELECT new.id, new.title, name FROM bookApp_author WHERE id = new.author_id;
+        END
+    """,
+    'bookApp_book_fts_delete': f"""
+        CREATE TRIGGER IF NOT EXISTS bookApp_book_fts_delete AFTER DELETE ON bookApp_book BEGIN
+            DELETE FROM {SEARCH_TABLE} WHERE rowid = old.id;
+        END
+    """,
+    'bookApp_author_fts_update': f"""
+        CREATE TRIGGER IF NOT EXISTS bookApp_author_fts_update AFTER UPDATE OF name ON bookApp_author BEGIN
+            UPDATE {SEARCH_TABLE} SET author_name = new.name
+            WHERE rowid IN (SELECT id FROM bookApp_book WHERE author_id = new.id);
+        END
+    """,
+}
+
+
+def search_index_available():
+    # The FTS5 table (migration 0009) and its triggers only exist on SQLite.
+    return connection.vendor == 'sqlite'
+
+
+def drop_search_triggers(sender=None, using='default', plan=None, **kwargs):
+    """
+    pre_migrate handler: drop the sync triggers before a schema change of this app.
+
+    SQLite rebuilds a table to alter it, which fails while triggers on other
+    tables still reference it by name. A migrate that applies none of this
+    app's migrations leaves them in place.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+    if plan is not None and sender is not None and not any(
+        migration.app_label == sender.label for migration, _ in plan
+    ):
+        return
+    with connection.cursor() as cursor:
+        for name in SEARCH_TRIGGERS:
+            cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+
+def create_search_triggers(using='default', **kwargs):
+    """
+    post_migrate handler: recreate the sync triggers, and rebuild the index
+    from the tables when it may be out of date.
+
+    That is when a trigger was missing, as writes made without it (e.g. by a
+    data migration) aren't in the index, or when the index and the book table
+    hold different numbers of rows. Otherwise the triggers have kept the
+    index in sync and migrate leaves it alone.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+    tables = connection.introspection.table_names()
+    if SEARCH_TABLE not in tables or 'bookApp_book' not in tables:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+        existing = {row[0] for row in cursor.fetchall()}
+        missing = [name for name in SEARCH_TRIGGERS if name not in existing]
+        for name in missing:
+            cursor.execute(SEARCH_TRIGGERS[name])
+        if not missing:
+            cursor.execute(f"SELECT (SELECT COUNT(*) FROM {SEARCH_TABLE}) = (SELECT COUNT(*) FROM bookApp_book)")
+            if cursor.fetchone()[0]:
+                return
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+        cursor.execute(f"""
+            INSERT INTO {SEARCH_TABLE} (rowid, title, author_name)
+            SELECT book.id, book.title, author.name
+            FROM bookApp_book book JOIN bookApp_author author ON author.id = book.author_id
+        """)
+
+
+def match_expression(query):
+    """
+    Turn user input into an FTS5 MATCH expression.
+
+    Every word is quoted so FTS5 operators typed by the user are matched as
+    text, and the last word is a prefix match so results show up while typing.
+    """
+    words = re.findall(r'\w+', query)
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def ranked_book_ids(query, limit, offset=0):
+    match = match_expression(query)
+    if match is None:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s ORDER BY {RANK} LIMIT %s OFFSET %s",
+            [match, limit, offset],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def filter_books(queryset, query):
+    """Filter a Book queryset down to the search matches, without ranking them."""
+    if not search_index_available():
+        return queryset.filter(Q(title__icontains=query) | Q(author__name__icontains=query))
+    match = match_expression(query)
+    if match is None:
+        return queryset.none()
+    return queryset.filter(id__in=RawSQL(f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s", (match,)))
+
+
+def search_books(queryset, query, limit, offset=0):
+    """Return up to `limit` books of `queryset` matching `query`, best match first."""
+    if not search_index_available():
+        return list(filter_books(queryset, query).order_by('title', 'id')[offset:offset + limit])
+    ids = ranked_book_ids(query, limit, offset)
+    books = queryset.in_bulk(ids)
+    return [books[book_id] for book_id in ids if book_id in books]
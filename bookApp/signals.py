@@ -1,13 +1,121 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
 from django.dispatch import receiver
-from django.contrib.auth.models import User
-from .models import Profile
+from django.contrib.auth.models import Group, Permission, User
+from .autocomplete import name_changed
+from .backends import bump_permissions_version
+from .cache import bump_catalog_version, forget_campaign_boundaries
+from .models import Author, Book, DiscountCampaign, Genre
 
-@receiver(post_save, sender=User)
-def create_user_profile(sender, instance, created, **kwargs):
-    if created:
-        Profile.objects.create(user=instance)
+# Profiles are created on first access with Profile.objects.for_user() and
+# saved on their own, so saving a User (e.g. last_login at every login) runs
+# no Profile queries.
 
-@receiver(post_save, sender=User)
-def save_user_profile(sender, instance, **kwargs):
-    instance.profile.save()
+
+def catalog_changed(sender, **kwargs):
+    bump_catalog_version()
+
+
+for model in (Book, Author, Genre):
+    post_save.connect(catalog_changed, sender=model, dispatch_uid=f'catalog_changed_save_{model.__name__}')
+    post_delete.connect(catalog_changed, sender=model, dispatch_uid=f'catalog_changed_delete_{model.__name__}')
+
+
+@receiver(m2m_changed, sender=Book.genres.through)
+def book_genres_changed(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_catalog_version()
+
+
+# book_count of authors and genres. Every change is an F() increment or
+# decrement of the rows involved, run in the transaction of the change itself.
+# Decrements stop at zero, so books written without signals (bulk_create) can
+# still be deleted; `manage.py recount` finds and repairs any drift.
+
+@receiver(pre_save, sender=Book)
+def remember_book_author(sender, instance, **kwargs):
+    # Books not loaded from the database (e.g. built from a pk, or by loaddata) look up the author they had.
+    if instance.pk is not None and not hasattr(instance, '_loaded_author_id'):
+        instance._loaded_author_id = Book.objects.filter(pk=instance.pk).values_list('author_id', flat=True).first()
+
+
+@receiver(post_save, sender=Book)
+def count_saved_book(sender, instance, created, update_fields=None, **kwargs):
+    if not created and update_fields is not None and not {'author', 'author_id'} & update_fields:
+        # The author column wasn't written, the row keeps the author it had.
+        return
+    previous = None if created else getattr(instance, '_loaded_author_id', None)
+    if previous != instance.author_id:
+        Author.objects.add_book_counts({instance.author_id: 1, **({previous: -1} if previous else {})})
+    instance._loaded_author_id = instance.author_id
+
+
+@receiver(pre_delete, sender=Book)
+def uncount_deleted_book(sender, instance, **kwargs):
+    # The book's genre links are deleted with it, without m2m_changed.
+    Genre.objects.filter(book=instance).subtract_book()
+    Author.objects.filter(pk=instance.author_id).subtract_book()
+
+
+@receiver(m2m_changed, sender=Book.genres.through)
+def count_book_genres(sender, instance, action, reverse, pk_set, **kwargs):
+    # Added pk_sets hold only the links that were missing; removed ones may
+    # name links that don't exist, so those are counted before the DELETE.
+    if not reverse:
+        if action == 'post_add':
+            Genre.objects.add_book_counts(dict.fromkeys(pk_set, 1))
+        elif action == 'pre_remove':
+            Genre.objects.filter(pk__in=pk_set, book=instance).subtract_book()
+        elif action == 'pre_clear':
+            Genre.objects.filter(book=instance).subtract_book()
+    else:
+        if action == 'post_add':
+            Genre.objects.add_book_counts({instance.pk: len(pk_set)})
+        elif action == 'pre_remove':
+            removed = sender.objects.filter(genre=instance, book__in=pk_set).count()
+            Genre.objects.add_book_counts({instance.pk: -removed})
+        elif action == 'pre_clear':
+            Genre.objects.filter(pk=instance.pk).update(book_count=0)
+
+
+# Autocomplete names, applied to this process's index once the change commits.
+
+def autocomplete_name_saved(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    kind, field = {Book: ('title', 'title'), Author: ('author', 'name')}[sender]
+    if raw or (update_fields is not None and field not in update_fields):
+        return
+    name = getattr(instance, field)
+    # Saves that keep the name loaded from the database (e.g. a price edit) change nothing in the index.
+    if created or getattr(instance, f'_loaded_{field}', None) != name:
+        name_changed(kind, instance.pk, name)
+    setattr(instance, f'_loaded_{field}', name)
+
+
+def autocomplete_name_deleted(sender, instance, **kwargs):
+    name_changed('title' if sender is Book else 'author', instance.pk)
+
+
+for model in (Book, Author):
+    post_save.connect(autocomplete_name_saved, sender=model, dispatch_uid=f'autocomplete_saved_{model.__name__}')
+    post_delete.connect(autocomplete_name_deleted, sender=model, dispatch_uid=f'autocomplete_deleted_{model.__name__}')
+
+
+@receiver([post_save, post_delete], sender=DiscountCampaign)
+def campaign_changed(sender, **kwargs):
+    # Campaign prices are computed by the database, only the cached pages and
+    # campaign windows need to go.
+    forget_campaign_boundaries()
+    bump_catalog_version()
+
+
+def permissions_changed(sender, action=None, **kwargs):
+    # post_save and post_delete pass no action.
+    if action in (None, 'post_add', 'post_remove', 'post_clear'):
+        bump_permissions_version()
+
+
+for through in (User.groups.through, User.user_permissions.through, Group.permissions.through):
+    m2m_changed.connect(permissions_changed, sender=through, dispatch_uid=f'permissions_changed_{through.__name__}')
+# Deleting a group or permission removes its m2m rows without m2m_changed.
+for model in (Group, Permission):
+    post_save.connect(permissions_changed, sender=model, dispatch_uid=f'permissions_changed_save_{model.__name__}')
+    post_delete.connect(permissions_changed, sender=model, dispatch_uid=f'permissions_changed_delete_{model.__name__}')
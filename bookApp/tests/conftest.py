@@ -0,0 +1,48 @@
+import subprocess
+import sys
+
+import pytest
+from django.conf import settings as django_settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test.client import Client
+
+
+@pytest.fixture(autouse=True)
+def clear_cache(settings, tmp_path):
+    """
+    Cached pages outlive the per-test database rollback, so start every test
+    with an empty cache, and a shared cache of its own.
+    """
+    settings.CACHES = {**settings.CACHES, 'shared': {**settings.CACHES['shared'], 'LOCATION': tmp_path / 'shared'}}
+    for cache in caches.all():
+        cache.clear()
+    yield
+    for cache in caches.all():
+        cache.clear()
+
+
+@pytest.fixture
+def logged_in_client(db):
+    User.objects.create_user(username="root", password="password@123")
+    client = Client()
+    client.login(username="root", password="password@123")
+    return client
+
+
+@pytest.fixture
+def other_process():
+    """Run Python code in a separate process with the same shared cache, as another worker or command would."""
+    def run(code):
+        script = (
+            "import sys, django\n"
+            "from django.conf import settings\n"
+            "settings.CACHES['shared']['LOCATION'] = sys.argv[1]\n"
+            "django.setup()\n"
+            "exec(sys.argv[2])\n"
+        )
+        subprocess.run(
+            [sys.executable, '-c', script, str(django_settings.CACHES['shared']['LOCATION']), code],
+            cwd=django_settings.BASE_DIR, check=True,
+        )
+    return run
@@ -0,0 +1,151 @@
+from io import StringIO
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from bookApp.fields import normalize_key
+from bookApp.models import Book, Author, Genre
+from bookApp.pagination import CappedCountPaginator
+
+
+@pytest.fixture
+def admin_client(db):
+    User.objects.create_superuser(username="admin", password="password@123")
+    client = Client()
+    client.login(username="admin", password="password@123")
+    return client
+
+
+def query_count(client, url, params=None):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, params or {})
+    assert response.status_code == 200
+    return len(queries)
+
+
+def seed(books):
+    call_command('seed_catalog', books=books, seed=1, stdout=StringIO())
+
+
+def test_normalize_key():
+    assert normalize_key("  Émile   ZOLA ") == "emile zola"
+    assert normalize_key("Straße") == "strasse"
+
+
+@pytest.mark.django_db
+def test_name_key_is_kept_on_save_and_bulk_create():
+    # Act
+    author = Author.objects.create(name="Jeyamohan")
+    author.name = "Ámbai"
+    author.save()
+    Genre.objects.bulk_create([Genre(name="Science Fiction")])
+
+    # Assert
+    assert Author.objects.get(pk=author.pk).name_key == "ambai"
+    assert Genre.objects.get().name_key == "science fiction"
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url_name, params", [
+    ('admin:bookApp_book_changelist', {}),
+    ('admin:bookApp_book_changelist', {'q': "River"}),
+    ('admin:bookApp_book_changelist', {'publication_year': 2024}),
+    ('admin:bookApp_author_changelist', {}),
+])
+def test_changelist_queries_do_not_grow_with_the_catalog(admin_client, url_name, params):
+    # Arrange
+    seed(30)
+    url = reverse(url_name)
+    query_count(admin_client, url, params)  # warms the permission and content type caches
+    small = query_count(admin_client, url, params)
+    seed(3000)
+
+    # Act / Assert
+    assert query_count(admin_client, url, params) == small
+
+
+@pytest.mark.django_db
+def test_changelist_on_100k_books_runs_a_fixed_number_of_bounded_queries(admin_client):
+    # Arrange
+    seed(100_000)
+    url = reverse('admin:bookApp_book_changelist')
+    query_count(admin_client, url)  # warms the permission and content type caches
+
+    for params in ({}, {'q': "River"}, {'publication_year': 2024}, {'p': 50}):
+        # Act: session, user, author and genre filter choices, capped count, books with authors, years
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_client.get(url, params)
+
+        # Assert
+        assert response.status_code == 200
+        assert len(queries) == 7, params
+        counts = [query['sql'] for query in queries.captured_queries if 'COUNT(' in query['sql']]
+        assert len(counts) == 1 and f"LIMIT {CappedCountPaginator.count_limit + 1}" in counts[0]
+    assert f"{CappedCountPaginator.count_limit}+ books" in admin_client.get(url).content.decode()
+
+
+def test_capped_count_paginator_counts_up_to_its_limit(monkeypatch):
+    # Arrange
+    monkeypatch.setattr(CappedCountPaginator, 'count_limit', 100)
+
+    # Act
+    under, over = CappedCountPaginator(range(100), 10), CappedCountPaginator(range(101), 10)
+
+    # Assert
+    assert (under.count, under.capped, under.num_pages) == (100, False, 10)
+    assert (over.count, over.capped, over.num_pages) == (100, True, 10)
+
+
+@pytest.mark.django_db
+def test_changelist_filters_list_a_limited_number_of_choices(admin_client):
+    # Arrange
+    seed(500)
+    author = Author.objects.order_by('-name_key').first()
+
+    # Act
+    response = admin_client.get(reverse('admin:bookApp_book_changelist'), {'author': author.pk})
+
+    # Assert
+    author_filter = response.context['cl'].filter_specs[0]
+    choices = author_filter.lookup_choices
+    assert len(choices) == author_filter.limit + 1
+    assert (author.pk, author.name) in choices
+    assert set(response.context['cl'].result_list.values_list('author_id', flat=True)) == {author.pk}
+    assert response.context['cl'].full_result_count is None
+
+
+@pytest.mark.django_db
+def test_change_form_queries_do_not_grow_with_authors_and_genres(admin_client):
+    # Arrange
+    seed(30)
+    book = Book.objects.first()
+    url = reverse('admin:bookApp_book_change', args=[book.pk])
+    query_count(admin_client, url)  # warms the permission and content type caches
+    small = query_count(admin_client, url)
+    seed(3000)
+
+    # Act / Assert
+    assert query_count(admin_client, url) == small
+
+
+@pytest.mark.django_db
+def test_author_autocomplete_uses_prefix_range_on_name_key(admin_client):
+    # Arrange
+    Author.objects.create(name="Kalki Krishnamurthy")
+    Author.objects.create(name="Kalidasa")
+    Author.objects.create(name="Ambai")
+
+    # Act
+    with CaptureQueriesContext(connection) as queries:
+        response = admin_client.get(reverse('admin:autocomplete'), {
+            'app_label': 'bookApp', 'model_name': 'book', 'field_name': 'author', 'term': "KALI",
+        })
+
+    # Assert
+    assert [result['text'] for result in response.json()['results']] == ["Kalidasa"]
+    assert any('"name_key" >= ' in query['sql'] and '"name_key" < ' in query['sql']
+               for query in queries.captured_queries)
@@ -0,0 +1,128 @@
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from bookApp.cache import get_catalog_version
+from bookApp.models import Book, Author, Genre
+
+
+@pytest.fixture
+def admin_client(db):
+    User.objects.create_superuser(username="admin", password="password@123")
+    client = Client()
+    client.login(username="admin", password="password@123")
+    return client
+
+
+@pytest.fixture
+def books(db):
+    author = Author.objects.create(name="Kalki")
+    fiction = Genre.objects.create(name="Fiction")
+    Genre.objects.create(name="Poetry")
+    books = [
+        Book.objects.create(title=f"Book{i}", author=author, publication_year=2020 + i % 2,
+                            price=Decimal('10.00') if i else None)
+        for i in range(6)
+    ]
+    books[0].genres.add(fiction)
+    return books
+
+
+def run_action(client, action, books=None, **inputs):
+    """Post an action for the given books, or for every book matching the changelist ("select all")."""
+    data = {'action': action, 'index': 0, **inputs}
+    if books is None:
+        data.update(select_across=1, _selected_action=[Book.objects.first().pk])
+    else:
+        data['_selected_action'] = [book.pk for book in books]
+    with CaptureQueriesContext(connection) as queries:
+        response = client.post(reverse('admin:bookApp_book_changelist'), data, follow=True)
+    assert response.status_code == 200
+    statements = [query['sql'] for query in queries.captured_queries
+                  if query['sql'].startswith(('UPDATE "bookApp_book"', 'INSERT INTO "bookApp_book_genres"',
+                                              'DELETE FROM "bookApp_book_genres"'))]
+    return response, statements
+
+
+@pytest.mark.django_db
+def test_apply_discount_to_all_books(admin_client, books):
+    # Arrange
+    version = get_catalog_version()
+
+    # Act
+    response, statements = run_action(admin_client, 'apply_discount', percentage='25')
+
+    # Assert
+    assert len(statements) == 1
+    assert set(Book.objects.exclude(price=None).values_list('discounted_price', flat=True)) == {Decimal('7.50')}
+    assert "Discounted 5 books by 25%." in response.content.decode()
+    assert get_catalog_version() != version
+
+
+@pytest.mark.django_db
+def test_set_price_of_selected_books(admin_client, books):
+    # Act
+    _, statements = run_action(admin_client, 'set_price', books[:2], price='4.99')
+
+    # Assert
+    assert len(statements) == 1
+    assert list(Book.objects.filter(price=Decimal('4.99')).order_by('id')) == books[:2]
+    assert Book.objects.get(pk=books[1].pk).discounted_price is None
+
+
+@pytest.mark.django_db
+def test_add_genre_skips_books_that_have_it(admin_client, books):
+    # Act
+    response, statements = run_action(admin_client, 'add_genre', genre="Fiction")
+
+    # Assert
+    assert len(statements) == 1
+    assert Genre.objects.get(name="Fiction").book_set.count() == 6
+    assert "Added Fiction to 5 books." in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_add_genre_to_a_filtered_selection(admin_client, books):
+    # Act
+    # "Select all" on a changelist filtered on the year.
+    data = {'action': 'add_genre', 'index': 0, 'genre': "Poetry", 'select_across': 1,
+            '_selected_action': [books[1].pk]}
+    admin_client.post(reverse('admin:bookApp_book_changelist') + '?publication_year=2021', data)
+
+    # Assert
+    assert set(Genre.objects.get(name="Poetry").book_set.values_list('publication_year', flat=True)) == {2021}
+    assert Genre.objects.get(name="Poetry").book_set.count() == 3
+
+
+@pytest.mark.django_db
+def test_remove_genre(admin_client, books):
+    # Arrange
+    Book.objects.add_genre(Genre.objects.get(name="Poetry"))
+
+    # Act
+    response, statements = run_action(admin_client, 'remove_genre', books[:4], genre="Poetry")
+
+    # Assert
+    assert len(statements) == 1
+    assert Genre.objects.get(name="Poetry").book_set.count() == 2
+    assert "Removed Poetry from 4 books." in response.content.decode()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("action, inputs, message", [
+    ('apply_discount', {}, "Enter a valid percentage"),
+    ('apply_discount', {'percentage': '150'}, "Enter a valid percentage"),
+    ('set_price', {'price': 'free'}, "Enter a valid price"),
+    ('add_genre', {'genre': "Cookery"}, "There is no genre named Cookery."),
+])
+def test_actions_reject_missing_or_invalid_inputs(admin_client, books, action, inputs, message):
+    # Act
+    response, statements = run_action(admin_client, action, **inputs)
+
+    # Assert
+    assert statements == []
+    assert message in response.content.decode()
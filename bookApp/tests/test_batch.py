@@ -0,0 +1,156 @@
+import sqlite3
+import subprocess
+import sys
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from bookApp.batch import plan_ranges
+from bookApp.management.commands.price_command import Command as PriceCommand
+from bookApp.models import BatchJob, Book, Author
+
+
+@pytest.fixture
+def priced_books(db):
+    """Fixture to create ten priced books and one without a price."""
+    author = Author.objects.create(name="Viramuthu")
+    priced = [
+        Book.objects.create(title=f"Book {i}", author=author, publication_year=2024, price=Decimal('10.00'))
+        for i in range(10)
+    ]
+    Book.objects.create(title="No price", author=author, publication_year=2024)
+    return priced
+
+
+@pytest.mark.django_db
+def test_plan_ranges_covers_every_id(priced_books):
+    # Act
+    ranges = plan_ranges(Book.objects.all(), 4)
+
+    # Assert
+    ids = sorted(Book.objects.values_list('id', flat=True))
+    assert ranges[0][0] == ids[0] and ranges[-1][1] == ids[-1]
+    assert all(end - start == 3 for start, end in ranges[:-1])
+    assert all(next_start == end + 1 for (_, end), (next_start, _) in zip(ranges, ranges[1:]))
+
+
+@pytest.mark.django_db
+def test_partitioned_run_checkpoints_ranges_and_reports_progress(priced_books):
+    # Arrange
+    out, err = StringIO(), StringIO()
+
+    # Act
+    call_command('price_command', 10, partitioned=True, chunk_size=3, stdout=out, stderr=err)
+
+    # Assert
+    job = BatchJob.objects.get()
+    assert job.status == BatchJob.STATUS_DONE
+    assert job.params == {'discount_percentage': 10}
+    assert job.ranges.count() == 4
+    assert not job.ranges.filter(finished_at__isnull=True).exists()
+    assert sum(job.ranges.values_list('processed', flat=True)) == 10
+    assert Book.objects.filter(discounted_price=Decimal('9.00')).count() == 10
+    assert out.getvalue().strip() == "Discounted 10 books, skipped 1 without a price."
+    progress = err.getvalue().splitlines()
+    assert progress[-1].startswith("4/4 ranges, 10 rows in ")
+    assert "rows/s" in progress[-1] and "ETA" in progress[-1]
+
+
+@pytest.mark.django_db
+def test_interrupted_run_resumes_without_repeating_ranges(priced_books, monkeypatch):
+    # Arrange
+    calls = []
+    process_range = PriceCommand.process_range
+
+    def failing_process_range(self, queryset, params):
+        calls.append(queryset.order_by('pk').first().pk)
+        if len(calls) == 3:
+            raise RuntimeError("worker killed")
+        return process_range(self, queryset, params)
+
+    monkeypatch.setattr(PriceCommand, 'process_range', failing_process_range)
+    with pytest.raises(RuntimeError):
+        call_command('price_command', 10, partitioned=True, chunk_size=3, stdout=StringIO(), stderr=StringIO())
+    job = BatchJob.objects.get()
+    assert job.status == BatchJob.STATUS_RUNNING
+    assert job.ranges.filter(finished_at__isnull=False).count() == 2
+    monkeypatch.setattr(PriceCommand, 'process_range', process_range)
+    out, err = StringIO(), StringIO()
+
+    # Act
+    call_command('price_command', 10, partitioned=True, chunk_size=3, stdout=out, stderr=err)
+
+    # Assert
+    job.refresh_from_db()
+    assert job.status == BatchJob.STATUS_DONE
+    assert BatchJob.objects.count() == 1
+    assert "Resuming" in err.getvalue() and "2 of 4 ranges already done" in err.getvalue()
+    # The failed range was rolled back and run again; the finished ones were not.
+    assert Book.objects.filter(discounted_price=Decimal('9.00')).count() == 10
+    assert out.getvalue().strip() == "Discounted 10 books, skipped 1 without a price."
+
+
+@pytest.mark.django_db
+def test_restart_abandons_the_unfinished_job(priced_books):
+    # Arrange
+    call_command('price_command', 10, partitioned=True, chunk_size=3, stdout=StringIO(), stderr=StringIO())
+    BatchJob.objects.update(status=BatchJob.STATUS_RUNNING)
+
+    # Act
+    call_command('price_command', 10, partitioned=True, chunk_size=3, restart=True, stdout=StringIO(), stderr=StringIO())
+
+    # Assert
+    statuses = list(BatchJob.objects.order_by('pk').values_list('status', flat=True))
+    assert statuses == [BatchJob.STATUS_ABANDONED, BatchJob.STATUS_DONE]
+
+
+@pytest.mark.django_db
+def test_workers_refuse_an_in_memory_database(priced_books):
+    # Act / Assert
+    with pytest.raises(CommandError, match="in-memory"):
+        call_command('price_command', 10, partitioned=True, workers=2, stdout=StringIO(), stderr=StringIO())
+
+
+def test_workers_process_the_ranges_in_separate_processes(tmp_path):
+    # Arrange: worker processes need a database file they can all open
+    database = tmp_path / "db.sqlite3"
+    script = (
+        "import sys, django\n"
+        "from django.conf import settings\n"
+        "settings.DATABASES['default']['NAME'] = sys.argv[1]\n"
+        "settings.CACHES['shared']['LOCATION'] = sys.argv[2]\n"
+        "django.setup()\n"
+        "from decimal import Decimal\n"
+        "from django.core.management import call_command\n"
+        "from bookApp.models import Author, Book\n"
+        "call_command('migrate', verbosity=0)\n"
+        "author = Author.objects.create(name='Viramuthu')\n"
+        "for i in range(10):\n"
+        "    Book.objects.create(title=f'Book {i}', author=author, publication_year=2024, price=Decimal('10.00'))\n"
+        "Book.objects.create(title='No price', author=author, publication_year=2024)\n"
+        "call_command('price_command', 10, partitioned=True, workers=2, chunk_size=3)\n"
+    )
+
+    # Act
+    result = subprocess.run(
+        [sys.executable, '-c', script, str(database), str(tmp_path / "shared")],
+        cwd=settings.BASE_DIR, capture_output=True, text=True, timeout=120,
+    )
+
+    # Assert
+    assert result.returncode == 0, result.stderr
+    assert "Discounted 10 books, skipped 1 without a price." in result.stdout
+    assert "4/4 ranges, 10 rows in " in result.stderr
+    with sqlite3.connect(database) as db:
+        prices = [Decimal(str(price)) for (price,) in db.execute(
+            "SELECT discounted_price FROM bookApp_book WHERE price IS NOT NULL"
+        )]
+        assert prices == [Decimal('9')] * 10
+        assert db.execute("SELECT discounted_price FROM bookApp_book WHERE price IS NULL").fetchall() == [(None,)]
+        assert db.execute("SELECT status FROM bookApp_batchjob").fetchall() == [('done',)]
+        ranges = db.execute("SELECT processed, finished_at FROM bookApp_batchrange ORDER BY start").fetchall()
+        assert [processed for processed, _ in ranges] == [3, 3, 3, 1]
+        assert all(finished_at is not None for _, finished_at in ranges)
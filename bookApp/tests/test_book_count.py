@@ -0,0 +1,190 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test.client import Client
+from django.urls import reverse
+from bookApp.models import Book, Author, Genre
+from django.contrib.auth.models import User
+
+
+def counts(*objs):
+    return [type(obj).objects.get(pk=obj.pk).book_count for obj in objs]
+
+
+@pytest.fixture
+def catalog(db):
+    """Fixture to create two authors and three genres, without books."""
+    authors = [Author.objects.create(name=name) for name in ("Viramuthu", "Kalki")]
+    genres = [Genre.objects.create(name=name) for name in ("Fiction", "History", "Poetry")]
+    return authors, genres
+
+
+@pytest.mark.django_db
+def test_saving_and_deleting_books_counts_authors(catalog):
+    # Arrange
+    (viramuthu, kalki), _ = catalog
+    book = Book.objects.create(title="Book1", author=viramuthu, publication_year=2023)
+    Book.objects.create(title="Book2", author=viramuthu, publication_year=2023)
+
+    # Act / Assert
+    assert counts(viramuthu, kalki) == [2, 0]
+    book = Book.objects.get(pk=book.pk)
+    book.author = kalki
+    book.save()
+    assert counts(viramuthu, kalki) == [1, 1]
+    book.title = "Renamed"
+    book.save()
+    assert counts(viramuthu, kalki) == [1, 1]
+    Book(pk=book.pk, title="Rebuilt", author=viramuthu, publication_year=2023).save()
+    assert counts(viramuthu, kalki) == [2, 0]
+    Book.objects.filter(pk=book.pk).delete()
+    assert counts(viramuthu, kalki) == [1, 0]
+
+
+@pytest.mark.django_db
+def test_changing_genres_counts_genres(catalog):
+    # Arrange
+    (author, _), (fiction, history, poetry) = catalog
+    book = Book.objects.create(title="Book1", author=author, publication_year=2023)
+    other = Book.objects.create(title="Book2", author=author, publication_year=2023)
+
+    # Act / Assert
+    book.genres.add(fiction, history)
+    book.genres.add(fiction)
+    assert counts(fiction, history, poetry) == [1, 1, 0]
+    book.genres.remove(history, poetry)
+    assert counts(fiction, history, poetry) == [1, 0, 0]
+    book.genres.set([history, poetry])
+    assert counts(fiction, history, poetry) == [0, 1, 1]
+    poetry.book_set.add(other)
+    assert counts(poetry) == [2]
+    poetry.book_set.remove(book, other)
+    assert counts(poetry) == [0]
+    history.book_set.add(other)
+    history.book_set.clear()
+    assert counts(history) == [0]
+    book.genres.add(fiction, poetry)
+    book.genres.clear()
+    assert counts(fiction, history, poetry) == [0, 0, 0]
+
+
+@pytest.mark.django_db
+def test_deleting_a_book_or_author_uncounts_its_genres(catalog):
+    # Arrange
+    (author, _), (fiction, history, _) = catalog
+    books = [Book.objects.create(title=f"Book{i}", author=author, publication_year=2023) for i in range(3)]
+    for book in books:
+        book.genres.add(fiction, history)
+
+    # Act / Assert
+    books[0].delete()
+    assert counts(fiction, history) == [2, 2]
+    author.delete()
+    assert counts(fiction, history) == [0, 0]
+
+
+@pytest.mark.django_db
+def test_bulk_genre_changes_count_genres(catalog):
+    # Arrange
+    (author, _), (fiction, _, _) = catalog
+    for i in range(4):
+        Book.objects.create(title=f"Book{i}", author=author, publication_year=2020 + i)
+    Book.objects.filter(publication_year=2020).get().genres.add(fiction)
+
+    # Act / Assert
+    assert Book.objects.add_genre(fiction) == 3
+    assert counts(fiction) == [4]
+    assert Book.objects.filter(publication_year__lt=2022).remove_genre(fiction) == 2
+    assert counts(fiction) == [2]
+
+
+@pytest.mark.django_db
+def test_seed_catalog_counts_its_books(db):
+    # Act
+    call_command('seed_catalog', books=300, authors=20, genres=5, seed=1, chunk_size=100, stdout=StringIO())
+
+    # Assert
+    assert not Author.objects.drifted().exists()
+    assert not Genre.objects.drifted().exists()
+    assert sum(Author.objects.values_list('book_count', flat=True)) == 300
+
+
+@pytest.mark.django_db
+def test_recount_reports_and_repairs_drift(catalog):
+    # Arrange
+    (viramuthu, kalki), (fiction, _, _) = catalog
+    Book.objects.create(title="Book1", author=viramuthu, publication_year=2023).genres.add(fiction)
+    Author.objects.filter(pk=viramuthu.pk).update(book_count=5)
+    Genre.objects.filter(pk=fiction.pk).update(book_count=0)
+
+    # Act
+    with pytest.raises(CommandError, match="2 book counts are wrong"):
+        call_command('recount', stdout=StringIO())
+    out = StringIO()
+    call_command('recount', repair=True, stdout=out)
+
+    # Assert
+    assert "Viramuthu: 5 stored, 1 books" in out.getvalue()
+    assert "Fiction: 0 stored, 1 books" in out.getvalue()
+    assert counts(viramuthu, kalki, fiction) == [1, 0, 1]
+    checked = StringIO()
+    call_command('recount', stdout=checked)
+    assert "All book counts are correct." in checked.getvalue()
+
+
+@pytest.mark.django_db
+def test_author_list_shows_authors_with_most_books_first(catalog):
+    # Arrange
+    (viramuthu, kalki), _ = catalog
+    for i in range(2):
+        Book.objects.create(title=f"Book{i}", author=kalki, publication_year=2023)
+    User.objects.create_user(username="root", password="password@123")
+    client = Client()
+    client.login(username="root", password="password@123")
+
+    # Act
+    response = client.get(reverse('books:author_list'))
+
+    # Assert
+    assert [author.name for author in response.context['authors']] == ["Kalki", "Viramuthu"]
+
+
+@pytest.mark.django_db
+def test_saving_other_fields_leaves_the_author_counts(catalog):
+    # Arrange
+    (viramuthu, kalki), _ = catalog
+    book = Book.objects.create(title="Book1", author=viramuthu, publication_year=2023)
+    book = Book.objects.get(pk=book.pk)
+
+    # Act: the author is changed on the instance but not written
+    book.author = kalki
+    book.title = "Renamed"
+    book.save(update_fields=['title'])
+
+    # Assert
+    assert Book.objects.get(pk=book.pk).author_id == viramuthu.pk
+    assert counts(viramuthu, kalki) == [1, 0]
+    book.save(update_fields=['author'])
+    assert counts(viramuthu, kalki) == [0, 1]
+
+
+@pytest.mark.django_db
+def test_loaddata_counts_books_and_uncounted_books_can_be_deleted(catalog, tmp_path):
+    # Arrange
+    (viramuthu, kalki), (fiction, _, _) = catalog
+    fixture = tmp_path / "books.json"
+    fixture.write_text(
+        f'[{{"model": "bookApp.book", "pk": 100, "fields": {{"title": "Loaded", "title_key": "loaded", '
+        f'"author": {viramuthu.pk}, "publication_year": 2023, "genres": [{fiction.pk}], '
+        f'"updated_at": "2024-01-01T00:00:00Z"}}}}]'
+    )
+    uncounted = Book.objects.bulk_create([Book(title="Bulk", author=kalki, publication_year=2023)])[0]
+
+    # Act
+    call_command('loaddata', str(fixture), verbosity=0)
+    Book.objects.filter(pk=uncounted.pk).delete()
+
+    # Assert
+    assert counts(viramuthu, kalki, fiction) == [1, 0, 1]
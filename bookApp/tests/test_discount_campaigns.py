@@ -0,0 +1,163 @@
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.test.client import Client
+from django.urls import reverse
+from django.utils import timezone
+from bookApp.cache import get_campaign_epoch
+from bookApp.models import Book, Author, DiscountCampaign, Genre
+from bookApp.views import BookListView
+
+
+@pytest.fixture
+def catalog(db):
+    fiction, poetry = Genre.objects.create(name="Fiction"), Genre.objects.create(name="Poetry")
+    kalki, ambai = Author.objects.create(name="Kalki"), Author.objects.create(name="Ambai")
+    books = {
+        'fiction_2020': Book.objects.create(title="Ponniyin", author=kalki, publication_year=2020,
+                                            price=Decimal('20.00'), discounted_price=Decimal('19.00')),
+        'poetry_2010': Book.objects.create(title="Kavithai", author=ambai, publication_year=2010,
+                                           price=Decimal('10.00')),
+        'no_price': Book.objects.create(title="Draft", author=ambai, publication_year=2024),
+    }
+    books['fiction_2020'].genres.add(fiction)
+    books['poetry_2010'].genres.add(poetry)
+    return {'fiction': fiction, 'poetry': poetry, 'kalki': kalki, 'ambai': ambai, **books}
+
+
+def effective_prices():
+    return dict(Book.objects.with_effective_price().values_list('title', 'effective_discounted_price'))
+
+
+@pytest.mark.django_db
+def test_without_campaigns_the_stored_discounted_price_is_used(catalog):
+    assert effective_prices() == {"Ponniyin": Decimal('19.00'), "Kavithai": None, "Draft": None}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("campaign, expected", [
+    ({'scope': 'all'}, {"Ponniyin": Decimal('18.00'), "Kavithai": Decimal('9.00')}),
+    ({'scope': 'genre', 'genre': 'poetry'}, {"Ponniyin": Decimal('19.00'), "Kavithai": Decimal('9.00')}),
+    ({'scope': 'author', 'author': 'kalki'}, {"Ponniyin": Decimal('18.00'), "Kavithai": None}),
+    ({'scope': 'years', 'year_from': 2000, 'year_to': 2015}, {"Ponniyin": Decimal('19.00'), "Kavithai": Decimal('9.00')}),
+])
+def test_campaign_scopes(catalog, campaign, expected):
+    # Arrange
+    for relation in ('genre', 'author'):
+        if relation in campaign:
+            campaign[relation] = catalog[campaign[relation]]
+    DiscountCampaign.objects.create(name="Sale", percentage=Decimal('10'), **campaign)
+
+    # Act
+    prices = effective_prices()
+
+    # Assert
+    assert prices == {**expected, "Draft": None}
+
+
+@pytest.mark.django_db
+def test_largest_running_campaign_wins(catalog):
+    # Arrange
+    now = timezone.now()
+    DiscountCampaign.objects.create(name="Small", percentage=Decimal('10'))
+    DiscountCampaign.objects.create(name="Big", percentage=Decimal('50'), scope='genre', genre=catalog['fiction'])
+    DiscountCampaign.objects.create(name="Over", percentage=Decimal('90'), starts_at=now - timedelta(days=2),
+                                    ends_at=now - timedelta(days=1))
+    DiscountCampaign.objects.create(name="Soon", percentage=Decimal('90'), starts_at=now + timedelta(days=1))
+
+    # Act
+    prices = effective_prices()
+
+    # Assert
+    assert prices["Ponniyin"] == Decimal('10.00')
+    assert prices["Kavithai"] == Decimal('9.00')
+
+
+@pytest.mark.django_db
+def test_books_can_be_filtered_and_sorted_by_effective_price(catalog):
+    # Arrange
+    DiscountCampaign.objects.create(name="Sale", percentage=Decimal('50'), scope='author', author=catalog['kalki'])
+
+    # Act
+    books = Book.objects.with_effective_price().filter(effective_discounted_price__lte=15).order_by(
+        'effective_discounted_price'
+    )
+
+    # Assert
+    assert [book.title for book in books] == ["Ponniyin"]
+
+
+@pytest.mark.django_db
+def test_starting_a_campaign_writes_no_books(catalog, django_assert_num_queries):
+    # Act / Assert
+    with django_assert_num_queries(1):
+        DiscountCampaign.objects.create(name="Sale", percentage=Decimal('10'))
+
+
+def test_campaign_epoch_moves_at_every_boundary(db):
+    # Arrange
+    now = timezone.now()
+    DiscountCampaign.objects.create(name="Sale", percentage=Decimal('10'), starts_at=now + timedelta(hours=1),
+                                    ends_at=now + timedelta(hours=2))
+
+    # Act / Assert
+    assert get_campaign_epoch(now) == 0
+    assert get_campaign_epoch(now + timedelta(minutes=90)) == 1
+    assert get_campaign_epoch(now + timedelta(hours=3)) == 2
+
+
+@pytest.mark.django_db
+def test_book_list_shows_campaign_prices_and_drops_cached_pages(catalog):
+    # Arrange
+    User.objects.create_user(username="root", password="password@123")
+    client = Client()
+    client.login(username="root", password="password@123")
+    url = reverse('books:book_list')
+    assert "<td>9.00</td>" not in client.get(url).content.decode()
+
+    # Act
+    DiscountCampaign.objects.create(name="Sale", percentage=Decimal('10'))
+    response = client.get(url)
+
+    # Assert
+    assert "<td>9.00</td>" in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_book_list_filters_and_sorts_by_effective_price(catalog, settings, monkeypatch):
+    # Arrange: the campaign makes the dearer book the cheaper one
+    settings.DEBUG = True  # Enforces the query budget.
+    monkeypatch.setattr(BookListView, 'paginate_by', 1)
+    Book.objects.filter(pk=catalog['poetry_2010'].pk).update(discounted_price=Decimal('9.50'))
+    DiscountCampaign.objects.create(name="Sale", percentage=Decimal('75'), scope='author', author=catalog['kalki'])
+    User.objects.create_user(username="root", password="password@123")
+    client = Client()
+    client.login(username="root", password="password@123")
+    url = reverse('books:book_list')
+
+    # Act
+    cheap = client.get(url, {'max_price': '6'}).context['books']
+    first = client.get(url, {'sort': 'price'}).context['page_obj']
+    second = client.get(url, {'sort': 'price', 'cursor': first.next_cursor}).context['page_obj']
+    dearest = client.get(url, {'sort': '-price'}).context['books']
+
+    # Assert
+    assert [book.title for book in cheap] == ["Ponniyin"]
+    assert [book.title for book in [*first, *second]] == ["Ponniyin", "Kavithai"]
+    assert not second.has_next()
+    assert [book.title for book in dearest] == ["Kavithai"]
+    assert client.get(url, {'max_price': 'NaN'}).status_code == 404
+    assert client.get(url, {'sort': 'title'}).status_code == 404
+
+
+def test_campaign_scope_needs_its_target():
+    # Arrange
+    campaign = DiscountCampaign(name="Sale", percentage=Decimal('10'), scope='years', year_from=2000)
+
+    # Act / Assert
+    with pytest.raises(ValidationError) as error:
+        campaign.full_clean()
+    assert 'year_to' in error.value.message_dict
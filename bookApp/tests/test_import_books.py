@@ -0,0 +1,145 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from decimal import Decimal
+from bookApp.models import Book, Author, Genre
+
+
+@pytest.mark.django_db
+def test_import_csv_creates_missing_authors_and_genres(tmp_path):
+    # Arrange
+    Author.objects.create(name="Viramuthu")
+    Genre.objects.create(name="Fiction")
+    path = tmp_path / "books.csv"
+    path.write_text(
+        "title,author,publication_year,genres,price,discounted_price\n"
+        "Book1,Viramuthu,2023,Fiction|Adventure,100.00,\n"
+        "Book2,Kalki,2024,Fiction,,\n"
+        "Book3,Kalki,2024,,12.50,10.00\n"
+    )
+    out = StringIO()
+
+    # Act
+    call_command('import_books', str(path), chunk_size=2, stdout=out)
+
+    # Assert
+    assert Author.objects.count() == 2
+    assert Genre.objects.count() == 2
+    book1 = Book.objects.get(title="Book1")
+    assert book1.author.name == "Viramuthu"
+    assert book1.price == Decimal('100.00')
+    assert sorted(genre.name for genre in book1.genres.all()) == ["Adventure", "Fiction"]
+    assert Book.objects.get(title="Book3").discounted_price == Decimal('10.00')
+    assert "Imported 3 books" in out.getvalue()
+    assert "rows/s" in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_import_skips_invalid_rows(tmp_path):
+    # Arrange
+    path = tmp_path / "books.jsonl"
+    path.write_text("\n".join(json.dumps(record) for record in [
+        {'title': "Book1", 'author': "Kalki", 'publication_year': 2023, 'genres': ["Fiction"]},
+        {'title': "", 'author': "Kalki", 'publication_year': 2023},
+        {'title': "Book3", 'author': "Kalki", 'publication_year': "abcd"},
+        {'title': "Ponniyin Selvan Part Two", 'author': "Kalki", 'publication_year': 1951},
+    ]))
+    out = StringIO()
+
+    # Act
+    call_command('import_books', str(path), stdout=out)
+
+    # Assert
+    assert list(Book.objects.values_list('title', flat=True)) == ["Book1"]
+    assert "Line 4: skipped, title is longer than 20 characters" in out.getvalue()
+    assert "skipped 3 rows" in out.getvalue()
+
+
+
+@pytest.mark.django_db
+def test_import_splits_genre_strings_and_rejects_other_values(tmp_path):
+    # Arrange
+    path = tmp_path / "books.jsonl"
+    path.write_text("\n".join(json.dumps(record) for record in [
+        {'title': "Book1", 'author': "Kalki", 'publication_year': 2023, 'genres': "Poetry"},
+        {'title': "Book2", 'author': "Kalki", 'publication_year': 2023, 'genres': "Poetry|Fiction"},
+        {'title': "Book3", 'author': "Kalki", 'publication_year': 2023, 'genres': {'name': "Poetry"}},
+    ]))
+    out = StringIO()
+
+    # Act
+    call_command('import_books', str(path), stdout=out)
+
+    # Assert
+    assert sorted(Genre.objects.values_list('name', flat=True)) == ["Fiction", "Poetry"]
+    assert sorted(Book.objects.get(title="Book2").genres.values_list('name', flat=True)) == ["Fiction", "Poetry"]
+    assert "Line 3: skipped, genres must be" in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_import_skips_malformed_json_lines(tmp_path):
+    # Arrange
+    path = tmp_path / "books.jsonl"
+    path.write_text(
+        json.dumps({'title': "Book1", 'author': "Kalki", 'publication_year': 2023}) + "\n"
+        "\n"
+        '{"title": "Book2", "author": \n'
+        "[1, 2]\n"
+        + json.dumps({'title': "Book5", 'author': "Kalki", 'publication_year': 2024}) + "\n"
+    )
+    out = StringIO()
+
+    # Act
+    call_command('import_books', str(path), chunk_size=10, stdout=out)
+
+    # Assert
+    assert sorted(Book.objects.values_list('title', flat=True)) == ["Book1", "Book5"]
+    assert "Line 3: skipped, malformed JSON" in out.getvalue()
+    assert "Line 4: skipped, not a JSON object" in out.getvalue()
+    assert "skipped 2 rows" in out.getvalue()
+
+@pytest.mark.django_db
+def test_export_then_import_round_trip(tmp_path):
+    # Arrange
+    author = Author.objects.create(name="Viramuthu")
+    genre = Genre.objects.create(name="Fiction")
+    book = Book.objects.create(title="Book1", author=author, publication_year=2023, price=Decimal('9.99'))
+    book.genres.add(genre)
+    path = tmp_path / "books.jsonl"
+    call_command('export_books', format='jsonl', output=str(path), stdout=StringIO())
+    book.delete()
+
+    # Act
+    call_command('import_books', str(path), stdout=StringIO())
+
+    # Assert
+    imported = Book.objects.get()
+    assert (imported.title, imported.author, imported.price) == ("Book1", author, Decimal('9.99'))
+    assert list(imported.genres.all()) == [genre]
+
+
+@pytest.mark.django_db
+def test_import_skips_prices_that_cannot_be_stored(tmp_path):
+    # Arrange
+    path = tmp_path / "books.jsonl"
+    path.write_text("\n".join(json.dumps(record) for record in [
+        {'title': "Book1", 'author': "Kalki", 'publication_year': 2023, 'price': "NaN"},
+        {'title': "Book2", 'author': "Kalki", 'publication_year': 2023, 'price': "12345678901.5"},
+        {'title': "Book3", 'author': "Kalki", 'publication_year': 2023, 'discounted_price': "1e20"},
+        {'title': "Book4", 'author': "Kalki", 'publication_year': 2023, 'price': "Infinity"},
+        {'title': "Book5", 'author': "Kalki", 'publication_year': 2023, 'price': "12.345"},
+    ]))
+    out = StringIO()
+
+    # Act
+    call_command('import_books', str(path), stdout=out)
+
+    # Assert
+    assert Book.objects.get().price == Decimal('12.34')
+    assert "Line 1: skipped, price must be a finite number" in out.getvalue()
+    assert "Line 2: skipped, price '12345678901.5' has more than 10 digits" in out.getvalue()
+    assert "Line 3: skipped, discounted_price" in out.getvalue()
+    assert "Line 4: skipped, price must be a finite number" in out.getvalue()
+    assert "skipped 4 rows" in out.getvalue()
@@ -0,0 +1,108 @@
+import pytest
+from django.contrib.auth.models import Group, Permission, User
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+
+@pytest.fixture
+def seller(db):
+    group, _ = Group.objects.get_or_create(name="seller")
+    group.permissions.set([Permission.objects.get(codename='add_book')])
+    user = User.objects.create_user(username="root", password="password@123")
+    user.groups.add(group)
+    return user
+
+
+def fresh(user):
+    # Every request loads its own user object, which has no ModelBackend cache.
+    return User.objects.get(pk=user.pk)
+
+
+@pytest.mark.django_db
+def test_warm_permission_check_runs_no_queries(seller, django_assert_num_queries):
+    # Arrange
+    assert fresh(seller).has_perm('bookApp.add_book')
+    user = fresh(seller)
+
+    # Act / Assert
+    with django_assert_num_queries(0):
+        assert user.has_perm('bookApp.add_book')
+        assert not user.has_perm('bookApp.delete_book')
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("change, can_add, can_delete", [
+    (lambda user, group: user.groups.remove(group), False, False),
+    (lambda user, group: user.groups.clear(), False, False),
+    (lambda user, group: group.permissions.add(Permission.objects.get(codename='delete_book')), True, True),
+    (lambda user, group: user.user_permissions.add(Permission.objects.get(codename='delete_book')), True, True),
+    (lambda user, group: group.delete(), False, False),
+])
+def test_permission_changes_invalidate_the_cache(seller, change, can_add, can_delete):
+    # Arrange
+    user = fresh(seller)
+    assert user.has_perm('bookApp.add_book')
+    assert not user.has_perm('bookApp.delete_book')
+
+    # Act
+    change(user, Group.objects.get(name="seller"))
+
+    # Assert
+    assert fresh(seller).has_perm('bookApp.add_book') is can_add
+    assert fresh(seller).has_perm('bookApp.delete_book') is can_delete
+
+
+@pytest.mark.django_db
+def test_becoming_superuser_is_not_served_from_the_cache(seller):
+    # Arrange
+    assert not fresh(seller).has_perm('bookApp.delete_book')
+
+    # Act
+    seller.is_superuser = True
+    seller.save()
+
+    # Assert
+    assert 'bookApp.delete_book' in fresh(seller).get_all_permissions()
+
+
+@pytest.mark.django_db
+def test_permission_required_views_skip_permission_tables_when_warm(seller):
+    # Arrange
+    client = Client()
+    client.login(username="root", password="password@123")
+    client.get(reverse('books:add_book'))
+
+    # Act
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(reverse('books:add_book'))
+
+    # Assert
+    assert response.status_code == 200
+    assert not [query for query in queries.captured_queries if 'auth_permission' in query['sql']]
+
+
+@pytest.mark.django_db
+def test_revocation_in_another_process_is_seen(seller, other_process):
+    # Arrange: another worker revokes the group and bumps the shared version
+    assert fresh(seller).has_perm('bookApp.add_book')
+    seller.groups.through.objects.filter(user=seller).delete()
+
+    # Act
+    other_process("from bookApp.backends import bump_permissions_version; bump_permissions_version()")
+
+    # Assert
+    assert not fresh(seller).has_perm('bookApp.add_book')
+
+
+@pytest.mark.django_db
+def test_permissions_are_not_cached_in_a_process_local_cache(seller, settings, django_assert_num_queries):
+    # Arrange
+    settings.CACHES = {**settings.CACHES, 'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    assert fresh(seller).has_perm('bookApp.add_book')
+    user = fresh(seller)
+
+    # Act / Assert: the user and group permission queries run again
+    with django_assert_num_queries(2):
+        assert user.has_perm('bookApp.add_book')
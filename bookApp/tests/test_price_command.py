@@ -0,0 +1,59 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from decimal import Decimal
+from bookApp.models import Book, Author
+
+
+@pytest.fixture
+def priced_books(db):
+    """Fixture to create books with and without a price."""
+    author = Author.objects.create(name="Viramuthu")
+    priced = [
+        Book.objects.create(title=f"Book {i}", author=author, publication_year=2024, price=Decimal('19.99') * (i + 1))
+        for i in range(5)
+    ]
+    unpriced = Book.objects.create(title="No price", author=author, publication_year=2024)
+    return priced, unpriced
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("options", [{'bulk': True}, {'partitioned': True, 'chunk_size': 2}])
+def test_bulk_discount_updates_priced_books(priced_books, options):
+    # Arrange
+    priced, unpriced = priced_books
+    out = StringIO()
+
+    # Act
+    call_command('price_command', 10, stdout=out, stderr=StringIO(), **options)
+
+    # Assert
+    for book in priced:
+        book.refresh_from_db()
+        assert book.discounted_price == (book.price * Decimal('0.9')).quantize(Decimal('0.01'))
+    unpriced.refresh_from_db()
+    assert unpriced.discounted_price is None
+    assert out.getvalue().strip() == "Discounted 5 books, skipped 1 without a price."
+
+
+@pytest.mark.django_db
+def test_bulk_discount_runs_a_single_update(priced_books, django_assert_max_num_queries):
+    # Act
+    with django_assert_max_num_queries(4) as context:  # savepoint, count, update, release
+        call_command('price_command', 25, bulk=True, stdout=StringIO())
+
+    # Assert
+    updates = [query['sql'] for query in context.captured_queries if query['sql'].startswith('UPDATE')]
+    assert len(updates) == 1
+    assert Book.objects.filter(discounted_price__isnull=False).count() == 5
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("options", [{'bulk': True, 'chunk_size': 2}, {'workers': 2}, {'restart': True}])
+def test_range_options_require_partitioned(priced_books, options):
+    # Act / Assert
+    with pytest.raises(CommandError, match="only apply with --partitioned"):
+        call_command('price_command', 10, stdout=StringIO(), **options)
+    assert not Book.objects.filter(discounted_price__isnull=False).exists()
@@ -0,0 +1,71 @@
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from bookApp.models import Profile
+
+
+@pytest.mark.django_db
+def test_login_runs_no_profile_queries():
+    # Arrange
+    User.objects.create_user(username="root", password="password@123")
+    client = Client()
+
+    # Act
+    with CaptureQueriesContext(connection) as queries:
+        client.login(username="root", password="password@123")
+
+    # Assert
+    assert not [query for query in queries.captured_queries if 'bookApp_profile' in query['sql']]
+    assert not Profile.objects.exists()
+
+
+@pytest.mark.django_db
+def test_profile_is_created_on_first_access(django_assert_num_queries):
+    # Arrange
+    user = User.objects.create_user(username="root")
+
+    # Act
+    profile = Profile.objects.for_user(user)
+
+    # Assert
+    assert profile.pk is not None
+    assert profile.biodata == ""
+    with django_assert_num_queries(0):
+        assert Profile.objects.for_user(user) is profile
+        assert user.profile is profile
+
+
+@pytest.mark.django_db
+def test_existing_profile_is_returned_not_recreated(django_assert_num_queries):
+    # Arrange: a profile made before, e.g. by provision_users, and the user loaded afresh
+    user = User.objects.create_user(username="root")
+    existing = Profile.objects.create(user=user, biodata="Reader")
+    user = User.objects.get(pk=user.pk)
+
+    # Act
+    with django_assert_num_queries(1):
+        profile = Profile.objects.for_user(user)
+
+    # Assert
+    assert profile == existing
+    assert profile.biodata == "Reader"
+    assert Profile.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_save_after_refresh_keeps_the_new_value():
+    # Arrange: another writer changes the profile after it was loaded
+    user = User.objects.create_user(username="root")
+    Profile.objects.create(user=user, biodata="a")
+    profile = Profile.objects.get(user=user)
+    Profile.objects.filter(pk=profile.pk).update(biodata="b")
+    profile.refresh_from_db()
+
+    # Act
+    profile.biodata = "a"
+    profile.save()
+
+    # Assert
+    assert Profile.objects.get(pk=profile.pk).biodata == "a"
@@ -0,0 +1,51 @@
+from io import StringIO
+
+import pytest
+from django.contrib.auth.models import Group, User
+from django.core.management import call_command
+from bookApp.models import Profile
+
+
+@pytest.mark.django_db
+def test_provision_users_in_bulk(tmp_path, django_assert_max_num_queries):
+    # Arrange
+    Group.objects.get_or_create(name="seller")
+    Group.objects.get_or_create(name="buyer")
+    User.objects.create_user(username="existing")
+    path = tmp_path / "users.csv"
+    path.write_text(
+        "username,email,first_name,last_name,groups,biodata\n"
+        + "".join(f"user{i},user{i}@example.com,First,Last,seller|buyer,Bio {i}\n" for i in range(10))
+        + "existing,,,,,\n"
+        + "stranger,,,,nosuchgroup,\n"
+    )
+    out = StringIO()
+
+    # Act
+    # Two lookups, then per chunk of 4: savepoint, users, profiles, groups, release.
+    with django_assert_max_num_queries(2 + 3 * 5):
+        call_command('provision_users', str(path), password="password@123", chunk_size=4, stdout=out)
+
+    # Assert
+    users = User.objects.filter(username__startswith="user")
+    assert users.count() == 10
+    assert Profile.objects.filter(user__in=users).count() == 10
+    assert Profile.objects.get(user__username="user3").biodata == "Bio 3"
+    assert set(User.objects.get(username="user0").groups.values_list('name', flat=True)) == {"seller", "buyer"}
+    assert User.objects.get(username="user9").check_password("password@123")
+    assert not User.objects.filter(username="stranger").exists()
+    assert "Created 10 users" in out.getvalue()
+    assert "skipped 2 rows" in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_provisioned_users_without_password_cannot_log_in(tmp_path):
+    # Arrange
+    path = tmp_path / "users.csv"
+    path.write_text("username,email\nreader,reader@example.com\n")
+
+    # Act
+    call_command('provision_users', str(path), stdout=StringIO())
+
+    # Assert
+    assert not User.objects.get(username="reader").has_usable_password()
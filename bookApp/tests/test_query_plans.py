@@ -0,0 +1,86 @@
+import pytest
+from django.db import connection
+from django.test import RequestFactory
+from bookApp.models import Book, Author, Genre
+from bookApp.pagination import encode_cursor, keyset_slice
+from bookApp.views import (
+    AuthorListView,
+    BookByAuthorListView,
+    BookByGenreListView,
+    BookByPublicationYearView,
+    BookListView,
+)
+
+pytestmark = pytest.mark.skipif(connection.vendor != 'sqlite', reason="EXPLAIN QUERY PLAN is SQLite syntax")
+
+
+def query_plan(queryset):
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def assert_no_full_scan(queryset):
+    """Fail if SQLite plans to read any table in full instead of searching an index."""
+    plan = query_plan(queryset)
+    scans = [step for step in plan if step.startswith('SCAN ')]
+    assert not scans, "Full table scan in query plan:\n" + "\n".join(plan)
+
+
+def page_queryset(view_class, cursor=None, **kwargs):
+    view = view_class()
+    view.setup(RequestFactory().get('/'), **kwargs)
+    queryset, _ = keyset_slice(view.get_queryset(), view.keyset_ordering, view.paginate_by, cursor)
+    return queryset
+
+
+@pytest.fixture
+def catalog(db):
+    author = Author.objects.create(name="Viramuthu")
+    genre = Genre.objects.create(name="Fiction")
+    book = Book.objects.create(title="Book1", author=author, publication_year=2023)
+    book.genres.add(genre)
+    return author, genre, book
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("view_class, kwargs, cursor_key", [
+    (BookListView, {}, [1]),
+    (AuthorListView, {}, [1, 1]),
+    (BookByAuthorListView, {'author_id': 1}, [1]),
+    (BookByGenreListView, {'genre_name': "Fiction"}, [1]),
+    (BookByPublicationYearView, {'year': 2023}, [2023, 1]),
+])
+def test_next_pages_search_an_index(catalog, view_class, kwargs, cursor_key):
+    cursor = encode_cursor(cursor_key, 'next')
+    assert_no_full_scan(page_queryset(view_class, cursor, **kwargs))
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("view_class, kwargs", [
+    # Unfiltered first pages walk the primary key and stop after one page, so they are left out.
+    (BookByAuthorListView, {'author_id': 1}),
+    (BookByGenreListView, {'genre_name': "Fiction"}),
+    (BookByPublicationYearView, {'year': 2023}),
+])
+def test_filtered_first_pages_search_an_index(catalog, view_class, kwargs):
+    assert_no_full_scan(page_queryset(view_class, **kwargs))
+
+
+@pytest.mark.django_db
+def test_genre_prefetch_searches_an_index(catalog):
+    author, genre, book = catalog
+    assert_no_full_scan(Genre.objects.filter(book__in=[book.id]))
+
+
+@pytest.mark.django_db
+def test_harness_catches_a_full_scan(catalog):
+    with pytest.raises(AssertionError):
+        assert_no_full_scan(Book.objects.filter(title="Book1"))
+
+
+@pytest.mark.django_db
+def test_authors_by_book_count_read_the_index_in_order(catalog):
+    plan = query_plan(page_queryset(AuthorListView))
+    assert not any('TEMP B-TREE' in step for step in plan), "\n".join(plan)
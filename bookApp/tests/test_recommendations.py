@@ -0,0 +1,150 @@
+from io import StringIO
+
+import numpy as np
+import pytest
+from django.core.management import call_command
+from django.test.client import Client
+from django.urls import reverse
+from bookApp.models import Book, Author, BookNeighbour, Genre
+from bookApp.recommendations import CatalogFeatures, top_k
+from bookApp.views import BookDetailView
+from bookApp.query_budget import assert_query_budget
+from django.contrib.auth.models import User
+
+
+def neighbours(book):
+    return list(BookNeighbour.objects.filter(book=book).order_by('rank').values_list('neighbour__title', flat=True))
+
+
+@pytest.fixture
+def catalog(db):
+    """Fixture to create books sharing more or fewer genres and authors."""
+    kalki, sujatha = Author.objects.create(name="Kalki"), Author.objects.create(name="Sujatha")
+    history, fiction, poetry = (Genre.objects.create(name=name) for name in ("History", "Fiction", "Poetry"))
+    books = {}
+    for title, author, genres in [
+        ("Ponniyin Selvan", kalki, [history, fiction]),
+        ("Sivagamiyin Sabatham", kalki, [history, fiction]),
+        ("Parthiban Kanavu", sujatha, [history, fiction]),
+        ("Alai Osai", kalki, [fiction]),
+        ("Kavithaigal", sujatha, [poetry]),
+    ]:
+        books[title] = Book.objects.create(title=title, author=author, publication_year=1950)
+        books[title].genres.add(*genres)
+    return books
+
+
+def test_top_k_picks_the_highest_positive_scores_in_order():
+    # Arrange
+    scores = np.array([[0.2, -1, 0.9, 0.0, 0.5]], dtype=np.float32)
+
+    # Act
+    columns, best = top_k(scores, 3)
+
+    # Assert
+    assert columns.tolist() == [[2, 4, 0]]
+    assert best[0].tolist() == pytest.approx([0.9, 0.5, 0.2])
+
+
+@pytest.mark.django_db
+def test_scores_match_the_whole_matrix_in_any_block_size(catalog):
+    # Arrange
+    features = CatalogFeatures.load()
+    rows = np.arange(len(features))
+    whole = features.scores(rows)
+
+    # Act
+    blocks = np.vstack([features.scores(block) for block in features.blocks(rows, block_size=2)])
+
+    # Assert
+    assert np.allclose(blocks, whole)
+    assert np.allclose(whole, whole.T)
+
+
+@pytest.mark.django_db
+def test_scores_are_the_weighted_genre_cosine_plus_the_author(catalog):
+    # Arrange: the same author and no genre scores the author weight only
+    Book.objects.create(title="Draft", author=Author.objects.get(name="Kalki"), publication_year=1950)
+    features = CatalogFeatures.load(author_weight=0.3)
+    ponniyin, alai, draft = features.rows_of([catalog["Ponniyin Selvan"].id, catalog["Alai Osai"].id,
+                                              Book.objects.get(title="Draft").id])
+
+    # Act
+    scores = features.scores(np.array([ponniyin, alai]))
+
+    # Assert: [history, fiction] . [fiction] is 1 / sqrt(2)
+    assert scores[0, alai] == pytest.approx(0.7 / np.sqrt(2) + 0.3)
+    assert scores[0, draft] == pytest.approx(0.3)
+    assert scores[1, ponniyin] == pytest.approx(scores[0, alai])
+
+
+@pytest.mark.django_db
+def test_build_recommendations_ranks_shared_genres_and_author(catalog):
+    # Act
+    call_command('build_recommendations', k=3, stdout=StringIO())
+
+    # Assert
+    # Same genres and author, then same author and one of two genres, then same genres.
+    assert neighbours(catalog["Ponniyin Selvan"]) == ["Sivagamiyin Sabatham", "Alai Osai", "Parthiban Kanavu"]
+    # Nothing in common with the others, so they aren't listed.
+    assert neighbours(catalog["Kavithaigal"]) == ["Parthiban Kanavu"]
+    scores = BookNeighbour.objects.filter(book=catalog["Ponniyin Selvan"]).values_list('score', flat=True)
+    assert list(scores) == sorted(scores, reverse=True) and scores[0] == pytest.approx(1)
+
+
+@pytest.mark.django_db
+def test_incremental_run_recomputes_only_affected_books(catalog):
+    # Arrange
+    call_command('build_recommendations', k=3, stdout=StringIO())
+    unchanged = BookNeighbour.objects.get(book=catalog["Ponniyin Selvan"], rank=0).pk
+    out = StringIO()
+    call_command('build_recommendations', k=3, incremental=True, stdout=out)
+    assert "Computed neighbours of 0 books (0 changed)" in out.getvalue()
+
+    # Act
+    catalog["Kavithaigal"].genres.add(Genre.objects.get(name="History"))
+    out = StringIO()
+    call_command('build_recommendations', k=3, incremental=True, stdout=out)
+
+    # Assert
+    assert "(1 changed)" in out.getvalue()
+    assert "Ponniyin Selvan" in neighbours(catalog["Kavithaigal"])
+    assert BookNeighbour.objects.get(book=catalog["Ponniyin Selvan"], rank=0).pk == unchanged
+    assert set(neighbours(catalog["Alai Osai"])[:2]) == {"Ponniyin Selvan", "Sivagamiyin Sabatham"}
+    full = {book.pk: neighbours(book) for book in catalog.values()}
+    call_command('build_recommendations', k=3, stdout=StringIO())
+    assert {book.pk: neighbours(book) for book in catalog.values()} == full
+
+
+@pytest.mark.django_db
+def test_incremental_run_refills_books_that_lost_a_neighbour(catalog):
+    # Arrange
+    call_command('build_recommendations', k=3, stdout=StringIO())
+    catalog["Sivagamiyin Sabatham"].delete()
+
+    # Act
+    call_command('build_recommendations', k=3, incremental=True, stdout=StringIO())
+
+    # Assert
+    assert neighbours(catalog["Ponniyin Selvan"]) == ["Alai Osai", "Parthiban Kanavu"]
+
+
+@pytest.mark.django_db
+def test_book_detail_lists_similar_books(catalog):
+    # Arrange
+    call_command('build_recommendations', k=3, stdout=StringIO())
+    User.objects.create_user(username="root", password="password@123")
+    client = Client()
+    client.login(username="root", password="password@123")
+    url = reverse('books:book_detail', kwargs={'pk': catalog["Ponniyin Selvan"].pk})
+
+    # Act
+    with assert_query_budget(BookDetailView):
+        response = client.get(url)
+
+    # Assert
+    content = response.content.decode()
+    assert response.status_code == 200
+    assert "Readers also browse" in content
+    assert content.index("Sivagamiyin Sabatham") < content.index("Alai Osai") < content.index("Parthiban Kanavu")
+    assert reverse('books:book_detail', kwargs={'pk': catalog["Alai Osai"].pk}) in content
@@ -0,0 +1,47 @@
+import json
+from collections import Counter
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from bookApp import urls as book_urls
+from bookApp.models import Book, Author, Genre
+
+
+@pytest.mark.django_db
+def test_seed_catalog_is_skewed_and_reproducible():
+    # Act
+    call_command('seed_catalog', books=500, authors=50, genres=5, seed=1, stdout=StringIO())
+
+    # Assert
+    assert Book.objects.count() == 500
+    assert Author.objects.count() == 50
+    assert Genre.objects.count() == 5
+    assert all(len(title) <= 20 for title in Book.objects.values_list('title', flat=True))
+    per_author = Counter(Book.objects.values_list('author_id', flat=True)).most_common()
+    # Zipf: the busiest author has far more books than the median one.
+    assert per_author[0][1] > 5 * per_author[len(per_author) // 2][1]
+    assert Book.genres.through.objects.count() > 500
+    assert Book.objects.filter(price__isnull=True).exists()
+
+
+@pytest.mark.django_db
+def test_benchmark_views_reports_every_route(tmp_path):
+    # Arrange
+    output = tmp_path / "report.json"
+
+    # Act
+    call_command('benchmark_views', sizes='100,200', repeat=2, in_place=True,
+                 output=str(output), stderr=StringIO())
+
+    # Assert
+    report = json.loads(output.read_text())
+    assert report['meta']['repeat'] == 2
+    assert Book.objects.count() == 200
+    results = report['results']
+    assert len(results) == 2 * len(book_urls.urlpatterns)
+    for result in results:
+        assert result['status'] == 200, result['route']
+        assert result['p50_ms'] <= result['p95_ms'] <= result['p99_ms']
+        assert result['queries'] > 0
+        assert result['peak_memory_kb'] > 0
@@ -0,0 +1,169 @@
+import pytest
+from django.core.cache import cache
+from django.test.client import Client
+from django.urls import reverse
+from decimal import Decimal
+from bookApp.models import Book, Author, DiscountCampaign, Genre
+
+
+@pytest.fixture
+def books(db):
+    author = Author.objects.create(name="Viramuthu")
+    genre = Genre.objects.create(name="Fiction")
+    books = [
+        Book.objects.create(title=f"Book{i}", author=author, publication_year=2023, price=Decimal('10.50'))
+        for i in range(3)
+    ]
+    for book in books:
+        book.genres.add(genre)
+    return books
+
+
+@pytest.mark.django_db
+def test_api_unauthenticated_user():
+    # Act
+    response = Client().get(reverse('books:api_books'))
+
+    # Assert
+    assert response.status_code == 403
+
+
+@pytest.mark.django_db
+def test_book_api_default_fields(logged_in_client, books):
+    # Act
+    response = logged_in_client.get(reverse('books:api_books'))
+
+    # Assert
+    assert response.status_code == 200
+    data = response.json()
+    assert data['results'][0] == {
+        'id': books[0].id,
+        'title': "Book0",
+        'author': books[0].author_id,
+        'author_name': "Viramuthu",
+        'publication_year': 2023,
+        'genres': ["Fiction"],
+        'price': "10.50",
+        'effective_discounted_price': None,
+    }
+    assert data['next'] is None and data['previous'] is None
+
+
+@pytest.mark.django_db
+def test_book_api_field_selection_and_cursor(logged_in_client, books, django_assert_num_queries):
+    # Arrange
+    url = reverse('books:api_books')
+
+    # Act: session, user, campaign windows (for the ETag), books -- no author join or genre prefetch for these fields
+    with django_assert_num_queries(4):
+        first = logged_in_client.get(url, {'fields': 'id,title', 'page_size': 2}).json()
+    second = logged_in_client.get(url, {'fields': 'id,title', 'page_size': 2, 'cursor': first['next']}).json()
+
+    # Assert
+    assert first['results'] == [{'id': books[0].id, 'title': "Book0"}, {'id': books[1].id, 'title': "Book1"}]
+    assert second['results'] == [{'id': books[2].id, 'title': "Book2"}]
+
+
+@pytest.mark.django_db
+def test_book_api_filters_on_the_effective_price(logged_in_client, books):
+    # Arrange: only the first book is in the campaign
+    DiscountCampaign.objects.create(name="Sale", percentage=Decimal('20'), scope='author',
+                                    author=Author.objects.create(name="Kalki"))
+    Book.objects.filter(pk=books[0].pk).update(author=DiscountCampaign.objects.get().author)
+
+    # Act
+    response = logged_in_client.get(reverse('books:api_books'), {'fields': 'id,effective_discounted_price',
+                                                                 'max_price': '9'})
+
+    # Assert
+    assert response.json()['results'] == [{'id': books[0].id, 'effective_discounted_price': "8.40"}]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("params", [
+    {'fields': 'id,secret'}, {'page_size': '0'}, {'page_size': 'abc'}, {'max_price': 'abc'}, {'max_price': 'NaN'},
+])
+def test_api_rejects_bad_parameters(logged_in_client, books, params):
+    # Act
+    response = logged_in_client.get(reverse('books:api_books'), params)
+
+    # Assert
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url_name", ['books:api_books', 'books:api_authors', 'books:api_genres'])
+def test_unchanged_resource_returns_304_without_queries(logged_in_client, books, url_name, django_assert_num_queries):
+    # Arrange
+    url = reverse(url_name)
+    response = logged_in_client.get(url)
+    etag = response['ETag']
+    assert etag.startswith('"') and response['Last-Modified']
+
+    # Act: only the session and user lookups
+    with django_assert_num_queries(2):
+        not_modified = logged_in_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    # Assert
+    assert not_modified.status_code == 304
+
+
+@pytest.mark.django_db
+def test_changed_catalog_changes_etag(logged_in_client, books):
+    # Arrange
+    url = reverse('books:api_genres')
+    etag = logged_in_client.get(url)['ETag']
+
+    # Act
+    Genre.objects.create(name="Adventure")
+    response = logged_in_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    # Assert
+    assert response.status_code == 200
+    assert [genre['name'] for genre in response.json()['results']] == ["Fiction", "Adventure"]
+
+
+
+@pytest.mark.django_db
+def test_etag_is_shared_and_moved_by_another_process(logged_in_client, books, other_process):
+    # Arrange: another worker with its own local cache computes the same ETag
+    url = reverse('books:api_books')
+    etag = logged_in_client.get(url)['ETag']
+    cache.clear()
+    assert logged_in_client.get(url)['ETag'] == etag
+
+    # Act: a bulk job elsewhere writes without signals and bumps the version
+    Book.objects.filter(pk=books[0].pk).update(title="Renamed")
+    other_process("from bookApp.cache import bump_catalog_version; bump_catalog_version()")
+    response = logged_in_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    # Assert
+    assert response.status_code == 200
+    assert response.json()['results'][0]['title'] == "Renamed"
+
+
+@pytest.mark.django_db
+def test_etag_comes_from_the_rows_without_a_shared_cache(logged_in_client, books, settings):
+    # Arrange
+    settings.CACHES = {**settings.CACHES, 'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    url = reverse('books:api_genres')
+    etag = logged_in_client.get(url)['ETag']
+    assert logged_in_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    # Act: bulk_create sends no signal, so only the rows tell
+    Genre.objects.bulk_create([Genre(name="Adventure")])
+    response = logged_in_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    # Assert
+    assert response.status_code == 200
+
+@pytest.mark.django_db
+def test_updated_at_moves_on_bulk_discount(books):
+    # Arrange
+    before = Book.objects.get(pk=books[0].pk).updated_at
+
+    # Act
+    Book.objects.apply_discount(10)
+
+    # Assert
+    assert Book.objects.get(pk=books[0].pk).updated_at > before
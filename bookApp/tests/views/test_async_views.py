@@ -0,0 +1,124 @@
+from io import StringIO
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.test import AsyncClient
+from django.urls import reverse
+from bookApp.pagination import encode_cursor
+from bookApp.models import Book, Author, Genre
+from django.contrib.auth.models import User
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(username="root", password="password@123")
+
+
+@pytest.fixture
+def book(db):
+    author = Author.objects.create(name="Viramuthu")
+    genre = Genre.objects.create(name="Fiction")
+    book = Book.objects.create(title="Book1", author=author, publication_year=2023)
+    book.genres.add(genre)
+    return book
+
+
+def get(client, url):
+    return async_to_sync(client.get)(url)
+
+
+@pytest.mark.django_db
+def test_async_view_redirects_unauthenticated_user():
+    # Arrange
+    url = reverse('books:async_book_list')
+
+    # Act
+    response = get(AsyncClient(), url)
+
+    # Assert
+    assert response.status_code == 302
+    assert response.url == f"{reverse('login')}?next={url}"
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url_name, kwargs, expected", [
+    ('books:async_book_list', lambda book: {}, ["Book1", "Fiction", "Welcome , root"]),
+    ('books:async_books_by_author', lambda book: {'author_id': book.author_id}, ["Book1"]),
+    ('books:async_books_by_genre', lambda book: {'genre_name': "Fiction"}, ["Book1", "Viramuthu"]),
+    ('books:async_books_by_year', lambda book: {'year': 2023}, ["Book1", "Viramuthu"]),
+])
+def test_async_views_render_books(user, book, url_name, kwargs, expected):
+    # Arrange
+    client = AsyncClient()
+    client.force_login(user)
+
+    # Act
+    response = get(client, reverse(url_name, kwargs=kwargs(book)))
+
+    # Assert
+    assert response.status_code == 200
+    content = response.content.decode()
+    assert all(text in content for text in expected)
+
+
+@pytest.mark.django_db
+def test_async_genre_view_with_unknown_genre(user, book):
+    # Arrange
+    client = AsyncClient()
+    client.force_login(user)
+
+    # Act
+    response = get(client, reverse('books:async_books_by_genre', kwargs={'genre_name': "Unknown"}))
+
+    # Assert
+    assert response.status_code == 200
+    assert "Book1" not in response.content.decode()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_benchmark_command_reports_both_variants(user, book):
+    # Arrange
+    out = StringIO()
+
+    # Act
+    call_command('benchmark_async', username="root", requests=2, concurrency=2, stdout=out)
+
+    # Assert
+    lines = out.getvalue().splitlines()
+    assert len(lines) == 1 + 2 * 4
+    assert sum(' async ' in line for line in lines) == 4
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_previous_cursor_from_the_first_row_redirects_to_the_first_page(user, book):
+    # Arrange
+    client = AsyncClient()
+    client.force_login(user)
+    url = reverse('books:async_book_list')
+    cursor = encode_cursor([book.id], 'prev')
+
+    # Act
+    response = get(client, f"{url}?genre={book.genres.get().id}&cursor={cursor}")
+
+    # Assert
+    assert response.status_code == 302
+    assert response.url == f"{url}?genre={book.genres.get().id}"
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_book_list_filters_by_facets_and_shows_counts(user, book):
+    # Arrange
+    poetry = Genre.objects.create(name="Poetry")
+    Book.objects.create(title="Book2", author=book.author, publication_year=2020).genres.add(poetry)
+    client = AsyncClient()
+    client.force_login(user)
+
+    # Act
+    response = get(client, f"{reverse('books:async_book_list')}?genre={poetry.id}")
+
+    # Assert
+    assert [row.title for row in response.context['books']] == ["Book2"]
+    genres = {entry['label']: entry['count'] for entry in response.context['facets']['genre']}
+    assert genres == {"Fiction": 1, "Poetry": 1}
+    assert [entry['value'] for entry in response.context['facets']['year']] == [2020]
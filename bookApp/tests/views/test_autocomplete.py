@@ -0,0 +1,219 @@
+import threading
+
+import pytest
+from django.core.cache.backends.filebased import FileBasedCache
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from bookApp.autocomplete import NameIndex, PrefixIndex, autocomplete, get_names_version, names
+from bookApp.models import Book, Author
+from django.contrib.auth.models import User
+
+
+@pytest.fixture
+def catalog(db):
+    """Fixture to create authors and books with accented and differently cased names."""
+    kalki, karki = Author.objects.create(name="Kalki"), Author.objects.create(name="Kárki")
+    Author.objects.create(name="Sujatha")
+    for title, author in [("Ponniyin Selvan", kalki), ("Ponmudi", karki), ("Parthiban Kanavu", kalki)]:
+        Book.objects.create(title=title, author=author, publication_year=1950)
+
+
+def test_prefix_index_search_add_and_remove():
+    # Arrange
+    index = PrefixIndex([(1, "Ponniyin Selvan"), (2, "Ponmudi"), (3, "Parthiban Kanavu")])
+
+    # Act
+    index.add(4, "PÖNNI")
+    index.add(2, "Alai Osai")
+    index.remove(1)
+
+    # Assert
+    assert index.search("pon", 10) == [(4, "PÖNNI")]
+    assert index.search("a", 10) == [(2, "Alai Osai")]
+    assert index.search("p", 1) == [(3, "Parthiban Kanavu")]
+    assert len(index) == 3
+
+
+@pytest.mark.django_db
+def test_autocomplete_from_memory_runs_no_query(catalog, settings):
+    # Arrange
+    settings.BOOKAPP_AUTOCOMPLETE_BUILD = 'request'
+    autocomplete('author', "k", 10)
+
+    # Act
+    with CaptureQueriesContext(connection) as queries:
+        results = autocomplete('author', "KA", 10)
+
+    # Assert
+    assert [name for _, name in results] == ["Kalki", "Kárki"]
+    assert len(queries) == 0
+
+
+@pytest.mark.django_db
+def test_autocomplete_falls_back_to_the_database(catalog, settings):
+    # Arrange
+    settings.BOOKAPP_AUTOCOMPLETE_BUILD = 'off'
+    Book.objects.create(title="Ponniyin Selvan Part Two: Whirlwinds", author=Author.objects.first(),
+                        publication_year=1951)
+
+    # Act
+    titles = autocomplete('title', "pon", 10)
+    long_prefix = autocomplete('title', "ponniyin selvan part two", 10)
+
+    # Assert
+    assert [title for _, title in titles] == ["Ponmudi", "Ponniyin Selvan", "Ponniyin Selvan Part Two: Whirlwinds"]
+    assert [title for _, title in long_prefix] == ["Ponniyin Selvan Part Two: Whirlwinds"]
+
+
+@pytest.fixture
+def atomic_shared_cache(settings):
+    """A shared cache whose incr is atomic, as Redis or Memcached would be."""
+    settings.CACHES = {**settings.CACHES, 'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                                     'LOCATION': 'shared'}}
+
+
+@pytest.mark.django_db
+def test_committed_changes_update_the_index(catalog, settings, atomic_shared_cache,
+                                            django_capture_on_commit_callbacks):
+    # Arrange
+    settings.BOOKAPP_AUTOCOMPLETE_BUILD = 'request'
+    autocomplete('title', "p", 10)
+    book = Book.objects.get(title="Ponmudi")
+
+    # Act
+    with django_capture_on_commit_callbacks(execute=True):
+        book.title = "Alai Osai"
+        book.save()
+        Book.objects.get(title="Parthiban Kanavu").delete()
+        author = Author.objects.create(name="Kannadasan")
+
+    # Assert
+    assert names.is_current()
+    assert autocomplete('title', "p", 10) == [(Book.objects.get(title="Ponniyin Selvan").pk, "Ponniyin Selvan")]
+    assert autocomplete('title', "alai", 10) == [(book.pk, "Alai Osai")]
+    assert autocomplete('author', "kan", 10) == [(author.pk, "Kannadasan")]
+
+
+@pytest.mark.django_db
+def test_import_in_another_process_rebuilds_the_index(catalog, settings, other_process):
+    # Arrange: import_books writes with bulk_create, then bumps the names version from its own process
+    settings.BOOKAPP_AUTOCOMPLETE_BUILD = 'request'
+    autocomplete('title', "p", 10)
+    book = Book.objects.bulk_create([Book(title="Pavai", author=Author.objects.first(), publication_year=1960)])[0]
+
+    # Act
+    other_process("from bookApp.autocomplete import bump_names_version; bump_names_version()")
+
+    # Assert
+    assert (book.pk, "Pavai") in autocomplete('title', "pav", 10)
+
+
+@pytest.mark.django_db
+def test_change_after_another_writers_bump_leaves_the_index_stale(catalog, settings, other_process):
+    # Arrange
+    settings.BOOKAPP_AUTOCOMPLETE_BUILD = 'request'
+    autocomplete('title', "p", 10)
+    other_process("from bookApp.autocomplete import bump_names_version; bump_names_version()")
+
+    # Act: this process's own change mustn't hide the other writer's
+    names.changed('title', Book.objects.get(title="Ponmudi").pk, "Alai Osai")
+
+    # Assert
+    assert not names.is_current()
+
+
+@pytest.mark.django_db
+def test_racing_bumps_without_atomic_incr_leave_both_indexes_stale(catalog, settings, monkeypatch):
+    # Arrange: two workers' indexes, current, over the file cache whose incr gets then sets
+    settings.BOOKAPP_AUTOCOMPLETE_BUILD = 'request'
+    workers = [NameIndex(), NameIndex()]
+    for index in workers:
+        index.build()
+    both_read = threading.Barrier(2)
+    set_version = FileBasedCache.set
+
+    def set_after_both_read(*args, **kwargs):
+        both_read.wait(timeout=5)
+        return set_version(*args, **kwargs)
+
+    # Each thread has its own cache object, so patch the backend.
+    monkeypatch.setattr(FileBasedCache, 'set', set_after_both_read)
+    book = Book.objects.get(title="Ponmudi")
+    threads = [
+        threading.Thread(target=workers[0].changed, args=('title', book.pk, "Alai Osai")),
+        threading.Thread(target=workers[1].changed, args=('title', book.pk)),
+    ]
+
+    # Act
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Assert: both bumps returned the same version, neither index may take it as its own
+    assert not any(index.is_current() for index in workers)
+
+
+@pytest.mark.django_db
+def test_autocomplete_api_returns_titles_and_authors(logged_in_client, catalog, settings):
+    # Arrange
+    settings.BOOKAPP_AUTOCOMPLETE_BUILD = 'request'
+
+    # Act
+    response = logged_in_client.get(reverse('books:api_autocomplete'), {'q': "Pa"})
+    authors = logged_in_client.get(reverse('books:api_autocomplete'), {'q': "k", 'type': 'author', 'limit': 1})
+
+    # Assert
+    assert response.status_code == 200
+    assert [(result['type'], result['label']) for result in response.json()['results']] == [("title", "Parthiban Kanavu")]
+    assert [result['label'] for result in authors.json()['results']] == ["Kalki"]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('params', [{'q': "k", 'type': 'genre'}, {'q': "k", 'limit': 'all'}])
+def test_autocomplete_api_rejects_bad_parameters(logged_in_client, params):
+    # Act
+    response = logged_in_client.get(reverse('books:api_autocomplete'), params)
+
+    # Assert
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_book_form_renders_only_the_selected_author(catalog):
+    # Arrange
+    User.objects.create_superuser(username="admin", password="password@123")
+    client = Client()
+    client.login(username="admin", password="password@123")
+    book = Book.objects.get(title="Ponmudi")
+
+    # Act
+    create = client.get(reverse('books:add_book')).content.decode()
+    update = client.get(reverse('books:update_book', kwargs={'pk': book.pk})).content.decode()
+
+    # Assert
+    assert "Kalki" not in create and "Sujatha" not in create
+    assert reverse('books:api_autocomplete') in create
+    assert f'<option value="{book.author_id}" selected>Kárki</option>' in update
+    assert "Kalki" not in update
+
+
+@pytest.mark.django_db
+def test_saves_that_keep_the_name_leave_the_index_current(catalog, settings, django_capture_on_commit_callbacks):
+    # Arrange
+    settings.BOOKAPP_AUTOCOMPLETE_BUILD = 'request'
+    autocomplete('title', "p", 10)
+    book, author = Book.objects.get(title="Ponmudi"), Author.objects.get(name="Kalki")
+    version = get_names_version()
+
+    # Act
+    with django_capture_on_commit_callbacks(execute=True):
+        book.price = 100
+        book.save()
+        author.save()
+
+    # Assert
+    assert get_names_version() == version
+    assert names.is_current()
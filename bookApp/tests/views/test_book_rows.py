@@ -0,0 +1,95 @@
+import pytest
+from django.test.client import Client
+from django.test.signals import template_rendered
+from django.urls import reverse
+from bookApp.cache import BOOK_ROW_TEMPLATE, render_book_rows
+from bookApp.models import Book, Author, Genre
+from django.contrib.auth.models import User
+
+
+@pytest.fixture
+def row_renders():
+    """Fixture collecting the books whose row template got rendered."""
+    rendered = []
+
+    def on_render(sender, template, context, **kwargs):
+        if template.name == BOOK_ROW_TEMPLATE:
+            rendered.append(context['book'].title)
+
+    template_rendered.connect(on_render)
+    yield rendered
+    template_rendered.disconnect(on_render)
+
+
+@pytest.fixture
+def books(db):
+    author = Author.objects.create(name="Viramuthu")
+    genre = Genre.objects.create(name="Fiction")
+    books = [Book.objects.create(title=f"Book{i}", author=author, publication_year=2023) for i in range(3)]
+    for book in books:
+        book.genres.add(genre)
+    return books
+
+
+def fetch_books():
+    return list(Book.objects.select_related('author').prefetch_related('genres').order_by('id'))
+
+
+@pytest.mark.django_db
+def test_warm_rows_are_not_rendered_again(books, row_renders):
+    # Arrange
+    cold = render_book_rows(fetch_books())
+    row_renders.clear()
+
+    # Act
+    warm = render_book_rows(fetch_books())
+
+    # Assert
+    assert row_renders == []
+    assert warm == cold
+    assert "Book0" in warm[0] and "Fiction" in warm[0]
+
+
+@pytest.mark.django_db
+def test_only_changed_rows_are_rendered(books, row_renders):
+    # Arrange
+    render_book_rows(fetch_books())
+    row_renders.clear()
+
+    # Act
+    books[1].title = "Renamed"
+    books[1].save()
+    rows = render_book_rows(fetch_books())
+
+    # Assert
+    assert row_renders == ["Renamed"]
+    assert "Renamed" in rows[1]
+
+
+@pytest.mark.django_db
+def test_genre_rename_changes_the_row(books, row_renders):
+    # Arrange
+    render_book_rows(fetch_books())
+
+    # Act
+    Genre.objects.filter(name="Fiction").update(name="Adventure")
+    rows = render_book_rows(fetch_books())
+
+    # Assert
+    assert all("Adventure" in row for row in rows)
+
+
+@pytest.mark.django_db
+def test_book_list_page_uses_row_fragments(books):
+    # Arrange
+    User.objects.create_user(username="root", password="password@123")
+    client = Client()
+    client.login(username="root", password="password@123")
+
+    # Act
+    response = client.get(reverse('books:book_list'))
+
+    # Assert
+    content = response.content.decode()
+    assert all(book.title in content for book in books)
+    assert reverse('books:update_book', args=[books[0].id]) in content
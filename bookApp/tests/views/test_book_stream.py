@@ -0,0 +1,131 @@
+import functools
+import tracemalloc
+import warnings
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import AsyncClient
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from bookApp.models import Book, Author, DiscountCampaign, Genre
+from bookApp import views
+from bookApp.export import export_lines
+from bookApp.views import BookStreamView
+
+
+def test_stream_requires_login(client):
+    # Act
+    response = client.get(reverse('books:book_list_stream'))
+
+    # Assert
+    assert response.status_code == 302
+
+
+@pytest.mark.django_db
+def test_head_is_sent_before_books_are_queried(logged_in_client, monkeypatch):
+    # Arrange
+    monkeypatch.setattr(BookStreamView, 'chunk_size', 2)
+    author = Author.objects.create(name="Kalki")
+    genre = Genre.objects.create(name="Fiction")
+    for i in range(5):
+        Book.objects.create(title=f"Book{i}", author=author, publication_year=2020, price=Decimal('10.00')).genres.add(genre)
+    DiscountCampaign.objects.create(name="Sale", percentage=Decimal('10'))
+    response = logged_in_client.get(reverse('books:book_list_stream'))
+    content = iter(response.streaming_content)
+
+    # Act
+    with CaptureQueriesContext(connection) as head_queries:
+        head = next(content).decode()
+    with CaptureQueriesContext(connection) as row_queries:
+        chunks = [chunk.decode() for chunk in content]
+
+    # Assert
+    assert "<thead>" in head and "Book0" not in head
+    assert not [query for query in head_queries.captured_queries if 'bookApp_book' in query['sql']]
+    # Three chunks of rows and the foot.
+    assert len(chunks) == 4
+    assert [chunk.count("<tr>") for chunk in chunks[:3]] == [2, 2, 1]
+    assert "<td>9.00</td>" in chunks[0]
+    assert "Logout" in chunks[-1] and "No books found" not in chunks[-1]
+    # Books with authors, then the genres prefetch once per chunk.
+    book_queries = [query for query in row_queries.captured_queries if 'bookApp_book' in query['sql']]
+    assert len(book_queries) == 1 + 3
+    assert response.cookies.get('csrftoken')
+
+
+@pytest.mark.django_db
+def test_empty_catalog(logged_in_client):
+    # Act
+    content = b''.join(logged_in_client.get(reverse('books:book_list_stream')).streaming_content).decode()
+
+    # Assert
+    assert "No books found" in content
+
+
+def peak_memory(client):
+    response = client.get(reverse('books:book_list_stream'))
+    tracemalloc.start()
+    try:
+        size = sum(len(chunk) for chunk in response.streaming_content)
+        return tracemalloc.get_traced_memory()[1], size
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.mark.django_db
+def test_peak_memory_depends_on_chunk_size_not_catalog_size(logged_in_client, monkeypatch):
+    # Arrange
+    monkeypatch.setattr(BookStreamView, 'chunk_size', 100)
+    call_command('seed_catalog', books=300, seed=1, stdout=StringIO())
+    small_peak, small_size = peak_memory(logged_in_client)
+    call_command('seed_catalog', books=2700, seed=2, stdout=StringIO())
+
+    # Act
+    large_peak, large_size = peak_memory(logged_in_client)
+
+    # Assert
+    assert large_size > 8 * small_size
+    assert large_peak < 2 * small_peak
+
+
+def asgi_peak_memory(client, url):
+    async def consume():
+        response = await client.get(url)
+        assert response.is_async
+        tracemalloc.start()
+        try:
+            with warnings.catch_warnings():
+                # Django warns when it has to read a sync iterator to the end first.
+                warnings.simplefilter('error')
+                size = 0
+                async for chunk in response.streaming_content:
+                    size += len(chunk)
+            return tracemalloc.get_traced_memory()[1], size
+        finally:
+            tracemalloc.stop()
+    return async_to_sync(consume)()
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize("url", [reverse('books:book_list_stream'), reverse('books:export_books')])
+def test_asgi_streams_with_memory_bounded_by_chunk_size(url, monkeypatch):
+    # Arrange
+    monkeypatch.setattr(BookStreamView, 'chunk_size', 100)
+    monkeypatch.setattr(views, 'export_lines', functools.partial(export_lines, chunk_size=100))
+    client = AsyncClient()
+    client.force_login(User.objects.create_user(username="root", password="password@123"))
+    call_command('seed_catalog', books=300, seed=1, stdout=StringIO())
+    small_peak, small_size = asgi_peak_memory(client, url)
+    call_command('seed_catalog', books=2700, seed=2, stdout=StringIO())
+
+    # Act
+    large_peak, large_size = asgi_peak_memory(client, url)
+
+    # Assert
+    assert large_size > 8 * small_size
+    assert large_peak < 2 * small_peak
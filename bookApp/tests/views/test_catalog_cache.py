@@ -0,0 +1,159 @@
+import threading
+from io import StringIO
+
+import pytest
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.management import call_command
+from django.urls import reverse
+from bookApp.cache import CATALOG_VERSION_KEY, bump_catalog_version, get_catalog_version
+from bookApp.checks import check_shared_cache
+from bookApp.models import Book, Author, Genre
+
+
+@pytest.fixture(params=['locmem', 'filebased'])
+def cache_backend(request, settings, tmp_path):
+    """Run each test against LocMemCache and FileBasedCache."""
+    if request.param == 'filebased':
+        settings.CACHES = {**settings.CACHES, 'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': str(tmp_path / 'cache'),
+        }}
+    return request.param
+
+
+@pytest.fixture
+def logged_in_client(cache_backend, logged_in_client):
+    """The conftest client, logged in once the cache backend is in place."""
+    return logged_in_client
+
+
+@pytest.fixture
+def book(db):
+    author = Author.objects.create(name="Viramuthu")
+    genre = Genre.objects.create(name="Fiction")
+    book = Book.objects.create(title="Book1", author=author, publication_year=2023)
+    book.genres.add(genre)
+    return book
+
+
+@pytest.mark.django_db
+def test_warm_page_skips_catalog_queries(logged_in_client, book, django_assert_num_queries):
+    # Arrange
+    url = reverse('books:book_list')
+    logged_in_client.get(url)
+
+    # Act / Assert: only the session and user lookups are left
+    with django_assert_num_queries(2):
+        response = logged_in_client.get(url)
+    assert "Book1" in response.content.decode()
+    assert "Fiction" in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_new_book_invalidates_cached_page(logged_in_client, book):
+    # Arrange
+    url = reverse('books:book_list')
+    logged_in_client.get(url)
+
+    # Act
+    Book.objects.create(title="Book2", author=book.author, publication_year=2024)
+    response = logged_in_client.get(url)
+
+    # Assert
+    assert "Book2" in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_author_rename_invalidates_cached_page(logged_in_client, book):
+    # Arrange
+    url = reverse('books:books_by_year', kwargs={'year': 2023})
+    logged_in_client.get(url)
+
+    # Act
+    book.author.name = "Vairamuthu"
+    book.author.save()
+    response = logged_in_client.get(url)
+
+    # Assert
+    assert "Vairamuthu" in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_genre_change_invalidates_cached_page(logged_in_client, book):
+    # Arrange
+    url = reverse('books:books_by_genre', kwargs={'genre_name': "Adventure"})
+    adventure = Genre.objects.create(name="Adventure")
+    assert "Book1" not in logged_in_client.get(url).content.decode()
+
+    # Act
+    book.genres.add(adventure)
+    response = logged_in_client.get(url)
+
+    # Assert
+    assert "Book1" in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_bulk_commands_bump_the_version(book, cache_backend):
+    # Arrange
+    version = get_catalog_version()
+
+    # Act
+    call_command('price_command', 10, bulk=True, stdout=StringIO())
+
+    # Assert
+    assert get_catalog_version() != version
+
+
+def test_concurrent_bumps_each_write_a_new_version(monkeypatch):
+    # Arrange: both bumps reach the write together, as two processes committing at once would
+    both_writing = threading.Barrier(2)
+    written = []
+    set_value = FileBasedCache.set
+
+    def set_together(self, key, value, *args, **kwargs):
+        both_writing.wait(timeout=5)
+        if key == CATALOG_VERSION_KEY:
+            written.append(value)
+        return set_value(self, key, value, *args, **kwargs)
+
+    version = get_catalog_version()
+    monkeypatch.setattr(FileBasedCache, 'set', set_together)
+    threads = [threading.Thread(target=bump_catalog_version) for _ in range(2)]
+
+    # Act
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Assert: a page cached after the first write is not served after the second
+    assert len({version, *written}) == 3
+    assert get_catalog_version() in written
+
+
+@pytest.mark.django_db
+def test_bump_from_another_process_invalidates_cached_page(logged_in_client, book, other_process):
+    # Arrange: a bulk job writes without signals, then bumps the version from its own process
+    url = reverse('books:book_list')
+    logged_in_client.get(url)
+    Book.objects.filter(pk=book.pk).update(title="Book1 Revised")
+    assert "Book1 Revised" not in logged_in_client.get(url).content.decode()
+
+    # Act
+    other_process("from bookApp.cache import bump_catalog_version; bump_catalog_version()")
+    response = logged_in_client.get(url)
+
+    # Assert
+    assert "Book1 Revised" in response.content.decode()
+
+
+def test_process_local_shared_cache_is_reported(settings):
+    # Arrange
+    settings.CACHES = {**settings.CACHES, 'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+    # Act
+    messages = check_shared_cache(None)
+
+    # Assert
+    assert [message.id for message in messages] == ['bookApp.W001']
@@ -0,0 +1,111 @@
+import csv
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from django.test.client import Client
+from django.urls import reverse
+from decimal import Decimal
+from bookApp.models import Book, Author, DiscountCampaign, Genre
+
+
+@pytest.fixture
+def books(db):
+    """Fixture to create books with genres and optional prices."""
+    author = Author.objects.create(name="Viramuthu")
+    fiction = Genre.objects.create(name="Fiction")
+    adventure = Genre.objects.create(name="Adventure")
+    first = Book.objects.create(title="Book1", author=author, publication_year=2023, price=Decimal('100.00'))
+    first.genres.add(fiction, adventure)
+    second = Book.objects.create(title="Book2", author=author, publication_year=2024)
+    second.genres.add(fiction)
+    return first, second
+
+
+def test_export_unauthenticated_user():
+    # Arrange
+    url = reverse('books:export_books')
+    client = Client()
+
+    # Act
+    response = client.get(url)
+
+    # Assert
+    assert response.status_code == 302
+
+
+@pytest.mark.django_db
+def test_export_csv(logged_in_client, books):
+    # Act
+    response = logged_in_client.get(reverse('books:export_books'))
+
+    # Assert
+    assert response.status_code == 200
+    assert response['Content-Type'] == 'text/csv'
+    rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+    assert [row['title'] for row in rows] == ["Book1", "Book2"]
+    assert rows[0]['author'] == "Viramuthu"
+    assert sorted(rows[0]['genres'].split('|')) == ["Adventure", "Fiction"]
+    assert rows[0]['price'] == "100.00"
+    assert rows[1]['price'] == ""
+
+
+@pytest.mark.django_db
+def test_export_includes_the_effective_price(logged_in_client, books):
+    # Arrange
+    DiscountCampaign.objects.create(name="Sale", percentage=Decimal('25'))
+
+    # Act
+    response = logged_in_client.get(reverse('books:export_books'), {'format': 'jsonl'})
+
+    # Assert
+    records = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+    assert [(record['discounted_price'], record['effective_discounted_price']) for record in records] == [
+        (None, "75.00"), (None, None),
+    ]
+
+
+@pytest.mark.django_db
+def test_export_jsonl_since(logged_in_client, books):
+    # Arrange
+    first, second = books
+
+    # Act
+    response = logged_in_client.get(reverse('books:export_books'), {'format': 'jsonl', 'since': first.id})
+
+    # Assert
+    records = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+    assert records == [{
+        'id': second.id,
+        'title': "Book2",
+        'author': "Viramuthu",
+        'publication_year': 2024,
+        'genres': ["Fiction"],
+        'price': None,
+        'discounted_price': None,
+        'effective_discounted_price': None,
+    }]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("params", [{'format': 'xml'}, {'since': 'abc'}])
+def test_export_rejects_bad_parameters(logged_in_client, params):
+    # Act
+    response = logged_in_client.get(reverse('books:export_books'), params)
+
+    # Assert
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_export_command_prefetches_genres_per_chunk(books, tmp_path, django_assert_num_queries):
+    # Arrange
+    output = tmp_path / "books.jsonl"
+
+    # Act: books are read from one cursor, genres are prefetched once per chunk
+    with django_assert_num_queries(3):
+        call_command('export_books', format='jsonl', output=str(output), chunk_size=1, stdout=io.StringIO())
+
+    # Assert
+    assert len(output.read_text().splitlines()) == 2
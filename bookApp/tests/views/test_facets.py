@@ -0,0 +1,97 @@
+import pytest
+from django.urls import reverse
+from bookApp.facets import compute_facets
+from bookApp.models import Book, Author, Genre
+
+
+@pytest.fixture
+def catalog(db):
+    fiction, poetry = Genre.objects.create(name="Fiction"), Genre.objects.create(name="Poetry")
+    kalki, ambai = Author.objects.create(name="Kalki"), Author.objects.create(name="Ambai")
+    for i, (author, year, genres) in enumerate([
+        (kalki, 2020, [fiction]),
+        (kalki, 2020, [fiction, poetry]),
+        (kalki, 2021, [poetry]),
+        (ambai, 2021, [fiction]),
+    ]):
+        Book.objects.create(title=f"Book{i}", author=author, publication_year=year).genres.set(genres)
+    return {'fiction': fiction, 'poetry': poetry, 'kalki': kalki, 'ambai': ambai}
+
+
+def counts(facet):
+    return {entry['label']: entry['count'] for entry in facet}
+
+
+@pytest.mark.django_db
+def test_facet_counts_of_the_whole_catalog(catalog, django_assert_num_queries):
+    # Act
+    with django_assert_num_queries(3):
+        facets = compute_facets({})
+
+    # Assert
+    assert counts(facets['genre']) == {"Fiction": 3, "Poetry": 2}
+    assert counts(facets['year']) == {2021: 2, 2020: 2}
+    assert counts(facets['author']) == {"Kalki": 3, "Ambai": 1}
+    assert [entry['label'] for entry in facets['author']] == ["Kalki", "Ambai"]
+
+
+@pytest.mark.django_db
+def test_each_facet_is_counted_under_the_other_selections(catalog):
+    # Act
+    facets = compute_facets({'genre': catalog['fiction'].id, 'year': 2021})
+
+    # Assert
+    # Genres: books of 2021, whatever their genre.
+    assert counts(facets['genre']) == {"Fiction": 1, "Poetry": 1}
+    # Years: fiction books, whatever their year.
+    assert counts(facets['year']) == {2020: 2, 2021: 1}
+    # Authors: fiction books of 2021.
+    assert counts(facets['author']) == {"Ambai": 1}
+    assert [entry['selected'] for entry in facets['genre']] == [True, False]
+
+
+@pytest.mark.django_db
+def test_selected_author_is_listed_first(catalog):
+    # Act
+    facets = compute_facets({'author': catalog['ambai'].id})
+
+    # Assert
+    assert facets['author'][0]['label'] == "Ambai"
+    assert facets['author'][0]['selected']
+
+
+@pytest.mark.django_db
+def test_book_list_filters_by_facets_and_shows_counts(logged_in_client, catalog):
+    # Act
+    response = logged_in_client.get(reverse('books:book_list'), {'author': catalog['kalki'].id, 'year': 2020})
+
+    # Assert
+    assert response.status_code == 200
+    assert [book.title for book in response.context['books']] == ["Book0", "Book1"]
+    content = response.content.decode()
+    assert "Fiction</a> (2)" in content
+    assert f"?author={catalog['kalki'].id}&amp;year=2021" in content
+    assert "?year=2020" in content  # clears the author
+
+
+@pytest.mark.django_db
+def test_facets_are_cached_until_the_catalog_changes(logged_in_client, catalog, django_assert_num_queries):
+    # Arrange
+    url = reverse('books:book_list')
+    logged_in_client.get(url)
+
+    # Act / Assert
+    with django_assert_num_queries(2):  # session, user: the page and its facets are cached
+        logged_in_client.get(url)
+    Book.objects.create(title="Book4", author=catalog['ambai'], publication_year=2022)
+    response = logged_in_client.get(url)
+    assert counts(response.context['facets']['year'])[2022] == 1
+
+
+@pytest.mark.django_db
+def test_invalid_facet_value_returns_404(logged_in_client, catalog):
+    # Act
+    response = logged_in_client.get(reverse('books:book_list'), {'year': 'soon'})
+
+    # Assert
+    assert response.status_code == 404
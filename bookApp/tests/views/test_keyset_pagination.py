@@ -0,0 +1,126 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from bookApp.models import Book, Author
+from bookApp.pagination import encode_cursor, paginate_keyset
+from bookApp.views import BookByAuthorListView, BookListView
+
+
+@pytest.fixture
+def books(db):
+    """Fixture to create more books than fit on one page, spread over a few years."""
+    author = Author.objects.create(name="Viramuthu")
+    return [
+        Book.objects.create(title=f"Book {i}", author=author, publication_year=2000 + i % 3)
+        for i in range(7)
+    ]
+
+
+@pytest.mark.django_db
+def test_walk_book_list_forwards_and_backwards(logged_in_client, books, monkeypatch):
+    # Arrange
+    monkeypatch.setattr(BookListView, 'paginate_by', 3)
+    url = reverse('books:book_list')
+
+    # Act
+    first = logged_in_client.get(url).context['page_obj']
+    second = logged_in_client.get(url, {'cursor': first.next_cursor}).context['page_obj']
+    third = logged_in_client.get(url, {'cursor': second.next_cursor}).context['page_obj']
+    back = logged_in_client.get(url, {'cursor': third.previous_cursor}).context['page_obj']
+
+    # Assert
+    ids = [book.id for book in books]
+    assert [book.id for book in first] == ids[0:3]
+    assert [book.id for book in second] == ids[3:6]
+    assert [book.id for book in third] == ids[6:]
+    assert [book.id for book in back] == ids[3:6]
+    assert not first.has_previous() and first.has_next()
+    assert not third.has_next() and third.has_previous()
+    assert back.has_next() and back.has_previous()
+
+
+@pytest.mark.django_db
+def test_deep_page_costs_the_same_queries(logged_in_client, books, monkeypatch, django_assert_num_queries):
+    # Arrange
+    monkeypatch.setattr(BookListView, 'paginate_by', 2)
+    url = reverse('books:book_list')
+    cursor = logged_in_client.get(url).context['page_obj'].next_cursor
+    # The facet counts are shared by every page and cached after the first one.
+    with CaptureQueriesContext(connection) as second_page:
+        cursor = logged_in_client.get(url, {'cursor': cursor}).context['page_obj'].next_cursor
+
+    # Act / Assert
+    with django_assert_num_queries(len(second_page)):
+        response = logged_in_client.get(url, {'cursor': cursor})
+    assert response.status_code == 200
+    assert 'cursor=' in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_invalid_cursor_returns_404(logged_in_client, books):
+    # Act
+    response = logged_in_client.get(reverse('books:book_list'), {'cursor': 'not-a-cursor'})
+
+    # Assert
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_composite_ordering_pages_by_year_then_id(books):
+    # Arrange
+    ordering = ('publication_year', 'id')
+    expected = sorted(books, key=lambda book: (book.publication_year, book.id))
+
+    # Act
+    seen = []
+    page = paginate_keyset(Book.objects.all(), ordering, 2)
+    seen.extend(page)
+    while page.has_next():
+        page = paginate_keyset(Book.objects.all(), ordering, 2, page.next_cursor)
+        seen.extend(page)
+
+    # Assert
+    assert [book.id for book in seen] == [book.id for book in expected]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url_name", ['books:book_list', 'books:author_list', 'books:api_books'])
+@pytest.mark.parametrize("values", [["abc"], [{"id": 1}], [None], [[1]]])
+def test_wrong_typed_cursor_returns_404(logged_in_client, books, url_name, values):
+    # Arrange
+    ordering = ('-book_count', '-id') if url_name == 'books:author_list' else ('id',)
+    cursor = encode_cursor(values * len(ordering), 'next')
+
+    # Act
+    response = logged_in_client.get(reverse(url_name), {'cursor': cursor})
+
+    # Assert
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url_name, kwargs', [
+    ('books:book_list', {}),
+    ('books:books_by_author', None),
+])
+def test_walking_back_past_the_first_page_redirects_to_it(logged_in_client, books, monkeypatch, settings,
+                                                          url_name, kwargs):
+    # Arrange: the previous link of the second page, after the rows before it were deleted
+    settings.DEBUG = True  # Enforces the query budgets.
+    for view in (BookListView, BookByAuthorListView):
+        monkeypatch.setattr(view, 'paginate_by', 3)
+    url = reverse(url_name, kwargs={'author_id': books[0].author_id} if kwargs is None else kwargs)
+    first = logged_in_client.get(url).context['page_obj']
+    second = logged_in_client.get(url, {'cursor': first.next_cursor}).context['page_obj']
+    Book.objects.filter(pk__in=[book.pk for book in first]).delete()
+
+    # Act
+    response = logged_in_client.get(url, {'cursor': second.previous_cursor, 'page_size': 'x'})
+    page = logged_in_client.get(response.url).context['page_obj']
+
+    # Assert
+    assert response.status_code == 302
+    assert response.url == f"{url}?page_size=x"
+    assert [book.id for book in page] == [book.id for book in books[3:6]]
+    assert page.has_next() and not page.has_previous()
\ No newline at end of file
@@ -0,0 +1,162 @@
+import pstats
+import threading
+import time
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.http import HttpResponse
+from django.test import AsyncClient, Client, RequestFactory
+from django.urls import resolve, reverse
+from bookApp.middleware import ProfilingMiddleware, StackSampler
+from bookApp.models import Book, Author
+
+
+@pytest.fixture
+def profile_dir(settings, tmp_path):
+    settings.BOOKAPP_PROFILE_DIR = tmp_path / "profiles"
+    return settings.BOOKAPP_PROFILE_DIR
+
+
+@pytest.fixture
+def make_client(db):
+    User.objects.create_user(username="root", password="password@123")
+
+    def make():
+        # The middleware reads its settings when a client loads it.
+        client = Client()
+        client.login(username="root", password="password@123")
+        return client
+    return make
+
+
+@pytest.mark.django_db
+def test_sampled_requests_are_written_as_cprofile_stats(settings, profile_dir, make_client):
+    # Arrange
+    settings.BOOKAPP_PROFILE_SAMPLE_RATE = 1
+    Book.objects.create(title="Book1", author=Author.objects.create(name="Kalki"), publication_year=2020)
+    client = make_client()
+
+    # Act
+    response = client.get(reverse('books:book_list'))
+
+    # Assert
+    [profile] = profile_dir.glob('*.prof')
+    queries = response.wsgi_request.timing.queries
+    assert f"-books.book_list-{queries}q-" in profile.name
+    functions = {function for _, _, function in pstats.Stats(str(profile)).stats}
+    assert 'get' in functions
+
+
+@pytest.mark.django_db
+def test_slow_requests_are_written_as_collapsed_stacks(settings, profile_dir, make_client):
+    # Arrange
+    settings.BOOKAPP_PROFILE_SLOW_MS = 0
+    client = make_client()
+
+    # Act
+    client.get(reverse('books:author_list'))
+
+    # Assert
+    [profile] = profile_dir.glob('*.folded')
+    assert "-books.author_list-" in profile.name
+
+
+@pytest.mark.django_db
+def test_profiles_are_rotated(settings, profile_dir, make_client):
+    # Arrange
+    settings.BOOKAPP_PROFILE_SAMPLE_RATE = 1
+    settings.BOOKAPP_PROFILE_KEEP = 2
+    client = make_client()
+
+    # Act
+    for url_name in ('books:book_list', 'books:author_list', 'books:search'):
+        client.get(reverse(url_name))
+
+    # Assert
+    profiles = sorted(path.name for path in profile_dir.iterdir())
+    assert len(profiles) == 2
+    assert "books.author_list" in profiles[0] and "books.search" in profiles[1]
+
+
+@pytest.mark.django_db
+def test_only_books_views_are_profiled(settings, profile_dir, make_client):
+    # Arrange
+    settings.BOOKAPP_PROFILE_SAMPLE_RATE = 1
+    client = make_client()
+
+    # Act
+    client.get(reverse('login'))
+
+    # Assert
+    assert not profile_dir.exists()
+
+
+@pytest.mark.django_db
+def test_profiling_is_off_by_default(profile_dir, make_client):
+    # Act
+    make_client().get(reverse('books:book_list'))
+
+    # Assert
+    assert not profile_dir.exists()
+
+
+def test_stack_sampler_records_the_watched_thread():
+    # Arrange
+    sampler = StackSampler(0.001)
+
+    def busy():
+        deadline = time.perf_counter() + 0.05
+        while time.perf_counter() < deadline:
+            pass
+
+    # Act
+    sampler.start(threading.get_ident())
+    busy()
+    samples = sampler.stop(threading.get_ident())
+
+    # Assert
+    assert samples
+    assert any(';busy (' in stack for stack in samples)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_requests_are_profiled(settings, profile_dir):
+    # Arrange
+    settings.BOOKAPP_PROFILE_SAMPLE_RATE = 1
+    User.objects.create_user(username="root", password="password@123")
+    client = AsyncClient()
+    async_to_sync(client.alogin)(username="root", password="password@123")
+
+    # Act
+    response = async_to_sync(client.get)(reverse('books:async_book_list'))
+
+    # Assert
+    assert response.status_code == 200
+    [profile] = profile_dir.glob('*.prof')
+    assert "-books.async_book_list-" in profile.name
+
+
+@pytest.mark.django_db
+def test_overlapping_sampled_requests_are_profiled_one_at_a_time(settings, profile_dir):
+    # Arrange
+    settings.BOOKAPP_PROFILE_SAMPLE_RATE = 1
+    settings.BOOKAPP_PROFILE_SLOW_MS = 0
+    middleware = ProfilingMiddleware(lambda request: HttpResponse())
+    first, second = RequestFactory().get(reverse('books:book_list')), RequestFactory().get(reverse('books:author_list'))
+    for request in (first, second):
+        request.resolver_match = resolve(request.path)
+
+    # Act: the second starts while the first is still under cProfile
+    middleware.process_view(first, None, (), {})
+    middleware.process_view(second, None, (), {})
+    middleware.write_profile(second)
+    middleware.write_profile(first)
+    third = RequestFactory().get(reverse('books:search'))
+    third.resolver_match = resolve(third.path)
+    middleware.process_view(third, None, (), {})
+    middleware.write_profile(third)
+
+    # Assert
+    assert [path.suffix for path in sorted(profile_dir.iterdir())] == ['.folded', '.prof', '.prof']
+    assert "-books.author_list-" in next(profile_dir.glob('*.folded')).name
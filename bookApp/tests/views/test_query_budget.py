@@ -0,0 +1,84 @@
+import pytest
+from django.urls import reverse
+from bookApp.models import Book, Author, Genre
+from bookApp.query_budget import QueryBudgetExceeded, assert_query_budget
+from bookApp.views import (
+    AuthorListView,
+    BookByAuthorListView,
+    BookByGenreListView,
+    BookByPublicationYearView,
+    BookListView,
+)
+
+
+@pytest.fixture
+def catalog(db):
+    """Fixture to create a few authors and genres with several books each."""
+    genres = [Genre.objects.create(name=f"Genre {i}") for i in range(3)]
+    authors = [Author.objects.create(name=f"Author {i}") for i in range(3)]
+    for i in range(10):
+        book = Book.objects.create(title=f"Book {i}", author=authors[i % 3], publication_year=2020)
+        book.genres.add(*genres)
+    return authors, genres
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "view_class, url_name, kwargs",
+    [
+        (BookListView, 'books:book_list', {}),
+        (AuthorListView, 'books:author_list', {}),
+        (BookByAuthorListView, 'books:books_by_author', {'author_id': None}),
+        (BookByGenreListView, 'books:books_by_genre', {'genre_name': 'Genre 0'}),
+        (BookByPublicationYearView, 'books:books_by_year', {'year': 2020}),
+    ]
+)
+def test_list_views_stay_within_query_budget(logged_in_client, catalog, view_class, url_name, kwargs):
+    # Arrange
+    authors, genres = catalog
+    if 'author_id' in kwargs:
+        kwargs = {'author_id': authors[0].id}
+    url = reverse(url_name, kwargs=kwargs)
+
+    # Act / Assert
+    with assert_query_budget(view_class):
+        response = logged_in_client.get(url)
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_book_list_query_count_does_not_grow_with_books(logged_in_client, catalog, django_assert_num_queries):
+    # Arrange
+    authors, genres = catalog
+    for i in range(20):
+        book = Book.objects.create(title=f"More {i}", author=authors[0], publication_year=2021)
+        book.genres.add(genres[0])
+
+    # Act / Assert
+    with django_assert_num_queries(BookListView.query_budget):
+        response = logged_in_client.get(reverse('books:book_list'))
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_runtime_guard_raises_in_debug(logged_in_client, catalog, settings, monkeypatch):
+    # Arrange
+    settings.DEBUG = True
+    monkeypatch.setattr(BookListView, 'query_budget', 1)
+
+    # Act / Assert
+    with pytest.raises(QueryBudgetExceeded):
+        logged_in_client.get(reverse('books:book_list'))
+
+
+@pytest.mark.django_db
+def test_runtime_guard_is_off_without_debug(logged_in_client, catalog, settings, monkeypatch):
+    # Arrange
+    settings.DEBUG = False
+    monkeypatch.setattr(BookListView, 'query_budget', 1)
+
+    # Act
+    response = logged_in_client.get(reverse('books:book_list'))
+
+    # Assert
+    assert response.status_code == 200
@@ -0,0 +1,151 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from bookApp.models import Book, Author, Genre
+from bookApp.query_budget import assert_query_budget
+from bookApp.search import SEARCH_TABLE, create_search_triggers, match_expression, search_books
+from bookApp.views import BookSearchView
+from django.contrib.auth.models import User
+
+
+@pytest.fixture
+def books(db):
+    """Fixture to create a few books by two authors."""
+    viramuthu = Author.objects.create(name="Viramuthu")
+    kalki = Author.objects.create(name="Kalki")
+    genre = Genre.objects.create(name="Fiction")
+    books = [
+        Book.objects.create(title="Ponniyin Selvan", author=kalki, publication_year=1955),
+        Book.objects.create(title="Sivagamiyin Sabatham", author=kalki, publication_year=1948),
+        Book.objects.create(title="Karuvachi Kaaviyam", author=viramuthu, publication_year=2006),
+    ]
+    for book in books:
+        book.genres.add(genre)
+    return books
+
+
+def test_match_expression_quotes_words():
+    assert match_expression('ponni OR "selvan') == '"ponni" "OR" "selvan"*'
+    assert match_expression('  ') is None
+
+
+@pytest.mark.django_db
+def test_search_by_title_prefix(books):
+    # Act
+    results = search_books(Book.objects.all(), "ponni", limit=10)
+
+    # Assert
+    assert [book.title for book in results] == ["Ponniyin Selvan"]
+
+
+@pytest.mark.django_db
+def test_title_matches_rank_above_author_matches(books):
+    # Arrange
+    kalki = Author.objects.get(name="Kalki")
+    Book.objects.create(title="Kalki Stories", author=Author.objects.get(name="Viramuthu"), publication_year=2000)
+
+    # Act
+    results = search_books(Book.objects.all(), "kalki", limit=10)
+
+    # Assert
+    assert results[0].title == "Kalki Stories"
+    assert {book.author for book in results[1:]} == {kalki}
+
+
+@pytest.mark.django_db
+def test_index_follows_updates_and_deletes(books):
+    # Arrange
+    ponniyin, sivagamiyin, karuvachi = books
+
+    # Act
+    Author.objects.filter(name="Viramuthu").update(name="Vairamuthu")
+    sivagamiyin.title = "Parthiban Kanavu"
+    sivagamiyin.save()
+    ponniyin.delete()
+
+    # Assert
+    assert search_books(Book.objects.all(), "vairamuthu", limit=10) == [karuvachi]
+    assert search_books(Book.objects.all(), "parthiban", limit=10) == [sivagamiyin]
+    assert search_books(Book.objects.all(), "ponniyin", limit=10) == []
+
+
+@pytest.mark.django_db
+def test_migrate_with_nothing_to_apply_keeps_the_index(books):
+    # Act
+    with CaptureQueriesContext(connection) as queries:
+        call_command('migrate', verbosity=0)
+
+    # Assert
+    assert not [query['sql'] for query in queries.captured_queries if SEARCH_TABLE in query['sql']
+                and not query['sql'].startswith("SELECT")]
+    assert search_books(Book.objects.all(), "kalki", limit=10) == books[:2]
+
+
+@pytest.mark.django_db
+def test_post_migrate_rebuilds_the_index_after_writes_without_triggers(books):
+    # Arrange: as a data migration would, with the triggers dropped by pre_migrate
+    with connection.cursor() as cursor:
+        cursor.execute("DROP TRIGGER bookApp_book_fts_insert")
+    new = Book.objects.create(title="Alai Osai", author=books[0].author, publication_year=1953)
+
+    # Act
+    create_search_triggers()
+
+    # Assert
+    assert search_books(Book.objects.all(), "alai", limit=10) == [new]
+    assert search_books(Book.objects.all(), "ponniyin", limit=10) == [books[0]]
+
+
+@pytest.mark.django_db
+def test_post_migrate_rebuilds_an_index_missing_rows(books):
+    # Arrange
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [books[0].id])
+
+    # Act
+    create_search_triggers()
+
+    # Assert
+    assert search_books(Book.objects.all(), "ponniyin", limit=10) == [books[0]]
+
+
+@pytest.mark.django_db
+def test_search_view_within_query_budget(logged_in_client, books):
+    # Act
+    with assert_query_budget(BookSearchView):
+        response = logged_in_client.get(reverse('books:search'), {'q': "kalki"})
+
+    # Assert
+    assert response.status_code == 200
+    assert {book.title for book in response.context['books']} == {"Ponniyin Selvan", "Sivagamiyin Sabatham"}
+
+
+@pytest.mark.django_db
+def test_search_view_paginates(logged_in_client, books, monkeypatch):
+    # Arrange
+    monkeypatch.setattr(BookSearchView, 'page_size', 1)
+
+    # Act
+    first = logged_in_client.get(reverse('books:search'), {'q': "kalki"})
+    second = logged_in_client.get(reverse('books:search'), {'q': "kalki", 'page': 2})
+
+    # Assert
+    assert first.context['has_next'] and not second.context['has_next']
+    assert first.context['books'] != second.context['books']
+
+
+@pytest.mark.django_db
+def test_admin_search_uses_index(books):
+    # Arrange
+    User.objects.create_superuser(username="admin", password="password@123")
+    client = Client()
+    client.login(username="admin", password="password@123")
+
+    # Act
+    response = client.get(reverse('admin:bookApp_book_changelist'), {'q': "sabath"})
+
+    # Assert
+    assert [book.title for book in response.context['cl'].result_list] == ["Sivagamiyin Sabatham"]
@@ -0,0 +1,93 @@
+import logging
+import re
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.handlers.asgi import ASGIHandler
+from django.test import AsyncClient
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+from bookApp.models import Book, Author
+
+
+def parse_server_timing(header):
+    return {
+        name: (float(duration), description)
+        for name, duration, description in re.findall(r'(\w+);dur=([\d.]+)(?:;desc="([^"]*)")?', header)
+    }
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("debug", [False, True])  # DEBUG renders inside the view, to enforce its query budget
+def test_server_timing_header_counts_every_query(logged_in_client, settings, debug):
+    # Arrange
+    settings.DEBUG = debug
+    author = Author.objects.create(name="Kalki")
+    Book.objects.create(title="Book1", author=author, publication_year=2020)
+
+    # Act
+    with CaptureQueriesContext(connection) as queries:
+        response = logged_in_client.get(reverse('books:book_list'))
+
+    # Assert
+    timings = parse_server_timing(response['Server-Timing'])
+    assert set(timings) == {'db', 'tpl', 'total'}
+    assert timings['db'][1] == f"{len(queries)} queries"
+    assert 0 < timings['tpl'][0] <= timings['total'][0]
+    assert timings['db'][0] <= timings['total'][0]
+
+
+@pytest.mark.django_db
+def test_server_timing_logs_one_line_per_request(logged_in_client, caplog):
+    # Act
+    with caplog.at_level(logging.INFO, logger='bookApp.request'):
+        response = logged_in_client.get(reverse('books:author_list'))
+
+    # Assert
+    [record] = [record for record in caplog.records if record.name == 'bookApp.request']
+    message = record.getMessage()
+    assert 'view=books:author_list' in message
+    assert 'status=200' in message
+    assert f"queries={record.timing.queries}" in message
+    assert response.wsgi_request.timing is record.timing
+
+
+@pytest.mark.django_db(transaction=True)
+def test_server_timing_on_async_views():
+    # Arrange
+    User.objects.create_user(username="root", password="password@123")
+    client = AsyncClient()
+    async_to_sync(client.alogin)(username="root", password="password@123")
+
+    # Act
+    response = async_to_sync(client.get)(reverse('books:async_book_list'))
+
+    # Assert
+    assert response.status_code == 200
+    timings = parse_server_timing(response['Server-Timing'])
+    assert int(timings['db'][1].split()[0]) > 0
+
+
+def test_server_timing_on_redirects(client):
+    # Act
+    response = client.get(reverse('books:book_list'))
+
+    # Assert
+    assert response.status_code == 302
+    assert 'total;dur=' in response['Server-Timing']
+
+
+def test_asgi_handler_runs_the_middleware_without_adapting_it(settings, caplog):
+    # Arrange
+    settings.DEBUG = True
+    settings.BOOKAPP_PROFILE_SLOW_MS = 0
+
+    # Act
+    with caplog.at_level(logging.DEBUG, logger='django.request'):
+        ASGIHandler()
+
+    # Assert
+    adapted = [record.getMessage() for record in caplog.records if 'adapted for middleware' in record.getMessage()]
+    assert not [message for message in adapted if 'bookApp.middleware' in message]
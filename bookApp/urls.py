@@ -1,6 +1,8 @@
 from django.urls import path
 
-from .views import BookListView,BookCreateView,AuthorCreateView,GenreCreateView,BookUpdateView,BookDeleteView,BookByAuthorListView,AuthorListView,BookByGenreListView,BookByPublicationYearView
+from .api import AuthorApiView, AutocompleteView, BookApiView, GenreApiView
+from .async_views import AsyncBookListView, AsyncBookByAuthorListView, AsyncBookByGenreListView, AsyncBookByPublicationYearView
+from .views import BookListView,BookCreateView,AuthorCreateView,GenreCreateView,BookUpdateView,BookDeleteView,BookByAuthorListView,AuthorListView,BookByGenreListView,BookByPublicationYearView,BookExportView,BookSearchView,BookStreamView,BookDetailView
 
 
 app_name = "books"
@@ -13,6 +15,7 @@ urlpatterns = [
      path('createBookAuthor/', AuthorCreateView.as_view(), name='add_author'),
      path('createBookGenre/', GenreCreateView.as_view(), name='add_genre'),
 
+     path('book/<int:pk>/', BookDetailView.as_view(), name='book_detail'),
      path('update/<int:pk>/', BookUpdateView.as_view(), name='update_book'),
      path('delete/<int:pk>/', BookDeleteView.as_view(), name='delete_book'),
 
@@ -23,5 +26,19 @@ urlpatterns = [
 
      path('genre/<str:genre_name>/', BookByGenreListView.as_view(), name='books_by_genre'),
      path('year/<int:year>/', BookByPublicationYearView.as_view(), name='books_by_year'),
+
+     path('export/', BookExportView.as_view(), name='export_books'),
+     path('search/', BookSearchView.as_view(), name='search'),
+     path('all/', BookStreamView.as_view(), name='book_list_stream'),
+
+     path('api/books/', BookApiView.as_view(), name='api_books'),
+     path('api/authors/', AuthorApiView.as_view(), name='api_authors'),
+     path('api/genres/', GenreApiView.as_view(), name='api_genres'),
+     path('api/autocomplete/', AutocompleteView.as_view(), name='api_autocomplete'),
+
+     path('async/', AsyncBookListView.as_view(), name='async_book_list'),
+     path('async/author/<int:author_id>/', AsyncBookByAuthorListView.as_view(), name='async_books_by_author'),
+     path('async/genre/<str:genre_name>/', AsyncBookByGenreListView.as_view(), name='async_books_by_genre'),
+     path('async/year/<int:year>/', AsyncBookByPublicationYearView.as_view(), name='async_books_by_year'),
 ]
 
@@ -1,23 +1,92 @@
+import itertools
+
+from asgiref.sync import sync_to_async
 from django.contrib.auth.mixins import PermissionRequiredMixin, LoginRequiredMixin
+from django.db.models import Prefetch
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponseBadRequest, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.template.loader import render_to_string
+from django.middleware.csrf import get_token
 from django.urls import reverse_lazy
-from django.views.generic import ListView, CreateView, UpdateView, DeleteView
-from bookApp.models import Book, Author, Genre
+from django.views import View
+from django.views.generic import DetailView, ListView, CreateView, UpdateView, DeleteView
+from bookApp.models import Book, Author, BookNeighbour, Genre, parse_price
+from .cache import CatalogCacheMixin, render_book_rows
+from .export import CONTENT_TYPES, EXPORT_FORMATS, export_lines
+from .facets import apply_facets, get_facets, selected_facets
 from .forms import BooksForm, AuthorForm, GenreForm
+from .pagination import KeysetPaginationMixin
+from .query_budget import QueryBudgetMixin
+from .search import search_books
 
 
-class BookListView(LoginRequiredMixin, ListView):
+class BookListView(QueryBudgetMixin, LoginRequiredMixin, CatalogCacheMixin, KeysetPaginationMixin, ListView):
     model = Book
     template_name = 'bookApp/book_list.html'
     context_object_name = 'books'
     login_url = reverse_lazy('login')
+    paginate_by = 50
+    query_budget = 8  # session, user, campaign boundaries, books with authors, genres, genre/year/author facet counts
+    shows_prices = True
+    # ?sort= values, by the effective price; books without a price are left out of them.
+    sort_orderings = {
+        'price': ('effective_discounted_price', 'id'),
+        '-price': ('-effective_discounted_price', '-id'),
+    }
+
+    def get_queryset(self):
+        self.selected_facets = selected_facets(self.request.GET)
+        books = Book.objects.with_effective_price().select_related('author').prefetch_related('genres')
+        books = apply_facets(books, self.selected_facets)
+        max_price = self.request.GET.get('max_price')
+        if max_price:
+            try:
+                books = books.filter(effective_discounted_price__lte=parse_price(max_price))
+            except (ValueError, ArithmeticError):
+                raise Http404("Invalid max_price.")
+        if self.request.GET.get('sort'):
+            books = books.filter(effective_discounted_price__isnull=False)
+        return books
+
+    def get_keyset_ordering(self):
+        sort = self.request.GET.get('sort')
+        if not sort:
+            return self.keyset_ordering
+        if sort not in self.sort_orderings:
+            raise Http404("Invalid sort.")
+        return self.sort_orderings[sort]
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['book_rows'] = render_book_rows(context['books'])
+        context['facets'] = get_facets(self.selected_facets)
+        return context
 
 
-class AuthorListView(LoginRequiredMixin, ListView):
+class AuthorListView(QueryBudgetMixin, LoginRequiredMixin, CatalogCacheMixin, KeysetPaginationMixin, ListView):
     model = Author
     template_name = 'bookApp/author_list.html'
     context_object_name = 'authors'
     login_url = reverse_lazy('login')
+    paginate_by = 50
+    keyset_ordering = ('-book_count', '-id')  # Most books first, read backwards from author_book_count_idx
+    query_budget = 3  # session, user, authors
+
+
+class BookDetailView(QueryBudgetMixin, LoginRequiredMixin, DetailView):
+    model = Book
+    template_name = 'bookApp/book_details.html'
+    context_object_name = 'book'
+    login_url = reverse_lazy('login')
+    query_budget = 5  # session, user, book with author, genres, neighbours with authors
+
+    def get_queryset(self):
+        # Neighbours are precomputed by the build_recommendations command.
+        neighbours = BookNeighbour.objects.select_related('neighbour__author').order_by('rank')
+        return Book.objects.select_related('author').prefetch_related(
+            'genres', Prefetch('neighbours', queryset=neighbours),
+        )
 
 
 class BookCreateView(LoginRequiredMixin, PermissionRequiredMixin, CreateView):
@@ -72,34 +141,159 @@ class BookDeleteView(LoginRequiredMixin, PermissionRequiredMixin, DeleteView):
         return get_object_or_404(Book, id=book_id)
 
 
-class BookByAuthorListView(LoginRequiredMixin, ListView):
+class BookByAuthorListView(QueryBudgetMixin, LoginRequiredMixin, CatalogCacheMixin, KeysetPaginationMixin, ListView):
     model = Book
     template_name = 'bookApp/list_of_book_by_author.html'
     context_object_name = 'books'
     login_url = reverse_lazy('login')
+    paginate_by = 50
+    query_budget = 3  # session, user, books with authors
 
     def get_queryset(self):
         author_id = self.kwargs.get('author_id')
-        return Book.objects.filter(author_id=author_id)
+        return Book.objects.filter(author_id=author_id).select_related('author')
 
 
-class BookByGenreListView(LoginRequiredMixin, ListView):
+class BookByGenreListView(QueryBudgetMixin, LoginRequiredMixin, CatalogCacheMixin, KeysetPaginationMixin, ListView):
     model = Book
-    template_name = 'bookApp/list_of_book_by_genre.html'
+    template_name = 'bookApp/books_by_genre.html'
     context_object_name = 'books'
     login_url = reverse_lazy('login')
+    paginate_by = 50
+    query_budget = 3  # session, user, books with authors
 
     def get_queryset(self):
         genre_name = self.kwargs.get('genre_name')
-        return Book.objects.filter(genres__name=genre_name).distinct()
+        return Book.objects.filter(genres__name=genre_name).select_related('author').distinct()
 
 
-class BookByPublicationYearView(LoginRequiredMixin, ListView):
+class BookByPublicationYearView(QueryBudgetMixin, LoginRequiredMixin, CatalogCacheMixin, KeysetPaginationMixin, ListView):
     model = Book
     template_name = 'bookApp/list_of_book_by_year.html'
     context_object_name = 'books'
     login_url = reverse_lazy('login')
+    paginate_by = 50
+    keyset_ordering = ('publication_year', 'id')
+    query_budget = 3  # session, user, books with authors
 
     def get_queryset(self):
         year = self.kwargs.get('year')
-        return Book.objects.filter(publication_year=year)
+        return Book.objects.filter(publication_year=year).select_related('author')
+
+
+async def _aiterate(iterable, batch_size):
+    # Each batch is produced on the request's sync thread, where the
+    # iterator's database cursor lives, without blocking the event loop.
+    iterator = iter(iterable)
+    next_batch = sync_to_async(lambda: ''.join(itertools.islice(iterator, batch_size)), thread_sensitive=True)
+    while batch := await next_batch():
+        yield batch
+
+
+def streaming_response(request, iterable, batch_size=1, **kwargs):
+    """
+    StreamingHttpResponse of the strings `iterable` yields.
+
+    Under ASGI Django would read a sync iterator to the end before sending
+    anything, so there it gets an async iterator yielding `batch_size`
+    strings at a time instead.
+    """
+    if isinstance(request, ASGIRequest):
+        iterable = _aiterate(iterable, batch_size)
+    return StreamingHttpResponse(iterable, **kwargs)
+
+
+class BookExportView(LoginRequiredMixin, View):
+    login_url = reverse_lazy('login')
+
+    def get(self, request):
+        format = request.GET.get('format', 'csv')
+        if format not in EXPORT_FORMATS:
+            return HttpResponseBadRequest(f"Unknown format, use one of: {', '.join(EXPORT_FORMATS)}.")
+        since = request.GET.get('since')
+        if since is not None:
+            try:
+                since = int(since)
+            except ValueError:
+                return HttpResponseBadRequest("since must be a book id.")
+
+        response = streaming_response(request, export_lines(format, since), batch_size=500,
+                                      content_type=CONTENT_TYPES[format])
+        response['Content-Disposition'] = f'attachment; filename="books.{format}"'
+        return response
+
+
+class BookStreamView(LoginRequiredMixin, View):
+    """
+    The whole catalog in one page, streamed.
+
+    The head is sent before the books are queried, then the rows are rendered
+    and sent a chunk at a time from iterator(chunk_size=...), which runs the
+    genres prefetch per chunk. Memory use depends on the chunk size, not on
+    the size of the catalog.
+    """
+    login_url = reverse_lazy('login')
+    head_template_name = 'bookApp/book_stream_head.html'
+    foot_template_name = 'bookApp/book_stream_foot.html'
+    chunk_size = 500
+
+    def get_queryset(self):
+        return Book.objects.with_effective_price().select_related('author').prefetch_related('genres').order_by('id')
+
+    def get(self, request):
+        # The foot's logout form needs a CSRF token, whose cookie can only be
+        # set before the response leaves the middleware.
+        get_token(request)
+        return streaming_response(request, self.stream(request), content_type='text/html; charset=utf-8')
+
+    def stream(self, request):
+        yield render_to_string(self.head_template_name, request=request)
+        books = self.get_queryset().iterator(chunk_size=self.chunk_size)
+        streamed = 0
+        while chunk := list(itertools.islice(books, self.chunk_size)):
+            # Cached rows are reused, but a full catalog walk doesn't fill the cache.
+            rows = ''.join(render_book_rows(chunk, store=False))
+            streamed += len(chunk)
+            # A prefetched queryset refers back to its book, and such cycles
+            # wait for the garbage collector. Breaking them frees the chunk now.
+            for book in chunk:
+                book._prefetched_objects_cache.clear()
+            del chunk
+            yield rows
+        yield render_to_string(self.foot_template_name, {'books_streamed': streamed}, request=request)
+
+
+class BookSearchView(QueryBudgetMixin, LoginRequiredMixin, ListView):
+    template_name = 'bookApp/search.html'
+    context_object_name = 'books'
+    login_url = reverse_lazy('login')
+    page_size = 50
+    query_budget = 5  # session, user, search index, books with authors, genres
+
+    def get_queryset(self):
+        self.query = self.request.GET.get('q', '').strip()
+        try:
+            self.page = int(self.request.GET.get('page', 1))
+        except ValueError:
+            raise Http404("Invalid page.")
+        if self.page < 1:
+            raise Http404("Invalid page.")
+
+        self.has_next = False
+        if not self.query:
+            return []
+        books = search_books(
+            Book.objects.select_related('author').prefetch_related('genres'),
+            self.query,
+            limit=self.page_size + 1,
+            offset=(self.page - 1) * self.page_size,
+        )
+        self.has_next = len(books) > self.page_size
+        return books[:self.page_size]
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.query
+        context['page'] = self.page
+        context['has_next'] = self.has_next
+        return context